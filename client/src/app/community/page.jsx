@@ -4,6 +4,7 @@ import Image from "next/image";
 import Navbar from '@/components/Navbar';
 import { Search, MapPin, Clock, Leaf, X, Upload } from "lucide-react";
 import communityService from '@/services/communityService';
+import uploadService from '@/services/uploadService';
 import { getToken } from '@/utils/auth';
 import { useAuth } from '@/context/AuthContext';
 
@@ -345,13 +346,15 @@ export default function Page() {
                   <div key={action.id} className="bg-white rounded-xl border border-gray-200 overflow-hidden hover:shadow-lg transition-all duration-300">
                     {/* Image */}
                     <div className="aspect-video relative overflow-hidden">
+                      {/* Uploaded images come pre-sized, so skip Next's resizing; the 480px card variant fits this slot */}
                       <Image
-                        src={action.image || "/CommunityTreeplanting.jpeg"}
+                        src={uploadService.getImageUrl(action.image, 'card', 'webp') || "/CommunityTreeplanting.jpeg"}
                         alt={action.title}
                         width={400}
                         height={250}
                         className="w-full h-full object-cover"
                         priority={action.id <= 3}
+                        unoptimized={/\/upload\/images\//.test(action.image || '')}
                       />
                     </div>
 
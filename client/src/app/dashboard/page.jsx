@@ -8,8 +8,12 @@ import { useAuth } from "@/context/AuthContext";
 import { endpoints } from '@/services/apiConfig';
 
 export default function Dashboard() {
-  const { user: authUser, loading: authLoading } = useAuth();
-  const { recentActivities } = dashboardData;
+  const { user: authUser, dashboard, loading: authLoading } = useAuth();
+  // The session bootstrap already loaded the feed; the static data only covers signed-out previews
+  const activityIcons = { report: "FileText", community: "Users", alert: "AlertTriangle" };
+  const recentActivities = dashboard?.recentActivities
+    ? dashboard.recentActivities.map((activity) => ({ ...activity, icon: activityIcons[activity.type] || "FileText" }))
+    : dashboardData.recentActivities;
   const [aiInsights, setAiInsights] = useState([]);
   const [emergencyInsights, setEmergencyInsights] = useState(null);
   
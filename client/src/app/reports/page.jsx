@@ -4,6 +4,7 @@ import { Icon } from '@iconify/react';
 import Navbar from '@/components/Navbar';
 import Image from 'next/image';
 import { useAuth } from '@/context/AuthContext';
+import uploadService from '@/services/uploadService';
 
 export default function ReportsPage() {
   const { user, refreshUser } = useAuth();
@@ -14,6 +15,7 @@ export default function ReportsPage() {
     images: []
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  const [uploadingCount, setUploadingCount] = useState(0);
 
   const issueTypes = [
     'Flooding',
@@ -61,19 +63,37 @@ export default function ReportsPage() {
     }));
   };
 
-  const handleImageUpload = (e) => {
+  // Photos are uploaded as soon as they are picked, so the previews can use the small thumb variant
+  const handleImageUpload = async (e) => {
     const files = Array.from(e.target.files);
-    setFormData(prev => ({
-      ...prev,
-      images: [...prev.images, ...files]
+    e.target.value = '';
+    setUploadingCount(count => count + files.length);
+    await Promise.all(files.map(async (file) => {
+      try {
+        const uploaded = await uploadService.uploadImage(file);
+        // The same photo picked twice comes back with the same filename
+        setFormData(prev => prev.images.some(image => image.filename === uploaded.filename) ? prev : {
+          ...prev,
+          images: [...prev.images, uploaded]
+        });
+      } catch (error) {
+        alert(error.message || 'Failed to upload image');
+      } finally {
+        setUploadingCount(count => count - 1);
+      }
     }));
   };
 
   const removeImage = (index) => {
+    const image = formData.images[index];
     setFormData(prev => ({
       ...prev,
       images: prev.images.filter((_, i) => i !== index)
     }));
+    // Not attached to anything yet, so give the upload back
+    uploadService.deleteImage(image.filename).catch((error) => {
+      console.error('Failed to delete image:', error);
+    });
   };
 
   const handleSubmit = async (e) => {
@@ -100,7 +120,8 @@ export default function ReportsPage() {
         location: formData.location,
         county: 'Nairobi', // Default county - you could make this dynamic
         severity: 'medium',
-        priority: 'normal'
+        priority: 'normal',
+        image_urls: formData.images.map(image => image.image_url)
       };
 
       const response = await fetch('http://localhost:5000/api/reports/', {
@@ -235,7 +256,7 @@ export default function ReportsPage() {
                       Photo Evidence (Optional)
                     </label>
                     <div className="border-2 border-dashed border-gray-300 rounded-lg p-6 hover:border-gray-400 transition-colors">
-                      {formData.images.length === 0 ? (
+                      {formData.images.length === 0 && uploadingCount === 0 ? (
                         <div className="text-center cursor-pointer">
                           <input
                             type="file"
@@ -263,7 +284,9 @@ export default function ReportsPage() {
                           {/* Upload more button */}
                           <div className="flex justify-between items-center">
                             <span className="text-sm font-medium text-gray-700">
-                              {formData.images.length} image(s) selected
+                              {uploadingCount > 0
+                                ? `Uploading ${uploadingCount} image(s)...`
+                                : `${formData.images.length} image(s) selected`}
                             </span>
                             <label
                               htmlFor="image-upload-more"
@@ -284,9 +307,9 @@ export default function ReportsPage() {
                           {/* Preview uploaded images inside the card */}
                           <div className="grid grid-cols-2 md:grid-cols-3 gap-3">
                             {formData.images.map((image, index) => (
-                              <div key={index} className="relative group">
+                              <div key={image.filename} className="relative group">
                                 <img
-                                  src={URL.createObjectURL(image)}
+                                  src={uploadService.getImageUrl(image.image_url, 'thumb', 'webp')}
                                   alt={`Upload ${index + 1}`}
                                   className="w-full h-20 object-cover rounded-lg border border-gray-200"
                                 />
@@ -309,7 +332,7 @@ export default function ReportsPage() {
                   <div className="pt-4">
                     <button
                       type="submit"
-                      disabled={isSubmitting}
+                      disabled={isSubmitting || uploadingCount > 0}
                       className="w-full px-6 py-3 bg-[#16A34A] text-white font-medium rounded-lg hover:bg-blue-700 focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
                     >
                       {isSubmitting ? 'Submitting...' : 'Submit Report'}
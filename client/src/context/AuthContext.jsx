@@ -1,23 +1,58 @@
 'use client';
 
-import { createContext, useContext, useState, useEffect } from 'react';
+import { createContext, useContext, useState, useEffect, useRef } from 'react';
 import { authService } from '@/services/authService';
-import { getToken, setToken, clearToken } from '@/utils/auth';
+import { setSessionRenewer, renewAccessToken } from '@/services/authFetch';
+import { getToken, setToken, clearToken, getRefreshToken, setRefreshToken } from '@/utils/auth';
 
 const AuthContext = createContext(null);
 
 export function AuthProvider({ children }) {
   const [user, setUser] = useState(null);
+  const [dashboard, setDashboard] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const refreshTimer = useRef(null);
+
+  // Keep the short-lived access token fresh: renew it shortly before it expires
+  const storeSession = (response) => {
+    setToken(response.token);
+    setRefreshToken(response.refresh_token);
+    clearTimeout(refreshTimer.current);
+    if (response.expires_in) {
+      const delay = Math.max(response.expires_in * 0.8, 30) * 1000;
+      refreshTimer.current = setTimeout(renewAccessToken, delay);
+    }
+  };
+
+  const renewSession = async () => {
+    const refreshToken = getRefreshToken();
+    if (!refreshToken) return null;
+    try {
+      const response = await authService.refresh(refreshToken);
+      storeSession(response);
+      return response.token;
+    } catch (err) {
+      console.error('Session refresh failed:', err);
+      clearTimeout(refreshTimer.current);
+      clearToken();
+      setUser(null);
+      return null;
+    }
+  };
 
   // Load user on mount if token exists
   useEffect(() => {
+    // Requests that come back 401 (e.g. after the laptop slept through the timer) renew through here
+    setSessionRenewer(renewSession);
+
     const loadUser = async () => {
-      const token = getToken();
+      // A stored access token may have expired; the refresh token gets a new one without a password
+      const token = getRefreshToken() ? await renewAccessToken() : getToken();
       if (token) {
         try {
-          const response = await authService.me(token);
+          // One request for first paint instead of /auth/me followed by the dashboard's own calls
+          const response = await authService.bootstrap();
           if (response.success && response.user) {
             // Merge profile data into user object for easy access
             const userWithProfile = {
@@ -26,6 +61,7 @@ export function AuthProvider({ children }) {
               profile: response.profile
             };
             setUser(userWithProfile);
+            setDashboard(response.dashboard || null);
           } else {
             clearToken();
           }
@@ -38,6 +74,10 @@ export function AuthProvider({ children }) {
     };
 
     loadUser();
+    return () => {
+      clearTimeout(refreshTimer.current);
+      setSessionRenewer(null);
+    };
   }, []);
 
   const login = async (email, password) => {
@@ -46,7 +86,7 @@ export function AuthProvider({ children }) {
       const response = await authService.login({ email, password });
       
       if (response.success && response.token && response.user) {
-        setToken(response.token);
+        storeSession(response);
         // Merge profile data into user object for easy access
         const userWithProfile = {
           ...response.user,
@@ -71,7 +111,7 @@ export function AuthProvider({ children }) {
       const response = await authService.register({ full_name, email, password });
       
       if (response.success && response.token && response.user) {
-        setToken(response.token);
+        storeSession(response);
         // Merge profile data into user object for easy access
         const userWithProfile = {
           ...response.user,
@@ -91,8 +131,12 @@ export function AuthProvider({ children }) {
   };
 
   const logout = () => {
+    const sessionToken = getRefreshToken() || getToken();
+    if (sessionToken) authService.logout(sessionToken);
+    clearTimeout(refreshTimer.current);
     clearToken();
     setUser(null);
+    setDashboard(null);
     setError(null);
   };
 
@@ -100,7 +144,7 @@ export function AuthProvider({ children }) {
     const token = getToken();
     if (token) {
       try {
-        const response = await authService.me(token);
+        const response = await authService.me();
         if (response.success && response.user) {
           const userWithProfile = {
             ...response.user,
@@ -117,6 +161,7 @@ export function AuthProvider({ children }) {
 
   const value = {
     user,
+    dashboard,
     loading,
     error,
     login,
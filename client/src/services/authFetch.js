@@ -0,0 +1,53 @@
+import { getToken, getRefreshToken } from '@/utils/auth';
+
+/**
+ * Authenticated fetch
+ * Access tokens live 15 minutes and are renewed on a timer, but timers stop while a laptop sleeps
+ * or a background tab is throttled. A request that comes back 401 renews the session once and is
+ * sent again with the new token.
+ */
+
+let sessionRenewer = null;
+let pendingRenewal = null;
+
+/**
+ * Called by AuthProvider with its renewSession, which stores the new tokens and clears the user on failure
+ */
+export const setSessionRenewer = (renewer) => {
+  sessionRenewer = renewer;
+};
+
+/**
+ * Renew the access token; resolves with the new token, or null if the session has ended.
+ * Refresh tokens rotate, so concurrent callers share one request instead of each spending the same token.
+ */
+export const renewAccessToken = () => {
+  if (!sessionRenewer || !getRefreshToken()) return Promise.resolve(null);
+  if (!pendingRenewal) {
+    pendingRenewal = sessionRenewer().finally(() => {
+      pendingRenewal = null;
+    });
+  }
+  return pendingRenewal;
+};
+
+/**
+ * fetch() with the current access token; on a 401 renews the session once and replays the request
+ */
+export const authFetch = async (url, options = {}) => {
+  const send = (token) => fetch(url, {
+    ...options,
+    headers: {
+      ...options.headers,
+      ...(token && { 'Authorization': `Bearer ${token}` })
+    }
+  });
+
+  const response = await send(getToken());
+  if (response.status !== 401) return response;
+
+  const token = await renewAccessToken();
+  return token ? send(token) : response;
+};
+
+export default authFetch;
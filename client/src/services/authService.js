@@ -1,3 +1,5 @@
+import { authFetch } from './authFetch';
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'http://localhost:5000/api';
 
 export const authService = {
@@ -92,12 +94,10 @@ export const authService = {
     }
   },
 
-  async me(token) {
+  async me() {
     try {
       console.log('Making me request to:', `${API_BASE}/auth/me`);
-      const res = await fetch(`${API_BASE}/auth/me`, {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
+      const res = await authFetch(`${API_BASE}/auth/me`);
       
       if (!res.ok) {
         throw new Error(`HTTP ${res.status}: ${res.statusText}`);
@@ -114,6 +114,40 @@ export const authService = {
     }
   },
 
+  // First-paint payload: the /auth/me user and profile plus the dashboard and unread counts in one request
+  async bootstrap() {
+    const res = await authFetch(`${API_BASE}/bootstrap`);
+    const data = await res.json().catch(() => ({}));
+    if (!res.ok || data.success === false) {
+      throw new Error(data.error || `HTTP ${res.status}: ${res.statusText}`);
+    }
+    return data;
+  },
+
+  async refresh(refreshToken) {
+    const res = await fetch(`${API_BASE}/auth/refresh`, {
+      method: 'POST',
+      headers: { 'Authorization': `Bearer ${refreshToken}` }
+    });
+    const data = await res.json().catch(() => ({}));
+    if (!res.ok || data.success === false) {
+      throw new Error(data.error || `HTTP ${res.status}: ${res.statusText}`);
+    }
+    return data;
+  },
+
+  async logout(token) {
+    try {
+      await fetch(`${API_BASE}/auth/logout`, {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${token}` }
+      });
+    } catch (error) {
+      // Signing out locally is enough if the server cannot be reached
+      console.error('Logout request error:', error);
+    }
+  },
+
   async forgotPassword({ email }) {
     try {
       console.log('=== FORGOT PASSWORD DEBUG ===');
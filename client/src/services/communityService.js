@@ -1,5 +1,6 @@
 import { endpoints } from './apiConfig';
 import { getToken } from '@/utils/auth';
+import { authFetch } from './authFetch';
 
 /**
  * Community Service
@@ -58,11 +59,10 @@ const communityService = {
       throw new Error('Authentication required. Please login to create actions.');
     }
 
-    const response = await fetch(`${endpoints.community}/actions`, {
+    const response = await authFetch(`${endpoints.community}/actions`, {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${token}`
+        'Content-Type': 'application/json'
       },
       body: JSON.stringify(actionData)
     });
@@ -86,11 +86,10 @@ const communityService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.community}/actions/${actionId}`, {
+    const response = await authFetch(`${endpoints.community}/actions/${actionId}`, {
       method: 'PUT',
       headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${token}`
+        'Content-Type': 'application/json'
       },
       body: JSON.stringify(actionData)
     });
@@ -114,11 +113,8 @@ const communityService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.community}/actions/${actionId}`, {
-      method: 'DELETE',
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
+    const response = await authFetch(`${endpoints.community}/actions/${actionId}`, {
+      method: 'DELETE'
     });
 
     if (!response.ok) {
@@ -140,11 +136,8 @@ const communityService = {
       throw new Error('Authentication required. Please login to join actions.');
     }
 
-    const response = await fetch(`${endpoints.community}/actions/${actionId}/join`, {
-      method: 'POST',
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
+    const response = await authFetch(`${endpoints.community}/actions/${actionId}/join`, {
+      method: 'POST'
     });
 
     if (!response.ok) {
@@ -166,11 +159,8 @@ const communityService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.community}/actions/${actionId}/leave`, {
-      method: 'POST',
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
+    const response = await authFetch(`${endpoints.community}/actions/${actionId}/leave`, {
+      method: 'POST'
     });
 
     if (!response.ok) {
@@ -192,11 +182,7 @@ const communityService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.community}/my-actions`, {
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
-    });
+    const response = await authFetch(`${endpoints.community}/my-actions`);
 
     if (!response.ok) {
       throw new Error('Failed to fetch your actions');
@@ -1,5 +1,6 @@
 import { endpoints } from './apiConfig';
 import { getToken } from '@/utils/auth';
+import { authFetch } from './authFetch';
 
 /**
  * Contact Service
@@ -48,11 +49,7 @@ const contactService = {
     }
 
     const url = `${endpoints.contact}/messages${params.toString() ? `?${params.toString()}` : ''}`;
-    const response = await fetch(url, {
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
-    });
+    const response = await authFetch(url);
 
     if (!response.ok) {
       throw new Error('Failed to fetch messages');
@@ -72,11 +69,7 @@ const contactService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.contact}/messages/${messageId}`, {
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
-    });
+    const response = await authFetch(`${endpoints.contact}/messages/${messageId}`);
 
     if (!response.ok) {
       throw new Error('Failed to fetch message');
@@ -96,11 +89,10 @@ const contactService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${endpoints.contact}/messages/${messageId}/status`, {
+    const response = await authFetch(`${endpoints.contact}/messages/${messageId}/status`, {
       method: 'PUT',
       headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${token}`
+        'Content-Type': 'application/json'
       },
       body: JSON.stringify({ status })
     });
@@ -1,30 +1,22 @@
 // src/services/profileService.js
-import { getToken } from '@/utils/auth';
+import { authFetch } from './authFetch';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'http://localhost:5000/api';
 
 export const profileService = {
   async fetchProfile(userId) {
-    const token = getToken();
     const headers = { 'Content-Type': 'application/json' };
-    if (token) {
-      headers['Authorization'] = `Bearer ${token}`;
-    }
     
-    const response = await fetch(`${API_BASE}/profile/${userId}`, { headers });
+    const response = await authFetch(`${API_BASE}/profile/${userId}`, { headers });
     if (!response.ok) throw new Error('Failed to fetch profile');
     const data = await response.json();
     return data.profile || data;
   },
 
   async updateProfile(userId, updates) {
-    const token = getToken();
     const headers = { 'Content-Type': 'application/json' };
-    if (token) {
-      headers['Authorization'] = `Bearer ${token}`;
-    }
     
-    const response = await fetch(`${API_BASE}/profile/${userId}`, {
+    const response = await authFetch(`${API_BASE}/profile/${userId}`, {
       method: 'PUT',
       headers,
       body: JSON.stringify(updates)
@@ -35,13 +27,9 @@ export const profileService = {
   },
 
   async updateStats(userId, stats) {
-    const token = getToken();
     const headers = { 'Content-Type': 'application/json' };
-    if (token) {
-      headers['Authorization'] = `Bearer ${token}`;
-    }
     
-    const response = await fetch(`${API_BASE}/profile/${userId}/stats`, {
+    const response = await authFetch(`${API_BASE}/profile/${userId}/stats`, {
       method: 'PATCH',
       headers,
       body: JSON.stringify(stats)
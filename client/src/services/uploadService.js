@@ -1,5 +1,6 @@
 import { getToken } from '@/utils/auth';
 import API_BASE from './apiConfig';
+import { authFetch, renewAccessToken } from './authFetch';
 
 /**
  * Upload Service
@@ -32,10 +33,78 @@ const uploadService = {
       throw new Error('Invalid file type. Please upload PNG, JPG, JPEG, GIF, or WebP images');
     }
 
+    // Hashing needs Web Crypto (HTTPS or localhost); otherwise send the file through the API
+    if (!globalThis.crypto?.subtle) {
+      return this.uploadImageMultipart(file, onProgress);
+    }
+    return this.uploadImageDirect(file, onProgress);
+  },
+
+  /**
+   * Upload straight to storage with a presigned URL; the API only sees the hash.
+   * An image that is already stored is not uploaded again.
+   */
+  async uploadImageDirect(file, onProgress = null) {
+    const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    const sha256 = Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+
+    const presign = await this.postJson('/upload/presign', {
+      content_type: file.type,
+      size: file.size,
+      sha256
+    });
+    if (!presign.upload) {
+      if (onProgress) onProgress(100);
+      return presign;
+    }
+
+    await this.sendWithProgress(presign.upload.method, presign.upload.url, presign.upload.headers, file, onProgress);
+    return this.postJson('/upload/complete', { ticket: presign.ticket });
+  },
+
+  async postJson(path, body) {
+    const response = await authFetch(`${API_BASE}${path}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify(body)
+    });
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || 'Upload failed');
+    }
+    return data;
+  },
+
+  /**
+   * Upload through the API as multipart form data
+   */
+  async uploadImageMultipart(file, onProgress = null) {
     // Create form data
     const formData = new FormData();
     formData.append('image', file);
 
+    const send = (token) => this.sendWithProgress('POST', `${API_BASE}/upload/image`, {
+      'Authorization': `Bearer ${token}`
+    }, formData, onProgress);
+
+    // XMLHttpRequest bypasses authFetch, so renew and resend here if the access token expired
+    let response;
+    try {
+      response = await send(getToken());
+    } catch (error) {
+      const token = error.status === 401 ? await renewAccessToken() : null;
+      if (!token) throw error;
+      response = await send(token);
+    }
+    return JSON.parse(response);
+  },
+
+  /**
+   * Send a body with XMLHttpRequest so upload progress can be reported; resolves with the response text
+   */
+  sendWithProgress(method, url, headers, body, onProgress = null) {
     // Create XMLHttpRequest for progress tracking
     return new Promise((resolve, reject) => {
       const xhr = new XMLHttpRequest();
@@ -51,17 +120,18 @@ const uploadService = {
       }
 
       xhr.addEventListener('load', () => {
+        if (xhr.status >= 200 && xhr.status < 300) {
+          resolve(xhr.responseText);
+          return;
+        }
+        let error;
         try {
-          const response = JSON.parse(xhr.responseText);
-          
-          if (xhr.status >= 200 && xhr.status < 300) {
-            resolve(response);
-          } else {
-            reject(new Error(response.error || 'Upload failed'));
-          }
-        } catch (error) {
-          reject(new Error('Failed to parse response'));
+          error = new Error(JSON.parse(xhr.responseText).error || 'Upload failed');
+        } catch (parseError) {
+          error = new Error(`Upload failed (${xhr.status})`);
         }
+        error.status = xhr.status;
+        reject(error);
       });
 
       xhr.addEventListener('error', () => {
@@ -73,9 +143,9 @@ const uploadService = {
       });
 
       // Configure and send request
-      xhr.open('POST', `${API_BASE}/upload/image`);
-      xhr.setRequestHeader('Authorization', `Bearer ${token}`);
-      xhr.send(formData);
+      xhr.open(method, url);
+      Object.entries(headers || {}).forEach(([name, value]) => xhr.setRequestHeader(name, value));
+      xhr.send(body);
     });
   },
 
@@ -89,11 +159,8 @@ const uploadService = {
       throw new Error('Authentication required');
     }
 
-    const response = await fetch(`${API_BASE}/upload/images/${filename}`, {
-      method: 'DELETE',
-      headers: {
-        'Authorization': `Bearer ${token}`
-      }
+    const response = await authFetch(`${API_BASE}/upload/images/${filename}`, {
+      method: 'DELETE'
     });
 
     if (!response.ok) {
@@ -106,17 +173,24 @@ const uploadService = {
 
   /**
    * Get image URL for display
+   * variant: 'thumb' (160px, for lists), 'card' (480px) or 'full'; format: 'jpg' or 'webp'
    */
-  getImageUrl(filename) {
+  getImageUrl(filename, variant = 'full', format = 'jpg') {
     if (!filename) return null;
     
-    // If filename is already a full URL, return it
-    if (filename.startsWith('http')) {
+    // Stored image URLs ('/api/upload/images/<name>', relative or absolute) are switched to the variant
+    const match = filename.match(/^(.*\/upload\/images\/)([^/?#]+)/);
+    
+    // Any other URL (static files, external links, local previews) is returned as it is
+    if (!match && /^(https?:|blob:|data:|\/)/.test(filename)) {
       return filename;
     }
     
-    // If it's a relative path, construct the full URL
-    return `${API_BASE}/upload/images/${filename}`;
+    // '<id>_<user>.jpg' or '<id>_<user>.card.webp' -> '<id>_<user>.thumb.webp'
+    const stem = (match ? match[2] : filename).replace(/(\.(thumb|card))?\.[^.]+$/, '');
+    const name = variant === 'full' ? `${stem}.${format}` : `${stem}.${variant}.${format}`;
+    
+    return match ? `${match[1]}${name}` : `${API_BASE}/upload/images/${name}`;
   },
 
   /**
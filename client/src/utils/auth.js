@@ -1,4 +1,5 @@
 export const TOKEN_KEY = 'eah_jwt';
+export const REFRESH_TOKEN_KEY = 'eah_refresh';
 
 export const setToken = (token) => {
   if (typeof window === 'undefined') return;
@@ -13,6 +14,17 @@ export const getToken = () => {
 export const clearToken = () => {
   if (typeof window === 'undefined') return;
   localStorage.removeItem(TOKEN_KEY);
+  localStorage.removeItem(REFRESH_TOKEN_KEY);
+};
+
+export const setRefreshToken = (token) => {
+  if (typeof window === 'undefined' || !token) return;
+  localStorage.setItem(REFRESH_TOKEN_KEY, token);
+};
+
+export const getRefreshToken = () => {
+  if (typeof window === 'undefined') return null;
+  return localStorage.getItem(REFRESH_TOKEN_KEY);
 };
 
 export const isAuthed = () => !!getToken();
@@ -2,25 +2,39 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from .extensions import db, migrate, api, bcrypt
 from .config import DevelopmentConfig, ProductionConfig
 
 
-def create_app():
+def create_app(config_class=None):
     app = Flask(__name__)
 
     # ------------------- Config -------------------
-    # Use production config if FLASK_ENV is production, otherwise development
-    config_class = ProductionConfig if os.getenv('FLASK_ENV') == 'production' else DevelopmentConfig
+    # Use production config if FLASK_ENV is production, otherwise development (tests pass TestingConfig)
+    if config_class is None:
+        config_class = ProductionConfig if os.getenv('FLASK_ENV') == 'production' else DevelopmentConfig
     app.config.from_object(config_class)
 
+    # Views can set their own body size limit (see app.services.upload_limits)
+    from app.services.upload_limits import register_upload_limits
+    register_upload_limits(app)
+
     # ------------------- Extensions -------------------
     db.init_app(app)
     migrate.init_app(app, db)
-    JWTManager(app)
+    jwt = JWTManager(app)
     api.init_app(app)
     bcrypt.init_app(app)
+
+    # Tokens of revoked sessions are rejected via an in-memory revocation set
+    from app.services.sessions import register_jwt_callbacks
+    register_jwt_callbacks(jwt)
+
+    # Client IPs (used for rate limiting) come from X-Forwarded-For only behind known proxies
+    if app.config.get('TRUSTED_PROXY_HOPS'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'], x_proto=app.config['TRUSTED_PROXY_HOPS'])
     
     # Configure CORS to allow frontend access
     allowed_origins = [
@@ -47,13 +61,14 @@ def create_app():
     })
 
     # ------------------- Import models (for Alembic) -------------------
-    from app.models.profile import Profile
-    from app.models.dashboard import DashboardStats, AIIntelligence, RecentActivity
-    from app.models.auth import User
+    from app.models.profile import Profile, MonthlyStats
+    from app.models.dashboard import DashboardStats, AIIntelligence, RecentActivity, CountyActivity
+    from app.models.auth import User, RefreshTokenFamily
     from app.models.achievements import Achievement, UserAchievement
     from app.models.emergency import EmergencyAlert, EmergencyReport, EmergencyContact
-    from app.models.community import CommunityAction, ActionParticipant
+    from app.models.community import CommunityAction, ActionParticipant, CommunityStats
     from app.models.contact import ContactMessage
+    from app.models.uploads import ImageBlob, ImageReference
     
     # ------------------- Auto Migration (Temporary) -------------------
     def add_missing_columns():
@@ -144,6 +159,14 @@ def create_app():
     except Exception as e:
         print(f"✗ Admin blueprint registration failed: {e}")
     
+    # Register leaderboard routes
+    try:
+        from app.routes import leaderboard
+        app.register_blueprint(leaderboard.bp)
+        print("✓ Leaderboard blueprint registered successfully")
+    except Exception as e:
+        print(f"✗ Leaderboard blueprint registration failed: {e}")
+    
     # Register upload routes
     try:
         from app.routes import upload
@@ -152,6 +175,26 @@ def create_app():
     except Exception as e:
         print(f"✗ Upload blueprint registration failed: {e}")
     
+    # Register bootstrap route
+    try:
+        from app.routes import bootstrap
+        app.register_blueprint(bootstrap.bp)
+        print("✓ Bootstrap blueprint registered successfully")
+    except Exception as e:
+        print(f"✗ Bootstrap blueprint registration failed: {e}")
+    
+    # ------------------- Event subscribers -------------------
+    from app.services import leaderboard  # noqa: F401 (subscribes to point changes)
+    from app.services import dashboard_stats  # noqa: F401 (refreshes stats on user activity)
+    from app.services import activity_feed  # noqa: F401 (fans activity out to timelines)
+    from app.services import identity  # noqa: F401 (drops cached profiles on change)
+    from app.services import profile_cards  # noqa: F401 (drops cached profile cards on change)
+    from app.services import achievements  # noqa: F401 (tracks progress and unlocks achievements)
+
+    # ------------------- CLI commands -------------------
+    from app.commands import register_commands
+    register_commands(app)
+
     # ------------------- Default route -------------------
     @app.route("/")
     def home():
@@ -161,6 +204,7 @@ def create_app():
             'status': 'running',
             'endpoints': {
                 'auth': '/api/auth',
+                'bootstrap': '/api/bootstrap',
                 'ai': '/api/ai',
                 'profile': '/api/profile',
                 'emergency_alerts': '/api/emergency/alerts',
@@ -170,6 +214,7 @@ def create_app():
                 'reports': '/api/emergency/reports',
                 'community_actions': '/api/community/actions',
                 'community_stats': '/api/community/stats',
+                'leaderboard': '/api/leaderboard',
                 'contact_messages': '/api/contact/messages',
                 'upload_image': '/api/upload/image'
             }
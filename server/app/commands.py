@@ -0,0 +1,166 @@
+"""Maintenance commands, run with ``flask <command>`` (e.g. from a Render job)"""
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('reconcile-stats')
+@with_appcontext
+def reconcile_stats_command():
+    """Recompute materialized community statistics from source tables"""
+    from app.services.community_stats import reconcile_stats
+    stats = reconcile_stats()
+    click.echo(f"✓ Community stats reconciled: {stats.to_dict()}")
+
+
+@click.command('geocode-actions')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def geocode_actions_command(batch_size):
+    """Fill coordinates and grid cells for actions created before geocoding"""
+    from app.services.community_events import backfill_geo
+    updated = backfill_geo(batch_size=batch_size)
+    click.echo(f"✓ Geocoded {updated} community actions")
+
+
+@click.command('refresh-insights')
+@click.option('--county', default=None, help='Only this county (default: every county with profiles)')
+@with_appcontext
+def refresh_insights_command(county):
+    """Regenerate per-county dashboard insights"""
+    from app.extensions import db
+    from app.models.profile import Profile
+    from app.services.county_insights import refresh_county_insights
+    if county:
+        counties = [county]
+    else:
+        counties = [row[0] for row in db.session.query(Profile.county).filter(Profile.county.isnot(None)).distinct()]
+    for name in counties:
+        count = refresh_county_insights(name, force=True)
+        click.echo(f"✓ {name}: {count} insights")
+
+
+@click.command('trim-activities')
+@click.option('--batch-size', default=500, show_default=True)
+@with_appcontext
+def trim_activities_command(batch_size):
+    """Trim personal timelines to their cap and delete expired county broadcasts"""
+    from app.services.activity_feed import trim_timelines, trim_county_activities
+    timelines = trim_timelines(batch_size=batch_size)
+    broadcasts = trim_county_activities()
+    click.echo(f"✓ Trimmed {timelines} timeline entries and {broadcasts} county broadcasts")
+
+
+@click.command('rollover-monthly-stats')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--seed', is_flag=True, help='First run only: create current buckets from profile counters')
+@with_appcontext
+def rollover_monthly_stats_command(batch_size, seed):
+    """Reset profiles' this-month counters from the current monthly buckets (run on the 1st)"""
+    from app.services.monthly_stats import rollover, seed_from_profiles
+    if seed:
+        click.echo(f"✓ Seeded {seed_from_profiles(batch_size=batch_size)} monthly buckets")
+    click.echo(f"✓ Rolled over {rollover(batch_size=batch_size)} profiles")
+
+
+@click.command('backfill-achievements')
+@click.option('--batch-size', default=500, show_default=True)
+@click.option('--seed-defaults', is_flag=True, help='Create the default achievements first')
+@with_appcontext
+def backfill_achievements_command(batch_size, seed_defaults):
+    """Evaluate every profile's achievement progress from its counters"""
+    from app.services.achievements import backfill, ensure_default_achievements
+    if seed_defaults:
+        click.echo(f"✓ Created {ensure_default_achievements()} default achievements")
+    processed, unlocked = backfill(batch_size=batch_size)
+    click.echo(f"✓ Evaluated {processed} profiles, {unlocked} achievements unlocked")
+
+
+@click.command('sweep-reset-tokens')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def sweep_reset_tokens_command(batch_size):
+    """Clear expired password reset tokens"""
+    from app.models.auth import User
+    click.echo(f"✓ Cleared {User.sweep_expired_reset_tokens(batch_size=batch_size)} expired reset tokens")
+
+
+@click.command('sweep-sessions')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def sweep_sessions_command(batch_size):
+    """Delete expired sign-in sessions (refresh token families)"""
+    from app.services.sessions import sweep_expired_sessions
+    click.echo(f"✓ Deleted {sweep_expired_sessions(batch_size=batch_size)} expired sessions")
+
+
+@click.command('process-pending-images')
+@with_appcontext
+def process_pending_images_command():
+    """Render variants for uploaded originals that were never processed"""
+    from app.services.images import process_pending
+    click.echo(f"✓ Processed {process_pending(wait=True)} pending images")
+
+
+@click.command('gc-uploads')
+@click.option('--grace-hours', default=24, show_default=True, help='Keep unattached uploads younger than this')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--dry-run', is_flag=True, help='Report what would be deleted without deleting')
+@with_appcontext
+def gc_uploads_command(grace_hours, batch_size, dry_run):
+    """Delete uploaded images that no report, action or profile refers to"""
+    from app.services.upload_gc import collect
+    summary = collect(grace_seconds=grace_hours * 3600, batch_size=batch_size, dry_run=dry_run)
+    verb = 'Would delete' if dry_run else 'Deleted'
+    click.echo(f"✓ {verb} {summary['orphaned']} orphaned files ({summary['orphaned_bytes'] / (1024 * 1024):.1f} MB); "
+               f"scanned {summary['scanned']}, {summary['attached']} attached, {summary['recent']} within grace period")
+
+
+@click.command('purge-rate-limits')
+@click.option('--idle-hours', default=24, show_default=True, help='Delete buckets untouched for this long')
+@with_appcontext
+def purge_rate_limits_command(idle_hours):
+    """Delete idle rate-limit buckets from the SQLite backend"""
+    import time
+    from app.services.rate_limit import SQLiteBackend, get_limiter
+    backend = get_limiter().backend
+    if not isinstance(backend, SQLiteBackend):
+        click.echo("✓ Nothing to purge: this backend expires idle buckets itself")
+        return
+    click.echo(f"✓ Deleted {backend.purge(older_than=time.time() - idle_hours * 3600)} idle rate-limit buckets")
+
+
+@click.command('import-users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--workers', type=int, default=None, help='Hashing processes (default: all cores)')
+@click.option('--dry-run', is_flag=True, help='Validate and report duplicates without writing')
+@with_appcontext
+def import_users_command(csv_file, batch_size, workers, dry_run):
+    """Create users and profiles from a CSV (email, password, full_name, county, area)"""
+    import time
+    from app.services.user_import import import_users, process_hasher
+    start = time.perf_counter()
+    with process_hasher(workers) as hasher:
+        summary = import_users(csv_file, batch_size=batch_size, hasher=hasher, dry_run=dry_run)
+    for duplicate in summary['duplicates']:
+        click.echo(f"  line {duplicate['line']}: {duplicate['email']} skipped ({duplicate['reason']})")
+    for error in summary['errors']:
+        click.echo(f"  line {error['line']}: {error['email'] or '(no email)'}: {error['error']}")
+    verb = 'Would create' if dry_run else 'Created'
+    click.echo(f"✓ {verb} {summary['created']} users in {time.perf_counter() - start:.1f}s "
+               f"({len(summary['duplicates'])} duplicates, {len(summary['errors'])} errors)")
+
+
+def register_commands(app):
+    app.cli.add_command(reconcile_stats_command)
+    app.cli.add_command(geocode_actions_command)
+    app.cli.add_command(refresh_insights_command)
+    app.cli.add_command(trim_activities_command)
+    app.cli.add_command(rollover_monthly_stats_command)
+    app.cli.add_command(backfill_achievements_command)
+    app.cli.add_command(sweep_reset_tokens_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(sweep_sessions_command)
+    app.cli.add_command(process_pending_images_command)
+    app.cli.add_command(gc_uploads_command)
+    app.cli.add_command(purge_rate_limits_command)
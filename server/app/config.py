@@ -6,8 +6,66 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    # Access tokens are short-lived; clients renew them via /api/auth/refresh with the rotating refresh token
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "15")))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "30")))
+    # Seconds between reloads of revoked sessions; window in which a just-rotated refresh token is still honoured
+    REVOCATION_RELOAD_SECONDS = int(os.getenv("REVOCATION_RELOAD_SECONDS", "30"))
+    REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Seconds before in-memory leaderboards are rebuilt from the database
+    LEADERBOARD_REBUILD_SECONDS = int(os.getenv("LEADERBOARD_REBUILD_SECONDS", "600"))
+    # Seconds a persisted dashboard_stats row is served before a background refresh
+    DASHBOARD_STATS_MAX_AGE = int(os.getenv("DASHBOARD_STATS_MAX_AGE", "300"))
+    # Per-county insights: background regeneration interval and in-process read cache TTL
+    INSIGHTS_REFRESH_SECONDS = int(os.getenv("INSIGHTS_REFRESH_SECONDS", "900"))
+    INSIGHTS_CACHE_SECONDS = int(os.getenv("INSIGHTS_CACHE_SECONDS", "60"))
+    # Activity feed: entries kept per personal timeline, days county broadcasts are kept
+    ACTIVITY_TIMELINE_CAP = int(os.getenv("ACTIVITY_TIMELINE_CAP", "50"))
+    COUNTY_ACTIVITY_RETENTION_DAYS = int(os.getenv("COUNTY_ACTIVITY_RETENTION_DAYS", "30"))
+    # Cross-request cache of JWT user/profile snapshots (entries, seconds)
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "1024"))
+    IDENTITY_CACHE_SECONDS = int(os.getenv("IDENTITY_CACHE_SECONDS", "60"))
+    # Per-user profile card cache used by list views (seconds, entries)
+    PROFILE_CARD_CACHE_SECONDS = int(os.getenv("PROFILE_CARD_CACHE_SECONDS", "30"))
+    PROFILE_CARD_CACHE_SIZE = int(os.getenv("PROFILE_CARD_CACHE_SIZE", "10000"))
+    # bcrypt work factor; each +1 doubles hashing time (see benchmark_login.py). Hashes at another cost are upgraded on login
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    # Password hashing pool: concurrent hashes (default min(4, CPUs)), extra waiting jobs, seconds to wait for a slot.
+    # Keep workers + queue below gunicorn's --threads so sign-ins cannot hold every request thread
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "4"))
+    PASSWORD_HASH_WAIT_SECONDS = int(os.getenv("PASSWORD_HASH_WAIT_SECONDS", "5"))
+    # Rate limit buckets: memory:// (per worker), sqlite:////path.db (per host) or redis://host:6379/0 (shared)
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+    RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
+    # Reverse proxies in front of the app (1 on Render) whose X-Forwarded-For is trusted for client IPs
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    # Rows one POST /api/admin/import-users job may hold; it hashes about 3 rows a second in the
+    # background at cost 12, so the default finishes within ~10 minutes. Larger files: `flask import-users`
+    USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", "2000"))
+    # Default request body limit; upload views set their own with @limit_upload
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(4 * 1024 * 1024)))
+    # Largest image (width x height) that will be decoded; bigger ones are refused at upload
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))
+    # Where uploads live: "local" (instance/uploads) or "s3" (any S3-compatible bucket; needs boto3)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+    S3_BUCKET = os.getenv("S3_BUCKET")
+    # Leave empty for AWS; set for MinIO, R2 and other S3-compatible services
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+    S3_REGION = os.getenv("S3_REGION")
+    S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
+    S3_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_ACCESS_KEY")
+    # Public base URL of the bucket or a CDN in front of it; without one, downloads use presigned GETs
+    STORAGE_PUBLIC_URL = os.getenv("STORAGE_PUBLIC_URL")
+    # Lifetime of presigned upload and download URLs
+    PRESIGNED_URL_SECONDS = int(os.getenv("PRESIGNED_URL_SECONDS", "900"))
+    # Processes rendering uploaded image variants (thumb/card/full, JPEG + WebP)
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+    # Hand image bytes to a fronting proxy: "" (send from Python), "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd)
+    IMAGE_SENDFILE = os.getenv("IMAGE_SENDFILE", "").lower()
+    # nginx internal location that aliases instance/uploads/images (for x-accel-redirect)
+    IMAGE_ACCEL_PREFIX = os.getenv("IMAGE_ACCEL_PREFIX", "/_protected/images")
 
 
 class DevelopmentConfig(Config):
@@ -18,6 +76,8 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    RATELIMIT_ENABLED = False
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
 
 
@@ -6,6 +6,7 @@ from flask_bcrypt import Bcrypt
 
 # Naming convention for migrations
 metadata = MetaData(naming_convention={
+    "ix": "ix_%(column_0_label)s",
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 
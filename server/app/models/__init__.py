@@ -1,9 +1,9 @@
 # app/models/__init__.py
-from app.models.profile import Profile
+from app.models.profile import Profile, MonthlyStats
 from app.models.achievements import Achievement, UserAchievement
 from app.models.auth import User
-from app.models.dashboard import DashboardStats, AIIntelligence, RecentActivity
+from app.models.dashboard import DashboardStats, AIIntelligence, RecentActivity, CountyActivity
 from app.models.emergency import EmergencyAlert, EmergencyReport, EmergencyContact
-from app.models.community import CommunityAction, ActionParticipant
+from app.models.community import CommunityAction, ActionParticipant, CommunityStats
 
-__all__ = ["Profile", "Achievement", "UserAchievement", "User", "DashboardStats", "AIIntelligence", "RecentActivity", "EmergencyAlert", "EmergencyReport", "EmergencyContact", "CommunityAction", "ActionParticipant"]
+__all__ = ["Profile", "MonthlyStats", "Achievement", "UserAchievement", "User", "DashboardStats", "AIIntelligence", "RecentActivity", "CountyActivity", "EmergencyAlert", "EmergencyReport", "EmergencyContact", "CommunityAction", "ActionParticipant", "CommunityStats"]
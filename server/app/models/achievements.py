@@ -12,6 +12,10 @@ class Achievement(db.Model,SerializerMixin):
     #"trees_planted","alert_responded"
     requirement_value = db.Column(db.Integer)
 
+    __table_args__ = (
+        db.Index('ix_achievements_requirement_type', 'requirement_type'),
+    )
+
     users = db.relationship("Profile",secondary ="user_achievements",back_populates ="achievements")
 
 class UserAchievement(db.Model,SerializerMixin):
@@ -19,9 +23,13 @@ class UserAchievement(db.Model,SerializerMixin):
     id = db.Column(db.Integer,primary_key =True)
     profile_id = db.Column(db.Integer,db.ForeignKey("profiles.id"))
     achievement_id = db.Column(db.Integer,db.ForeignKey("achievements.id"))
-    unlocked_at = db.Column(db.DateTime,server_default = db.func.now())
+    unlocked_at = db.Column(db.DateTime, nullable=True)  # NULL while still in progress
     progress = db.Column(db.Integer,default =0)
 
+    __table_args__ = (
+        db.Index('ix_user_achievements_profile_id_achievement_id', 'profile_id', 'achievement_id', unique=True),
+    )
+
     achievement = db.relationship("Achievement", overlaps="achievements,users")
 
 
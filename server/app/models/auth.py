@@ -1,4 +1,8 @@
-from app.extensions import db, bcrypt
+import hashlib
+import hmac
+
+from app.extensions import db
+from app.services import passwords
 from sqlalchemy_serializer import SerializerMixin
 from datetime import datetime
 
@@ -9,8 +13,9 @@ class User(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
-    reset_token = db.Column(db.String(100), nullable=True)
-    reset_token_expires = db.Column(db.DateTime, nullable=True)
+    # SHA-256 of the emailed token; the token itself is never stored
+    reset_token_hash = db.Column(db.String(64), nullable=True, unique=True, index=True)
+    reset_token_expires = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -22,38 +27,118 @@ class User(db.Model, SerializerMixin):
     report_comments = db.relationship("ReportComment", back_populates="user", lazy=True)
     # participated_actions = db.relationship("ActionParticipant", back_populates="user", lazy=True)
 
-    serialize_rules = ('-password_hash', '-profile', '-dashboard_stats', '-recent_activities', '-reports', '-report_comments', '-participated_actions')
+    serialize_rules = ('-password_hash', '-reset_token_hash', '-profile', '-dashboard_stats', '-recent_activities', '-reports', '-report_comments', '-participated_actions')
 
     def set_password(self, password: str):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = passwords.hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return passwords.check_password(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True if the stored hash was made with a different BCRYPT_LOG_ROUNDS"""
+        return passwords.needs_rehash(self.password_hash)
+
+    @staticmethod
+    def hash_reset_token(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def find_by_reset_token(cls, token):
+        """User holding this reset token (indexed lookup by hash), or None"""
+        if not token:
+            return None
+        return cls.query.filter_by(reset_token_hash=cls.hash_reset_token(token)).first()
 
     def generate_reset_token(self):
-        """Generate a password reset token"""
+        """Generate a password reset token; only its hash is stored"""
         import secrets
         from datetime import datetime, timedelta
         
-        self.reset_token = secrets.token_urlsafe(32)
+        token = secrets.token_urlsafe(32)
+        self.reset_token_hash = self.hash_reset_token(token)
         self.reset_token_expires = datetime.utcnow() + timedelta(hours=1)  # Token expires in 1 hour
-        return self.reset_token
+        return token
 
     def verify_reset_token(self, token):
         """Verify if the reset token is valid and not expired"""
-        if not self.reset_token or not self.reset_token_expires:
+        if not self.reset_token_hash or not self.reset_token_expires:
             return False
         
         if datetime.utcnow() > self.reset_token_expires:
             return False
         
-        return self.reset_token == token
+        return hmac.compare_digest(self.reset_token_hash, self.hash_reset_token(token))
 
     def clear_reset_token(self):
         """Clear the reset token after use"""
-        self.reset_token = None
+        self.reset_token_hash = None
         self.reset_token_expires = None
 
+    @classmethod
+    def sweep_expired_reset_tokens(cls, batch_size=1000):
+        """Clear expired password reset tokens in primary-key batches (``flask sweep-reset-tokens``)"""
+        now = datetime.utcnow()
+        cleared = 0
+        while True:
+            batch = [user_id for (user_id,) in db.session.query(cls.id)
+                     .filter(cls.reset_token_expires < now)
+                     .order_by(cls.id)
+                     .limit(batch_size)]
+            if not batch:
+                break
+            cleared += cls.query.filter(cls.id.in_(batch)).update(
+                {cls.reset_token_hash: None, cls.reset_token_expires: None}, synchronize_session=False
+            )
+            db.session.commit()
+        return cleared
+
     def __repr__(self):
         return f"<User {self.email}>"
 
+
+class RefreshTokenFamily(db.Model):
+    """One signed-in session. Its refresh token rotates on every use; only the current jti is valid."""
+    __tablename__ = "refresh_token_families"
+
+    id = db.Column(db.Integer, primary_key=True)
+    family_id = db.Column(db.String(32), nullable=False, unique=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    current_jti = db.Column(db.String(36), nullable=False)
+    previous_jti = db.Column(db.String(36), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    rotated_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshTokenFamily {self.family_id} user={self.user_id}>"
+
+
+class UserImportJob(db.Model):
+    """A CSV import queued by POST /api/admin/import-users; the summary is stored when it finishes"""
+    __tablename__ = "user_import_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(32), nullable=False, unique=True, index=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, failed
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    summary = db.Column(db.JSON, nullable=True)  # {'created', 'duplicates', 'errors'}
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'rows': self.rows,
+            **(self.summary or {}),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f"<UserImportJob {self.job_id} {self.status}>"
+
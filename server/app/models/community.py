@@ -20,11 +20,32 @@ class CommunityAction(db.Model, SerializerMixin):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Geocoded from location (or supplied by the client) for proximity queries
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    geo_cell = db.Column(db.String(32), nullable=True)  # grid cell id, see app.services.geo
+
     # Relationships
     participants = db.relationship('ActionParticipant', back_populates='action', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_community_actions_status_date', 'status', 'date'),
+        db.Index('ix_community_actions_geo_cell_date', 'geo_cell', 'date'),
+    )
+
     serialize_rules = ('-participants.action',)
 
+    # Fields shown on list/feed cards; participants are only loaded for detail views
+    card_fields = (
+        'id', 'title', 'description', 'category', 'location', 'date', 'image',
+        'participants_count', 'impact_metric', 'status', 'created_by',
+        'created_at', 'updated_at', 'latitude', 'longitude'
+    )
+
+    def to_card_dict(self):
+        """Compact projection for list views (no participants)"""
+        return self.to_dict(only=self.card_fields)
+
     def __repr__(self):
         return f"<CommunityAction {self.title}>"
 
@@ -36,12 +57,50 @@ class ActionParticipant(db.Model, SerializerMixin):
     action_id = db.Column(db.Integer, db.ForeignKey('community_actions.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    participation_image = db.Column(db.String(500), nullable=True)
+    notes = db.Column(db.Text, nullable=True)
 
     # Relationships
     action = db.relationship('CommunityAction', back_populates='participants')
     user = db.relationship('User', backref='participated_actions')
 
+    __table_args__ = (
+        # Keyset pagination of an action's roster in join order
+        db.Index('ix_action_participants_action_id_joined_at', 'action_id', 'joined_at'),
+        # A user's joins by month for the dashboard
+        db.Index('ix_action_participants_user_id_joined_at', 'user_id', 'joined_at'),
+    )
+
     serialize_rules = ('-action.participants', '-user.participated_actions')
 
     def __repr__(self):
         return f"<ActionParticipant user_id={self.user_id} action_id={self.action_id}>"
+
+
+class CommunityStats(db.Model, SerializerMixin):
+    __tablename__ = "community_stats"
+
+    # Single row keyed by GLOBAL_ID; maintained incrementally by the community routes
+    GLOBAL_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_actions = db.Column(db.Integer, default=0, nullable=False)
+    active_actions = db.Column(db.Integer, default=0, nullable=False)
+    total_participants = db.Column(db.Integer, default=0, nullable=False)
+    total_community_impact = db.Column(db.Integer, default=0, nullable=False)
+    total_impact_points = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'total_actions': self.total_actions,
+            'active_actions': self.active_actions,
+            'total_participants': self.total_participants,
+            'total_community_impact': self.total_community_impact,
+            'total_impact_points': self.total_impact_points,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f"<CommunityStats actions={self.total_actions} participants={self.total_participants}>"
@@ -9,6 +9,11 @@ class DashboardStats(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     
+    __table_args__ = (
+        # One cached row per user, read by user_id on every dashboard load
+        db.Index('ix_dashboard_stats_user_id', 'user_id', unique=True),
+    )
+    
     # Quick Stats (cached for performance)
     total_issues_reported = db.Column(db.Integer, default=0)
     total_actions_joined = db.Column(db.Integer, default=0)
@@ -60,9 +65,14 @@ class AIIntelligence(db.Model, SerializerMixin):
     description = db.Column(db.Text, nullable=False)
     severity = db.Column(db.String(20), default="info")  # info, warning, critical
     is_active = db.Column(db.Boolean, default=True)
+    is_generated = db.Column(db.Boolean, default=False, nullable=False, server_default=db.false())  # written by the insight job
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime)
     
+    __table_args__ = (
+        db.Index('ix_ai_intelligence_user_county_is_active', 'user_county', 'is_active'),
+    )
+    
     serialize_rules = ()
     
     def to_dict(self):
@@ -83,27 +93,21 @@ class AIIntelligence(db.Model, SerializerMixin):
         return f"<AIIntelligence {self.insight_type} for {self.user_county}>"
 
 
-class RecentActivity(db.Model, SerializerMixin):
-    __tablename__ = "recent_activities"
-    
-    id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
-    activity_type = db.Column(db.String(50), nullable=False)  # report, community, alert
-    title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    serialize_rules = ('-user',)
+class ActivityMixin:
+    """Shared rendering for personal and county-wide feed entries"""
     
     def to_dict(self):
         return {
-            'id': self.id,
+            'id': self.feed_id(),
             'type': self.activity_type,
             'title': self.title,
             'description': self.description,
             'time': self.get_relative_time()
         }
     
+    def feed_id(self):
+        return self.id
+    
     def get_relative_time(self):
         now = datetime.utcnow()
         diff = now - self.timestamp
@@ -115,4 +119,43 @@ class RecentActivity(db.Model, SerializerMixin):
             return f"{hours}h ago"
         else:
             minutes = diff.seconds // 60
-            return f"{minutes}m ago"
\ No newline at end of file
+            return f"{minutes}m ago"
+
+
+class RecentActivity(ActivityMixin, db.Model, SerializerMixin):
+    """Personal timeline entry (fan-out on write, capped per user)"""
+    __tablename__ = "recent_activities"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    activity_type = db.Column(db.String(50), nullable=False)  # report, community, alert
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_recent_activities_user_id_timestamp', 'user_id', 'timestamp'),
+    )
+    
+    serialize_rules = ('-user',)
+
+
+class CountyActivity(ActivityMixin, db.Model, SerializerMixin):
+    """County-wide broadcast entry, stored once and merged into timelines on read"""
+    __tablename__ = "county_activities"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    county = db.Column(db.String(100), nullable=False)  # normalised, without ' County'
+    actor_user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)  # hidden from the actor's own feed
+    activity_type = db.Column(db.String(50), nullable=False)  # report, alert
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_county_activities_county_timestamp', 'county', 'timestamp'),
+    )
+    
+    def feed_id(self):
+        # Distinct from personal entry ids in the merged feed
+        return f"county-{self.id}"
@@ -68,4 +68,33 @@ class Profile(db.Model, SerializerMixin):
         return "0 months"
 
     def __repr__(self):
-        return f"<Profile user_id={self.user_id}, name={self.full_name}>"
\ No newline at end of file
+        return f"<Profile user_id={self.user_id}, name={self.full_name}>"
+
+class MonthlyStats(db.Model, SerializerMixin):
+    """Per-user activity counts for one calendar month (``month`` is its first day)"""
+    __tablename__ = "monthly_user_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    month = db.Column(db.Date, nullable=False)
+
+    issues = db.Column(db.Integer, nullable=False, default=0)
+    alerts = db.Column(db.Integer, nullable=False, default=0)
+    impact = db.Column(db.Integer, nullable=False, default=0)
+    trees = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'month', name='uq_monthly_user_stats_user_id_month'),
+    )
+
+    def to_dict(self):
+        return {
+            "month": self.month.strftime("%Y-%m"),
+            "issues": self.issues,
+            "alerts": self.alerts,
+            "impact": self.impact,
+            "trees": self.trees
+        }
+
+    def __repr__(self):
+        return f"<MonthlyStats user_id={self.user_id}, month={self.month}>"
@@ -38,6 +38,12 @@ class Report(db.Model, SerializerMixin):
     ai_confidence = db.Column(db.Float, nullable=True)
     suggested_actions = db.Column(db.JSON, default=list)
     
+    __table_args__ = (
+        # Per-user and per-county monthly counts for the dashboard
+        db.Index('ix_reports_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_reports_county_created_at', 'county', 'created_at'),
+    )
+    
     # Relationships
     user = db.relationship("User", back_populates="reports")
     comments = db.relationship("ReportComment", back_populates="report", cascade="all, delete-orphan")
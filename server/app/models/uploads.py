@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ImageBlob(db.Model):
+    """One stored image, keyed by the SHA-256 of its uploaded bytes. Shared by every owner who uploaded it."""
+    __tablename__ = "image_blobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    extension = db.Column(db.String(10), nullable=False)  # of the original upload
+    byte_size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<ImageBlob {self.digest[:12]} refs={self.ref_count}>"
+
+
+class ImageReference(db.Model):
+    """An owner's claim on a blob; released claims leave the files to gc-uploads"""
+    __tablename__ = "image_references"
+
+    id = db.Column(db.Integer, primary_key=True)
+    blob_id = db.Column(db.Integer, db.ForeignKey("image_blobs.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_image_references_user_id_blob_id', 'user_id', 'blob_id', unique=True),
+    )
+
+    blob = db.relationship("ImageBlob")
+
+    def __repr__(self):
+        return f"<ImageReference user={self.user_id} blob={self.blob_id}>"
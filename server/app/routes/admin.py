@@ -1,5 +1,8 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.extensions import db
+from app.services.upload_limits import limit_upload
+import io
 import os
 
 bp = Blueprint('admin', __name__, url_prefix='/api/admin')
@@ -38,6 +41,10 @@ def delete_all_actions():
         # Delete all actions
         CommunityAction.query.delete()
         
+        # Rebuild materialized stats in the same transaction
+        from app.services.community_stats import reconcile_stats
+        reconcile_stats(commit=False)
+        
         # Commit the changes
         db.session.commit()
         
@@ -55,6 +62,129 @@ def delete_all_actions():
             'error': f'Failed to delete actions: {str(e)}'
         }), 500
 
+@bp.route('/reconcile-stats', methods=['POST'])
+def reconcile_community_stats():
+    """Recompute materialized community statistics from source tables"""
+    try:
+        # Check for admin token
+        admin_token = request.headers.get('X-Admin-Token')
+        if admin_token != os.getenv('ADMIN_TOKEN', 'admin123'):
+            return jsonify({
+                'success': False,
+                'error': 'Unauthorized'
+            }), 401
+        
+        from app.services.community_stats import reconcile_stats
+        stats = reconcile_stats()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Community stats reconciled',
+            'stats': stats.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to reconcile stats: {str(e)}'
+        }), 500
+
+MAX_IMPORT_SIZE = 1024 * 1024  # Plenty for a dry run; real imports are capped by USER_IMPORT_MAX_ROWS
+
+@bp.route('/import-users', methods=['POST'])
+@limit_upload(MAX_IMPORT_SIZE)
+def import_users_csv():
+    """Validate an uploaded CSV (dry run) or queue it for import; poll the returned job_id"""
+    try:
+        # Check for admin token
+        admin_token = request.headers.get('X-Admin-Token')
+        if admin_token != os.getenv('ADMIN_TOKEN', 'admin123'):
+            return jsonify({
+                'success': False,
+                'error': 'Unauthorized'
+            }), 401
+        
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({
+                'success': False,
+                'error': 'Upload the CSV as multipart field "file"'
+            }), 400
+        
+        from app.services.user_import import count_rows, import_users, start_import_job
+        text = upload.stream.read().decode('utf-8-sig')
+        
+        # A dry run hashes nothing, so it is answered straight away
+        if request.args.get('dry_run', 'false').lower() == 'true':
+            summary = import_users(io.StringIO(text, newline=''), dry_run=True)
+            return jsonify({
+                'success': True,
+                **summary
+            }), 200
+        
+        max_rows = current_app.config['USER_IMPORT_MAX_ROWS']
+        if count_rows(io.StringIO(text, newline='')) > max_rows:
+            return jsonify({
+                'success': False,
+                'error': f'Too many rows for one import (maximum {max_rows}). '
+                         f'Split the file, or use the command line: flask import-users FILE'
+            }), 413
+        
+        job = start_import_job(text)
+        return jsonify({
+            'success': True,
+            **job.to_dict()
+        }), 202
+        
+    except RequestEntityTooLarge:
+        return jsonify({
+            'success': False,
+            'error': f'CSV too large. Maximum size is {MAX_IMPORT_SIZE // (1024*1024)}MB; use the import-users command'
+        }), 413
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to import users: {str(e)}'
+        }), 500
+
+@bp.route('/import-users/<job_id>', methods=['GET'])
+def get_import_job(job_id):
+    """Progress and, once done, the summary of a queued user import"""
+    try:
+        # Check for admin token
+        admin_token = request.headers.get('X-Admin-Token')
+        if admin_token != os.getenv('ADMIN_TOKEN', 'admin123'):
+            return jsonify({
+                'success': False,
+                'error': 'Unauthorized'
+            }), 401
+        
+        from app.models.auth import UserImportJob
+        job = UserImportJob.query.filter_by(job_id=job_id).first()
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Import job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            **job.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Failed to load import job: {str(e)}'
+        }), 500
+
 @bp.route('/reset-action-ids', methods=['POST'])
 def reset_action_ids():
     """Reset action ID sequence (PostgreSQL)"""
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
 from app.schemas.ai import chat_request_schema, chat_response_schema
+from app.services.rate_limit import rate_limit
 import os
 from dotenv import load_dotenv
 
@@ -81,6 +82,7 @@ def status():
 
 
 @bp.route('/chat', methods=['POST'])
+@rate_limit("20/minute", key="user")
 def chat():
     try:
         data = chat_request_schema.load(request.get_json() or {})
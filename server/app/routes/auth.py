@@ -1,9 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from app.extensions import db
 from app.models.auth import User
 from app.models.profile import Profile
 from app.schemas.auth import register_schema, login_schema, user_schema
+from app.services.events import emit, IMPACT_POINTS_CHANGED
+from app.services.identity import current_identity
+from app.services.passwords import PasswordHasherBusy
+from app.services.rate_limit import rate_limit
+from app.services.sessions import start_session, rotate, revoke_families, revoke_user_sessions, RefreshRejected
 from marshmallow import ValidationError
 import secrets
 import hashlib
@@ -14,6 +19,7 @@ bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
 @bp.route('/register', methods=['POST'])
+@rate_limit("10/hour", key="ip")
 def register():
     try:
         print(f"Registration attempt - Raw data: {request.get_json()}")
@@ -37,15 +43,15 @@ def register():
         print(f"Creating profile for user {user.id} with name: {data.get('full_name')}")
         profile = Profile(user_id=user.id, full_name=data.get('full_name'))
         db.session.add(profile)
+        tokens = start_session(user.id)
         db.session.commit()
         print(f"Profile created with ID: {profile.id}")
-
-        token = create_access_token(identity=str(user.id))
+        emit(IMPACT_POINTS_CHANGED, user_id=user.id, county=profile.county, impact_points=profile.impact_points)
         print(f"Token created successfully")
         
         response_data = {
             'success': True,
-            'token': token,
+            **tokens,
             'user': {
                 'id': user.id,
                 'email': user.email,
@@ -63,6 +69,9 @@ def register():
     except ValidationError as e:
         print(f"Validation error: {e.messages}")
         return jsonify({'success': False, 'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"Registration error: {str(e)}")
         import traceback
@@ -72,6 +81,7 @@ def register():
 
 
 @bp.route('/login', methods=['POST'])
+@rate_limit("10/minute", key="ip")
 def login():
     try:
         data = login_schema.load(request.get_json() or {})
@@ -82,32 +92,70 @@ def login():
         if not user.check_password(data['password']):
             return jsonify({'success': False, 'error': 'Incorrect password. Please try again or use "Forgot Password" if you need to reset it.'}), 401
 
-        token = create_access_token(identity=str(user.id))
+        # Move the stored hash to the current work factor while we have the password
+        if user.password_needs_rehash():
+            try:
+                user.set_password(data['password'])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Password rehash failed for user {user.id}: {e}")
+
+        tokens = start_session(user.id)
+        db.session.commit()
 
         profile = Profile.query.filter_by(user_id=user.id).first()
         return jsonify({
             'success': True,
-            'token': token,
+            **tokens,
             'user': {
                 'id': user.id,
                 'email': user.email,
                 'created_at': user.created_at.isoformat() if user.created_at else None
             },
-            'profile': profile.to_dict() if profile and hasattr(profile, 'to_dict') else None
+            'profile': profile.to_dict() if profile else None
         }), 200
     except ValidationError as e:
         return jsonify({'success': False, 'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@bp.route('/refresh', methods=['POST'])
+@rate_limit("30/minute", key="ip")
+@jwt_required(refresh=True)
+def refresh():
+    """Swap a refresh token for a new access/refresh pair (no password needed)"""
+    try:
+        return jsonify({'success': True, **rotate(get_jwt())}), 200
+    except RefreshRejected as e:
+        return jsonify({'success': False, 'error': str(e)}), 401
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """End the session of the presented access or refresh token"""
+    try:
+        revoke_families([get_jwt().get('fam')])
+        return jsonify({'success': True, 'message': 'Signed out'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @bp.route('/me', methods=['GET'])
 @jwt_required()
 def me():
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get_or_404(user_id)
-        profile = Profile.query.filter_by(user_id=user_id).first()
+        user, profile = current_identity()
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         return jsonify({
             'success': True,
             'user': {
@@ -115,7 +163,7 @@ def me():
                 'email': user.email,
                 'created_at': user.created_at.isoformat() if user.created_at else None
             },
-            'profile': profile.to_dict() if profile and hasattr(profile, 'to_dict') else None
+            'profile': profile.to_dict() if profile else None
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -183,7 +231,7 @@ def reset_password():
             }), 400
         
         # Find user with this token
-        user = User.query.filter_by(reset_token=token).first()
+        user = User.find_by_reset_token(token)
         
         if not user or not user.verify_reset_token(token):
             return jsonify({
@@ -195,6 +243,8 @@ def reset_password():
         user.set_password(password)
         user.clear_reset_token()
         db.session.commit()
+        # Sign out every existing session of this account
+        revoke_user_sessions(user.id)
         
         return jsonify({
             'success': True,
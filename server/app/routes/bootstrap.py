@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models.emergency import EmergencyAlert
+from app.services.activity_feed import count_since
+from app.services.dashboard_data import build_dashboard_data
+from app.services.dashboard_stats import county_name
+from app.services.dates import parse_iso_datetime
+from app.services.identity import current_identity
+
+bp = Blueprint('bootstrap', __name__, url_prefix='/api/bootstrap')
+
+SECTIONS = ('user', 'profile', 'dashboard', 'unread')
+DEFAULT_UNREAD_WINDOW = timedelta(hours=24)
+
+
+def parse_since(value):
+    """ISO timestamp of the client's last visit; defaults to the last 24 hours"""
+    if not value:
+        return datetime.utcnow() - DEFAULT_UNREAD_WINDOW
+    return parse_iso_datetime(value)
+
+
+def unread_counts(user_id, county, since):
+    name = county_name(county)
+    alerts = db.session.query(db.func.count(EmergencyAlert.id)).filter(
+        EmergencyAlert.is_active == True,
+        EmergencyAlert.county.ilike(f"%{name}%"),
+        EmergencyAlert.created_at > since
+    ).scalar() if name else 0
+
+    return {
+        'activities': count_since(user_id, county, since),
+        'alerts': alerts,
+        'since': since.isoformat()
+    }
+
+
+@bp.route('', methods=['GET'])
+@jwt_required()
+def bootstrap():
+    """Everything the client needs for first paint in one request"""
+    try:
+        fields = request.args.get('fields')
+        sections = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(SECTIONS)
+        unknown = [f for f in sections if f not in SECTIONS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(SECTIONS)}"
+            }), 400
+        
+        try:
+            since = parse_since(request.args.get('since'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'since must be an ISO 8601 datetime'}), 400
+        
+        # User and profile resolved once (at most one joined query), reused by every section below
+        user_id = int(get_jwt_identity())
+        user, profile = current_identity()
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        data = {'success': True}
+        if 'user' in sections:
+            data['user'] = {
+                'id': user.id,
+                'email': user.email,
+                'created_at': user.created_at.isoformat() if user.created_at else None
+            }
+        if 'profile' in sections:
+            data['profile'] = profile.to_dict() if profile else None
+        if 'dashboard' in sections:
+            data['dashboard'] = build_dashboard_data(user_id, profile) if profile else None
+        if 'unread' in sections:
+            data['unread'] = unread_counts(user_id, profile.county if profile else None, since)
+        
+        return jsonify(data), 200
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
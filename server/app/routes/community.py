@@ -1,14 +1,33 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, make_response, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.community import CommunityAction, ActionParticipant
-from app.schemas.community import CommunityActionCreate, CommunityActionUpdate
+from app.models.profile import Profile
+from app.schemas.community import CommunityActionCreate, CommunityActionUpdate, BatchCheckIn
+from app.services.community_stats import get_stats as get_community_stats, apply_stats_delta
+from app.services.community_events import assign_geo, find_upcoming, MAX_RADIUS_KM
+from app.services.dates import parse_iso_datetime
+from app.services import monthly_stats
+from app.services.events import emit, IMPACT_POINTS_CHANGED, ACTION_JOINED, ACTION_LEFT
+from app.services.checkin import check_in, make_checkin_code, read_checkin_code
+from app.services.roster import roster_page, iter_roster_csv, encode_cursor, decode_cursor, row_to_dict
 from datetime import datetime
 from pydantic import ValidationError
+import hashlib
 
 bp = Blueprint('community', __name__, url_prefix='/api/community')
 
 
+def feed_etag(query):
+    """Build an ETag for a filtered action list from max(updated_at) and row count"""
+    last_updated, total = query.with_entities(
+        db.func.max(CommunityAction.updated_at),
+        db.func.count(CommunityAction.id)
+    ).one()
+    stamp = f"{last_updated.isoformat() if last_updated else ''}:{total}"
+    return hashlib.sha1(stamp.encode('utf-8')).hexdigest()
+
+
 @bp.route('/actions', methods=['GET'])
 def get_actions():
     """Get all community actions with optional filtering"""
@@ -35,12 +54,72 @@ def get_actions():
                 )
             )
         
+        # Cheap aggregate over the filtered set; unchanged feed means 304 without serializing
+        etag = feed_etag(query)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+        
         # Order by date
         actions = query.order_by(CommunityAction.date.desc()).all()
         
+        response = make_response(jsonify({
+            'success': True,
+            'actions': [action.to_card_dict() for action in actions],
+            'count': len(actions)
+        }), 200)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/actions/upcoming', methods=['GET'])
+def get_upcoming_actions():
+    """Get active actions in a date window, optionally within radius_km of lat/lng"""
+    try:
+        try:
+            start = parse_iso_datetime(request.args['from']) if request.args.get('from') else None
+            end = parse_iso_datetime(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'from and to must be ISO 8601 dates'
+            }), 400
+        
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        radius_km = request.args.get('radius_km', type=float)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        
+        if (lat is None) != (lng is None):
+            return jsonify({
+                'success': False,
+                'error': 'lat and lng must be provided together'
+            }), 400
+        if radius_km is not None and not 0 < radius_km <= MAX_RADIUS_KM:
+            return jsonify({
+                'success': False,
+                'error': f'radius_km must be between 0 and {MAX_RADIUS_KM}'
+            }), 400
+        
+        results = find_upcoming(start, end, lat, lng, radius_km, limit)
+        
+        actions = []
+        for action, distance in results:
+            card = action.to_card_dict()
+            card['distance_km'] = distance
+            actions.append(card)
+        
         return jsonify({
             'success': True,
-            'actions': [action.to_dict() for action in actions],
+            'actions': actions,
             'count': len(actions)
         }), 200
         
@@ -107,6 +186,7 @@ def create_action():
             impact_metric=validated_data.impact_metric,
             created_by=current_user_id
         )
+        assign_geo(action, validated_data.latitude, validated_data.longitude)
         
         # Update user profile statistics for creating an action
         from app.models.profile import Profile
@@ -115,9 +195,19 @@ def create_action():
             profile.community_impact += 2  # More points for creating actions
             profile.impact_this_month += 2
             profile.impact_points += 20  # Award more points for creating actions
+            monthly_stats.increment(current_user_id, impact=2)
         
         db.session.add(action)
+        apply_stats_delta(
+            total_actions=1,
+            active_actions=1 if action.status in (None, 'active') else 0,
+            total_community_impact=2 if profile else 0,
+            total_impact_points=20 if profile else 0
+        )
+        points_event = dict(user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points) if profile else None
         db.session.commit()
+        if points_event:
+            emit(IMPACT_POINTS_CHANGED, **points_event)
         
         return jsonify({
             'success': True,
@@ -138,7 +228,7 @@ def create_action():
 def update_action(action_id):
     """Update an existing community action"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         action = CommunityAction.query.get(action_id)
         
         if not action:
@@ -175,14 +265,18 @@ def update_action(action_id):
             action.category = validated_data.category
         if validated_data.location:
             action.location = validated_data.location
+        if validated_data.location or validated_data.latitude is not None:
+            assign_geo(action, validated_data.latitude, validated_data.longitude)
         if validated_data.date:
             action.date = datetime.fromisoformat(validated_data.date.replace('Z', '+00:00'))
         if validated_data.image is not None:
             action.image = validated_data.image
         if validated_data.impact_metric is not None:
             action.impact_metric = validated_data.impact_metric
-        if validated_data.status:
+        if validated_data.status and validated_data.status != action.status:
+            was_active = action.status == 'active'
             action.status = validated_data.status
+            apply_stats_delta(active_actions=int(action.status == 'active') - int(was_active))
         
         db.session.commit()
         
@@ -205,7 +299,7 @@ def update_action(action_id):
 def delete_action(action_id):
     """Delete a community action"""
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         action = CommunityAction.query.get(action_id)
         
         if not action:
@@ -221,6 +315,11 @@ def delete_action(action_id):
                 'error': 'Unauthorized to delete this action'
             }), 403
         
+        apply_stats_delta(
+            total_actions=-1,
+            active_actions=-1 if action.status == 'active' else 0,
+            total_participants=-(action.participants_count or 0)
+        )
         db.session.delete(action)
         db.session.commit()
         
@@ -282,9 +381,19 @@ def join_action(action_id):
             profile.community_impact += 1
             profile.impact_this_month += 1
             profile.impact_points += 10  # Award points for joining actions
+            monthly_stats.increment(current_user_id, alerts=1, impact=1)
         
         db.session.add(participant)
+        apply_stats_delta(
+            total_participants=1,
+            total_community_impact=1 if profile else 0,
+            total_impact_points=10 if profile else 0
+        )
+        points_event = dict(user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points) if profile else None
         db.session.commit()
+        emit(ACTION_JOINED, user_id=int(current_user_id), action_id=action_id)
+        if points_event:
+            emit(IMPACT_POINTS_CHANGED, **points_event)
         
         return jsonify({
             'success': True,
@@ -327,27 +436,42 @@ def leave_action(action_id):
                 'error': 'You are not currently participating in this action. You can only leave actions you have joined.'
             }), 400
         
+        # Track what was actually decremented so community stats stay in step
+        stats_delta = {}
+        
         # Update participants count
         if action.participants_count > 0:
             action.participants_count -= 1
+            stats_delta['total_participants'] = -1
         
         # Update user profile statistics
         from app.models.profile import Profile
         profile = Profile.query.filter_by(user_id=current_user_id).first()
         if profile:
+            # Monthly counters only give back a join made this month
+            joined_this_month = participant.joined_at is None or participant.joined_at.date() >= monthly_stats.month_start()
             if profile.alerts_responded > 0:
                 profile.alerts_responded -= 1
-            if profile.alerts_this_month > 0:
+            if joined_this_month and profile.alerts_this_month > 0:
                 profile.alerts_this_month -= 1
             if profile.community_impact > 0:
                 profile.community_impact -= 1
-            if profile.impact_this_month > 0:
+                stats_delta['total_community_impact'] = -1
+            if joined_this_month and profile.impact_this_month > 0:
                 profile.impact_this_month -= 1
+            if joined_this_month:
+                monthly_stats.increment(current_user_id, alerts=-1, impact=-1)
             if profile.impact_points >= 10:
                 profile.impact_points -= 10
+                stats_delta['total_impact_points'] = -10
         
         db.session.delete(participant)
+        apply_stats_delta(**stats_delta)
+        points_event = dict(user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points) if profile else None
         db.session.commit()
+        emit(ACTION_LEFT, user_id=int(current_user_id), action_id=action_id)
+        if points_event:
+            emit(IMPACT_POINTS_CHANGED, **points_event)
         
         return jsonify({
             'success': True,
@@ -362,6 +486,170 @@ def leave_action(action_id):
         }), 500
 
 
+def get_organized_action(action_id):
+    """Load an action and check the current user organizes it; returns (action, error_response)"""
+    action = CommunityAction.query.get(action_id)
+    if not action:
+        return None, (jsonify({
+            'success': False,
+            'error': 'Action not found'
+        }), 404)
+    
+    if action.created_by != int(get_jwt_identity()):
+        return None, (jsonify({
+            'success': False,
+            'error': 'Only the organizer can manage participants for this action'
+        }), 403)
+    
+    return action, None
+
+
+@bp.route('/actions/<int:action_id>/participants', methods=['GET'])
+@jwt_required()
+def get_participants(action_id):
+    """Get a page of an action's participants (organizer only), keyset-paginated"""
+    try:
+        action, error = get_organized_action(action_id)
+        if error:
+            return error
+        
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+        cursor = request.args.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid cursor'
+            }), 400
+        
+        rows = roster_page(action_id, after, limit)
+        next_cursor = encode_cursor(rows[-1].joined_at, rows[-1].id) if len(rows) == limit else None
+        
+        return jsonify({
+            'success': True,
+            'participants': [row_to_dict(row) for row in rows],
+            'count': len(rows),
+            'total': action.participants_count,
+            'next_cursor': next_cursor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/actions/<int:action_id>/participants/export', methods=['GET'])
+@jwt_required()
+def export_participants(action_id):
+    """Stream an action's full participant roster as CSV (organizer only)"""
+    try:
+        action, error = get_organized_action(action_id)
+        if error:
+            return error
+        
+        filename = f"action-{action_id}-participants.csv"
+        return Response(
+            stream_with_context(iter_roster_csv(action_id)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/actions/<int:action_id>/check-in-code', methods=['GET'])
+@jwt_required()
+def get_check_in_code(action_id):
+    """Get the signed payload the current user shows (as a QR code) at the event"""
+    try:
+        action = CommunityAction.query.get(action_id)
+        if not action:
+            return jsonify({
+                'success': False,
+                'error': 'Action not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'qr_payload': make_checkin_code(action_id, get_jwt_identity())
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/actions/<int:action_id>/check-in', methods=['POST'])
+@jwt_required()
+def batch_check_in(action_id):
+    """Check in many participants at once (organizer only)"""
+    try:
+        action, error = get_organized_action(action_id)
+        if error:
+            return error
+        
+        try:
+            validated_data = BatchCheckIn(**(request.get_json() or {}))
+        except ValidationError as e:
+            return jsonify({
+                'success': False,
+                'error': 'Validation error',
+                'details': e.errors()
+            }), 400
+        
+        results = []
+        user_ids = list(validated_data.user_ids)
+        for payload in validated_data.qr_payloads:
+            user_id = read_checkin_code(payload, action_id)
+            if user_id is None:
+                results.append({'qr_payload': payload, 'status': 'invalid_code'})
+            else:
+                user_ids.append(user_id)
+        
+        outcomes, joined_ids = check_in(
+            action,
+            user_ids,
+            participation_image=validated_data.participation_image,
+            notes=validated_data.notes
+        )
+        
+        # New point totals for the leaderboard, read once for the whole batch
+        points_events = [
+            dict(user_id=row.user_id, county=row.county, impact_points=row.impact_points)
+            for row in db.session.query(Profile.user_id, Profile.county, Profile.impact_points)
+            .filter(Profile.user_id.in_(joined_ids))
+        ] if joined_ids else []
+        db.session.commit()
+        for user_id in joined_ids:
+            emit(ACTION_JOINED, user_id=user_id, action_id=action_id)
+        for points_event in points_events:
+            emit(IMPACT_POINTS_CHANGED, **points_event)
+        
+        results.extend({'user_id': user_id, 'status': status} for user_id, status in outcomes.items())
+        
+        return jsonify({
+            'success': True,
+            'checked_in': len(joined_ids),
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @bp.route('/my-actions', methods=['GET'])
 @jwt_required()
 def get_my_actions():
@@ -378,7 +666,7 @@ def get_my_actions():
         
         return jsonify({
             'success': True,
-            'actions': [action.to_dict() for action in actions],
+            'actions': [action.to_card_dict() for action in actions],
             'count': len(actions)
         }), 200
         
@@ -391,17 +679,13 @@ def get_my_actions():
 
 @bp.route('/stats', methods=['GET'])
 def get_stats():
-    """Get community statistics"""
+    """Get community statistics from the materialized stats row"""
     try:
-        active_actions = CommunityAction.query.filter_by(status='active').count()
-        total_participants = db.session.query(db.func.sum(CommunityAction.participants_count)).scalar() or 0
+        stats = get_community_stats()
         
         return jsonify({
             'success': True,
-            'stats': {
-                'active_actions': active_actions,
-                'total_participants': total_participants
-            }
+            'stats': stats.to_dict()
         }), 200
         
     except Exception as e:
@@ -3,12 +3,14 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_req
 from app.extensions import db
 from app.models.contact import ContactMessage
 from app.schemas.contact import ContactMessageCreate
+from app.services.rate_limit import rate_limit
 from pydantic import ValidationError
 
 bp = Blueprint('contact', __name__, url_prefix='/api/contact')
 
 
 @bp.route('/messages', methods=['POST'])
+@rate_limit("5/hour", key="ip")
 def create_message():
     """Create a new contact message (public endpoint)"""
     try:
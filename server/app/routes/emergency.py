@@ -8,6 +8,8 @@ from app.schemas.emergency import (
     emergency_report_schema, emergency_reports_schema,
     emergency_contact_schema, emergency_contacts_schema
 )
+from app.services.events import emit, ALERT_ISSUED
+from app.services.identity import current_identity
 from marshmallow import ValidationError
 from datetime import datetime
 import os
@@ -103,11 +105,9 @@ def generate_ai_insights(location="Nairobi County", area=None):
 def get_user_location():
     """Get user location from their profile."""
     try:
-        current_user_id = get_jwt_identity()
-        if current_user_id:
-            user = User.query.get(current_user_id)
-            if user and user.profile:
-                return user.profile.county or "Nairobi County", user.profile.area
+        user, profile = current_identity()
+        if profile:
+            return profile.county or "Nairobi County", profile.area
     except:
         pass
     return "Nairobi County", None
@@ -376,6 +376,7 @@ def create_alert():
         alert = EmergencyAlert(**validated_data)
         db.session.add(alert)
         db.session.commit()
+        emit(ALERT_ISSUED, alert_id=alert.id, county=alert.county)
         
         return jsonify({
             'success': True,
@@ -0,0 +1,74 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.profile_cards import get_cards
+from app.services.dashboard_stats import county_name
+from app.services.leaderboard import get_registry
+
+bp = Blueprint('leaderboard', __name__, url_prefix='/api/leaderboard')
+
+
+@bp.route('', methods=['GET'])
+def get_leaderboard():
+    """Get the top-N members nationally or for a county"""
+    try:
+        county = county_name(request.args.get('county')) or None
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        
+        entries = get_registry().top(county, limit)
+        
+        # Display names from the shared card cache (one IN query for misses)
+        profiles = get_cards([user_id for _, user_id in entries])
+        
+        leaders = []
+        rank = 0
+        previous_points = None
+        for position, (points, user_id) in enumerate(entries, start=1):
+            if points != previous_points:
+                rank, previous_points = position, points
+            profile = profiles.get(user_id)
+            leaders.append({
+                'rank': rank,
+                'user_id': user_id,
+                'full_name': profile['full_name'] if profile else None,
+                'avatar_url': profile['avatar_url'] if profile else None,
+                'county': profile['county'] if profile else None,
+                'impact_points': points
+            })
+        
+        return jsonify({
+            'success': True,
+            'county': county,
+            'leaders': leaders
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/me', methods=['GET'])
+@jwt_required()
+def get_my_rank():
+    """Get the current user's national and county rank"""
+    try:
+        user_id = int(get_jwt_identity())
+        rank = get_registry().rank(user_id)
+        
+        if rank is None:
+            return jsonify({
+                'success': False,
+                'error': 'Profile not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'rank': rank
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
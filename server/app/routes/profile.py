@@ -3,6 +3,9 @@ from app.extensions import db
 from app.models.profile import Profile
 from app.models.auth import User
 from app.models.achievements import Achievement, UserAchievement
+from app.services import achievements, monthly_stats
+from app.services.profile_cards import get_cards, MAX_BATCH_IDS
+from app.services.events import emit, IMPACT_POINTS_CHANGED, PROFILE_UPDATED
 from datetime import datetime
 
 # Define the blueprint
@@ -17,10 +20,37 @@ def get_profiles_root():
         "endpoints": {
             "get_profile": "GET /api/profile/<user_id>",
             "update_profile": "PUT /api/profile/<user_id>", 
-            "update_stats": "PATCH /api/profile/<user_id>/stats"
+            "update_stats": "PATCH /api/profile/<user_id>/stats",
+            "monthly_stats": "GET /api/profile/<user_id>/monthly",
+            "achievements": "GET /api/profile/<user_id>/achievements",
+            "batch": "GET /api/profile/batch?ids=1,2,3"
         }
     }), 200
 
+@profile_bp.route("/batch", methods=["GET"])
+def get_profile_batch():
+    """Get compact profile cards for many users (one IN query, cached per ID)"""
+    try:
+        raw_ids = [part.strip() for part in request.args.get("ids", "").split(",") if part.strip()]
+        if not raw_ids:
+            return jsonify({"error": "ids is required, e.g. ?ids=1,2,3"}), 400
+        try:
+            user_ids = list(dict.fromkeys(int(part) for part in raw_ids))
+        except ValueError:
+            return jsonify({"error": "ids must be comma-separated integers"}), 400
+        if len(user_ids) > MAX_BATCH_IDS:
+            return jsonify({"error": f"At most {MAX_BATCH_IDS} ids per request"}), 400
+        
+        cards = get_cards(user_ids)
+        
+        return jsonify({
+            "profiles": [cards[user_id] for user_id in user_ids if cards[user_id]],
+            "missing": [user_id for user_id in user_ids if not cards[user_id]]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @profile_bp.route("/<int:user_id>", methods=["GET"])
 def get_profile(user_id):
     """Get profile by user ID"""
@@ -35,6 +65,38 @@ def get_profile(user_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@profile_bp.route("/<int:user_id>/monthly", methods=["GET"])
+def get_monthly_stats(user_id):
+    """Get this month vs last month, plus recent monthly history"""
+    try:
+        months = min(max(request.args.get("months", 6, type=int), 2), 24)
+        buckets = monthly_stats.get_months(user_id, months)
+        
+        return jsonify({
+            **monthly_stats.summary(user_id, buckets),
+            "history": [bucket.to_dict() for bucket in buckets]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@profile_bp.route("/<int:user_id>/achievements", methods=["GET"])
+def get_achievements(user_id):
+    """Get every achievement with this user's progress towards it"""
+    try:
+        profile = Profile.query.filter_by(user_id=user_id).first()
+        if not profile:
+            return jsonify({"error": "Profile not found"}), 404
+
+        items = achievements.list_for_profile(profile)
+        return jsonify({
+            "achievements": items,
+            "unlocked_count": sum(1 for item in items if item["unlocked"])
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @profile_bp.route("/<int:user_id>", methods=["PUT"])
 def update_profile(user_id):
     """Update profile information"""
@@ -57,7 +119,11 @@ def update_profile(user_id):
                 updated = True
         
         if updated:
+            points_event = dict(user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points)
             db.session.commit()
+            emit(PROFILE_UPDATED, user_id=profile.user_id, fields=[f for f in allowed_fields if f in data])
+            if "county" in data:
+                emit(IMPACT_POINTS_CHANGED, **points_event)
             return jsonify({
                 "message": "Profile updated successfully",
                 "profile": profile.to_dict()
@@ -91,8 +157,19 @@ def update_stats(user_id):
                 setattr(profile, field, data[field])
                 updated = True
         
+        # Keep the current monthly bucket in step with manual corrections
+        monthly_values = {
+            field: data[column] for field, column in monthly_stats.PROFILE_COLUMNS.items() if column in data
+        }
+        if monthly_values:
+            monthly_stats.set_current(user_id, **monthly_values)
+        
         if updated:
+            points_event = dict(user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points)
             db.session.commit()
+            emit(PROFILE_UPDATED, user_id=profile.user_id, fields=[f for f in stat_fields + monthly_fields if f in data])
+            if "impact_points" in data:
+                emit(IMPACT_POINTS_CHANGED, **points_event)
             return jsonify({
                 "message": "Statistics updated successfully", 
                 "profile": profile.to_dict()
@@ -134,6 +211,7 @@ def create_profile():
         
         db.session.add(profile)
         db.session.commit()
+        emit(IMPACT_POINTS_CHANGED, user_id=profile.user_id, county=profile.county, impact_points=profile.impact_points)
         
         return jsonify({
             "message": "Profile created successfully",
@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
 from app.models.reports import Report, ReportComment
 from app.models.profile import Profile
+from app.services import monthly_stats
+from app.services.dashboard_stats import county_name
+from app.services.events import emit, REPORT_CREATED
 from datetime import datetime, timedelta
 import os
 from werkzeug.utils import secure_filename
@@ -52,11 +55,12 @@ def create_report():
             description=data['description'],
             issue_type=data['issue_type'],
             location=data['location'],
-            county=data['county'],
+            county=county_name(data['county']),  # 'Nairobi County' -> 'Nairobi', so county filters are equality lookups
             severity=data.get('severity', 'medium'),
             priority=data.get('priority', 'normal'),
             latitude=data.get('latitude'),
-            longitude=data.get('longitude')
+            longitude=data.get('longitude'),
+            image_urls=[url for url in data.get('image_urls') or [] if isinstance(url, str)]
         )
         
         # Simulate AI analysis (in real app, this would call an AI service)
@@ -65,10 +69,11 @@ def create_report():
         report.suggested_actions = generate_suggested_actions(data['issue_type'])
         
         db.session.add(report)
-        db.session.commit()
         
-        # Update user's profile stats
+        # Update user's profile stats in the same transaction
         update_user_report_stats(data['user_id'])
+        db.session.commit()
+        emit(REPORT_CREATED, user_id=report.user_id, report_id=report.id, county=report.county)
         
         return jsonify({
             "message": "Report created successfully",
@@ -161,7 +166,7 @@ def get_recent_reports(county):
         one_week_ago = datetime.utcnow() - timedelta(days=7)
         
         reports = Report.query.filter(
-            Report.county == county,
+            Report.county == county_name(county),
             Report.created_at >= one_week_ago
         ).order_by(Report.created_at.desc()).limit(limit).all()
         
@@ -341,23 +346,14 @@ def generate_suggested_actions(issue_type):
     ])
 
 def update_user_report_stats(user_id):
-    """Update user's report statistics in their profile"""
-    try:
-        profile = Profile.query.filter_by(user_id=user_id).first()
-        if profile:
-            # Update total reports
-            total_reports = Report.query.filter_by(user_id=user_id).count()
-            profile.issues_reported = total_reports
-            
-            # Update monthly reports
-            start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            monthly_reports = Report.query.filter(
-                Report.user_id == user_id,
-                Report.created_at >= start_of_month
-            ).count()
-            profile.issues_this_month = monthly_reports
-            
-            db.session.commit()
-    except Exception as e:
-        print(f"Error updating user stats: {e}")
-        # Don't fail the main request if stats update fails
\ No newline at end of file
+    """Count a new report against the user's profile and current monthly bucket (no commit)"""
+    db.session.execute(
+        db.update(Profile)
+        .where(Profile.user_id == user_id)
+        .values(
+            issues_reported=db.func.coalesce(Profile.issues_reported, 0) + 1,
+            issues_this_month=db.func.coalesce(Profile.issues_this_month, 0) + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
+    monthly_stats.increment(user_id, issues=1)
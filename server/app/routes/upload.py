@@ -1,47 +1,32 @@
+import hashlib
+import mimetypes
 import os
-import uuid
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, redirect, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from itsdangerous import BadData
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 from werkzeug.utils import secure_filename
-from PIL import Image
-import io
+from app.extensions import db
+from app.services import images
+from app.services.rate_limit import rate_limit
+from app.services.storage import get_storage, url_seconds
+from app.services.upload_limits import limit_upload, sniff
 
 bp = Blueprint('upload', __name__, url_prefix='/api/upload')
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+MULTIPART_OVERHEAD = 64 * 1024  # Boundaries and part headers around the file
+UPLOAD_CONTENT_TYPES = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/jpg': 'jpg', 'image/gif': 'gif', 'image/webp': 'webp'}
 
 def allowed_file(filename):
     """Check if file has allowed extension"""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def compress_image(image_file, max_size=(800, 600), quality=85):
-    """Compress and resize image"""
-    try:
-        # Open image
-        img = Image.open(image_file)
-        
-        # Convert RGBA to RGB if necessary
-        if img.mode in ('RGBA', 'LA'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
-        
-        # Resize if larger than max_size
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-        
-        # Save compressed image to bytes
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=quality, optimize=True)
-        output.seek(0)
-        
-        return output
-    except Exception as e:
-        raise Exception(f"Failed to process image: {str(e)}")
-
 @bp.route('/image', methods=['POST'])
+@limit_upload(MAX_FILE_SIZE + MULTIPART_OVERHEAD, images_only=True)
 @jwt_required()
 def upload_image():
     """Upload and process an image file"""
@@ -82,60 +67,113 @@ def upload_image():
                 'error': 'Invalid file type. Allowed types: ' + ', '.join(ALLOWED_EXTENSIONS)
             }), 400
         
-        # Generate unique filename
-        file_extension = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}_{current_user_id}.jpg"  # Always save as JPG after compression
-        
-        # Create upload directory if it doesn't exist
-        upload_dir = os.path.join(current_app.instance_path, 'uploads', 'images')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        file_path = os.path.join(upload_dir, unique_filename)
+        data = file.read()
+        # Trust the bytes, not the name: a PNG called photo.jpg is stored as .png
+        file_extension = sniff(data[:16]) or file.filename.rsplit('.', 1)[1].lower()
         
+        # Named by content: a repeat upload reuses the stored image and its variants
         try:
-            # Compress and save image
-            compressed_image = compress_image(file)
-            with open(file_path, 'wb') as f:
-                f.write(compressed_image.read())
-            
-            # Generate URL for the uploaded image
-            # In production, this would be a CDN URL or proper file serving endpoint
-            image_url = f"/uploads/images/{unique_filename}"
-            
+            filename, status = images.store(data, file_extension, current_user_id)
+        except ValueError as e:
             return jsonify({
-                'success': True,
-                'message': 'Image uploaded successfully',
-                'image_url': image_url,
-                'filename': unique_filename
-            }), 201
-            
-        except Exception as e:
-            # Clean up file if processing failed
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise e
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        # Variant URLs serve the original until processing finishes
+        return jsonify({
+            'success': True,
+            'message': 'Image uploaded successfully',
+            'image_url': f"/api/upload/images/{filename}",
+            'filename': filename,
+            'variants': images.variant_urls(filename),
+            'status': status
+        }), 201
         
+    except RequestEntityTooLarge:
+        return jsonify({
+            'success': False,
+            'error': f'File size too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'
+        }), 413
+    except UnsupportedMediaType as e:
+        return jsonify({
+            'success': False,
+            'error': e.description
+        }), 415
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f'Upload failed: {str(e)}'
         }), 500
 
+def send_image(target, key, filename):
+    """Send a stored variant from local storage with validators and long-lived caching
+
+    Content-addressed names use the name itself as a strong ETag, so a
+    revalidation is answered with 304 without touching the file. With
+    IMAGE_SENDFILE set, the proxy streams the file (ranges included) and
+    the worker only writes headers.
+    """
+    file_path = target.path(key)
+    immutable = images.is_content_addressed(filename)
+    etag = filename if immutable else None
+    cache_control = images.IMMUTABLE_CACHE_CONTROL if immutable else images.LEGACY_CACHE_CONTROL
+    
+    if etag and request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        mode = current_app.config.get('IMAGE_SENDFILE')
+        if mode in ('x-accel-redirect', 'x-sendfile'):
+            response = current_app.response_class(mimetype=mimetypes.guess_type(filename)[0])
+            if mode == 'x-accel-redirect':
+                relative_path = key[len('images/'):]
+                response.headers['X-Accel-Redirect'] = f"{current_app.config['IMAGE_ACCEL_PREFIX']}/{relative_path}"
+            else:
+                response.headers['X-Sendfile'] = os.path.abspath(file_path)
+        else:
+            # Handles If-None-Match, If-Modified-Since and Range itself
+            response = send_file(file_path, etag=etag or True, conditional=True)
+    
+    if etag:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def redirect_to_storage(target, key, cache_control):
+    """Point the client at the bucket so the bytes never pass through this worker"""
+    response = redirect(target.url(key, url_seconds()), code=302)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
 @bp.route('/images/<filename>', methods=['GET'])
 def serve_image(filename):
     """Serve uploaded images"""
     try:
-        upload_dir = os.path.join(current_app.instance_path, 'uploads', 'images')
-        file_path = os.path.join(upload_dir, secure_filename(filename))
+        filename = secure_filename(filename)
+        target = get_storage()
+        key = images.image_key(filename)
         
-        if not os.path.exists(file_path):
-            return jsonify({
-                'success': False,
-                'error': 'Image not found'
-            }), 404
+        if not target.exists(key):
+            # Still processing: serve the original, but don't let it be cached
+            parsed = images.parse_name(filename)
+            original_key = images.find_original(parsed[0]) if parsed else None
+            if not original_key:
+                return jsonify({
+                    'success': False,
+                    'error': 'Image not found'
+                }), 404
+            if target.serves_directly:
+                return redirect_to_storage(target, original_key, 'no-store')
+            response = send_file(target.path(original_key), etag=False)
+            response.headers['Cache-Control'] = 'no-store'
+            return response
         
-        from flask import send_file
-        return send_file(file_path)
+        if target.serves_directly:
+            # A public URL never changes; a presigned one must be re-issued before it expires
+            public = target.public_url and images.is_content_addressed(filename)
+            return redirect_to_storage(target, key, images.IMMUTABLE_CACHE_CONTROL if public
+                                       else f'private, max-age={url_seconds() // 2}')
+        return send_image(target, key, filename)
         
     except Exception as e:
         return jsonify({
@@ -150,18 +188,23 @@ def delete_image(filename):
     try:
         current_user_id = get_jwt_identity()
         
-        # Extract user ID from filename for basic security check
-        if f"_{current_user_id}." not in filename:
-            return jsonify({
-                'success': False,
-                'error': 'Unauthorized to delete this image'
-            }), 403
-        
-        upload_dir = os.path.join(current_app.instance_path, 'uploads', 'images')
-        file_path = os.path.join(upload_dir, secure_filename(filename))
+        filename = secure_filename(filename)
         
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        if images.is_content_addressed(filename):
+            # Shared by content: drop this user's reference; gc-uploads deletes the files once nothing links them
+            if not images.release(current_user_id, filename):
+                return jsonify({
+                    'success': False,
+                    'error': 'Unauthorized to delete this image'
+                }), 403
+        else:
+            # Older uploads carry the owner's id in the filename
+            if f"_{current_user_id}." not in filename:
+                return jsonify({
+                    'success': False,
+                    'error': 'Unauthorized to delete this image'
+                }), 403
+            images.delete_files(filename)
             
         return jsonify({
             'success': True,
@@ -169,7 +212,126 @@ def delete_image(filename):
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+
+@bp.route('/presign', methods=['POST'])
+@jwt_required()
+@rate_limit("60/minute", key="user")
+def presign_upload():
+    """Start an upload straight to storage; the client hashes the file first"""
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        
+        content_type = (data.get('content_type') or '').lower()
+        extension = UPLOAD_CONTENT_TYPES.get(content_type)
+        if not extension:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid file type. Allowed types: ' + ', '.join(ALLOWED_EXTENSIONS)
+            }), 400
+        
+        size = data.get('size')
+        if not isinstance(size, int) or not 0 < size <= MAX_FILE_SIZE:
+            return jsonify({
+                'success': False,
+                'error': f'File size too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB'
+            }), 400
+        
+        digest = (data.get('sha256') or '').lower()
+        if not images.DIGEST_PATTERN.match(digest):
+            return jsonify({
+                'success': False,
+                'error': 'sha256 must be the hex SHA-256 of the file'
+            }), 400
+        
+        result = images.prepare_direct_upload(current_user_id, digest, extension, size)
+        return jsonify({
+            'success': True,
+            **result,
+            'image_url': f"/api/upload/images/{result['filename']}",
+            'variants': images.variant_urls(result['filename'])
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Upload failed: {str(e)}'
+        }), 500
+
+@bp.route('/complete', methods=['POST'])
+@jwt_required()
+def complete_upload():
+    """Called once a presigned PUT has finished; queues the variants"""
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        
+        try:
+            filename, status = images.complete_direct_upload(current_user_id, data.get('ticket') or '')
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'message': 'Image uploaded successfully',
+            'image_url': f"/api/upload/images/{filename}",
+            'filename': filename,
+            'variants': images.variant_urls(filename),
+            'status': status
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Upload failed: {str(e)}'
+        }), 500
+
+@bp.route('/direct/<token>', methods=['PUT'])
+@limit_upload(MAX_FILE_SIZE)
+def direct_upload(token):
+    """Target of presigned PUTs when files are stored locally; the signed token is the authorization"""
+    try:
+        target = get_storage()
+        if target.serves_directly:
+            return jsonify({
+                'success': False,
+                'error': 'Upload to the presigned storage URL instead'
+            }), 404
+        
+        try:
+            terms = target.load_put_token(token, url_seconds())
+        except BadData:
+            return jsonify({
+                'success': False,
+                'error': 'Upload URL is invalid or expired'
+            }), 403
+        
+        data = request.get_data(cache=False)
+        # The same terms S3 enforces for its presigned PUTs
+        if (len(data) != terms['s'] or request.mimetype != terms['t']
+                or hashlib.sha256(data).hexdigest() != terms['h']):
+            return jsonify({
+                'success': False,
+                'error': 'Uploaded file does not match the presigned size, type and checksum'
+            }), 400
+        
+        target.put(terms['k'], data, terms['t'])
+        return jsonify({
+            'success': True
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Upload failed: {str(e)}'
+        }), 500
@@ -11,6 +11,8 @@ class CommunityActionCreate(BaseModel):
     date: str  # Will be converted to datetime
     image: Optional[str] = None
     impact_metric: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)  # Geocoded from location when omitted
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
     class Config:
         json_schema_extra = {
@@ -35,6 +37,8 @@ class CommunityActionUpdate(BaseModel):
     image: Optional[str] = None
     impact_metric: Optional[str] = None
     status: Optional[str] = Field(None, pattern="^(active|completed|cancelled)$")
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
 
 class CommunityActionResponse(BaseModel):
@@ -59,6 +63,22 @@ class ActionParticipantCreate(BaseModel):
     action_id: int
 
 
+class BatchCheckIn(BaseModel):
+    user_ids: List[int] = []
+    qr_payloads: List[str] = []  # Codes from GET /actions/<id>/check-in-code
+    participation_image: Optional[str] = Field(None, max_length=500)
+    notes: Optional[str] = None
+
+    @validator('qr_payloads', always=True)
+    def check_batch_size(cls, qr_payloads, values):
+        total = len(values.get('user_ids') or []) + len(qr_payloads)
+        if total == 0:
+            raise ValueError('Provide at least one user_id or qr_payload')
+        if total > 1000:
+            raise ValueError('At most 1000 participants can be checked in per request')
+        return qr_payloads
+
+
 class ActionParticipantResponse(BaseModel):
     id: int
     action_id: int
@@ -0,0 +1,244 @@
+"""Event-driven achievements.
+
+Each achievement's ``requirement_type`` names a profile counter (see
+``REQUIREMENT_COLUMNS``). An in-memory index maps each counter to the
+achievements that depend on it, so an event only touches the achievements
+its counters can move. Nothing rescans a user's history: the current
+counter value is read from the profile row. Events are queued and a
+background flush evaluates each batch with one profile query, one progress
+query and one commit. ``backfill`` runs the same evaluation over every
+profile in primary-key chunks.
+"""
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.achievements import Achievement, UserAchievement
+from app.models.profile import Profile
+from app.services import background
+from app.services.events import (
+    on, emit, REPORT_CREATED, ACTION_JOINED, ACTION_LEFT, IMPACT_POINTS_CHANGED, PROFILE_UPDATED,
+    ACHIEVEMENT_UNLOCKED
+)
+
+# requirement_type -> Profile counter it is measured against
+REQUIREMENT_COLUMNS = {
+    'issues_reported': 'issues_reported',
+    'alerts_responded': 'alerts_responded',
+    'alert_responded': 'alerts_responded',
+    'actions_joined': 'alerts_responded',  # joins are counted in alerts_responded
+    'community_impact': 'community_impact',
+    'trees_planted': 'trees_planted',
+    'impact_points': 'impact_points',
+}
+ALL_COLUMNS = frozenset(REQUIREMENT_COLUMNS.values())
+
+# Counters each event can move
+JOIN_COLUMNS = ('alerts_responded', 'community_impact', 'impact_points')
+
+DEFAULT_ACHIEVEMENTS = [
+    {'name': 'First Report', 'description': 'Reported your first environmental issue',
+     'requirement_type': 'issues_reported', 'requirement_value': 1},
+    {'name': 'Eco Reporter', 'description': 'Reported 10+ environmental issues',
+     'requirement_type': 'issues_reported', 'requirement_value': 10},
+    {'name': 'Community Leader', 'description': 'Joined 5+ actions',
+     'requirement_type': 'actions_joined', 'requirement_value': 5},
+    {'name': 'Tree Champion', 'description': 'Planted 20+ trees',
+     'requirement_type': 'trees_planted', 'requirement_value': 20},
+    {'name': 'Impact Maker', 'description': 'Earned 100 impact points',
+     'requirement_type': 'impact_points', 'requirement_value': 100},
+]
+
+INDEX_MAX_AGE_SECONDS = 300
+
+
+class AchievementIndex:
+    """Achievements grouped by the profile counter they depend on"""
+
+    def __init__(self):
+        self.by_column = {}
+        self.loaded_at = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        by_column = defaultdict(list)
+        for achievement in Achievement.query.filter(
+            Achievement.requirement_type.in_(list(REQUIREMENT_COLUMNS)),
+            Achievement.requirement_value.isnot(None)
+        ):
+            column = REQUIREMENT_COLUMNS[achievement.requirement_type]
+            by_column[column].append((achievement.requirement_value, achievement.id, achievement.name))
+        with self._lock:
+            self.by_column = {column: sorted(entries) for column, entries in by_column.items()}
+            self.loaded_at = time.monotonic()
+
+    def matching(self, columns):
+        """[(column, requirement_value, achievement_id, name)] for the given counters"""
+        if self.loaded_at is None or time.monotonic() - self.loaded_at > INDEX_MAX_AGE_SECONDS:
+            self.load()
+        with self._lock:
+            return [
+                (column, value, achievement_id, name)
+                for column in columns
+                for value, achievement_id, name in self.by_column.get(column, ())
+            ]
+
+    def invalidate(self):
+        with self._lock:
+            self.loaded_at = None
+
+
+_index = AchievementIndex()
+_queue = deque()  # (user_id, columns)
+
+
+# ------------------- Evaluation -------------------
+
+def evaluate_profiles(profiles, columns_by_user):
+    """Update progress rows for the given profiles; returns [(user_id, achievement_id, name)] unlocked. Does not commit."""
+    work = []
+    for profile in profiles:
+        for column, required, achievement_id, name in _index.matching(columns_by_user.get(profile.user_id, ())):
+            work.append((profile, column, required, achievement_id, name))
+    if not work:
+        return []
+
+    existing = {
+        (row.profile_id, row.achievement_id): row
+        for row in UserAchievement.query.filter(
+            UserAchievement.profile_id.in_({item[0].id for item in work}),
+            UserAchievement.achievement_id.in_({item[3] for item in work})
+        )
+    }
+
+    now = datetime.utcnow()
+    unlocked = []
+    for profile, column, required, achievement_id, name in work:
+        value = getattr(profile, column) or 0
+        row = existing.get((profile.id, achievement_id))
+        if row is None:
+            row = UserAchievement(profile_id=profile.id, achievement_id=achievement_id)
+            db.session.add(row)
+            existing[(profile.id, achievement_id)] = row
+        elif row.unlocked_at is not None:
+            continue  # unlocked achievements stay unlocked
+        row.progress = min(value, required)
+        if value >= required:
+            row.unlocked_at = now
+            unlocked.append((profile.user_id, achievement_id, name))
+    return unlocked
+
+
+def evaluate(columns_by_user):
+    """Evaluate {user_id: columns}, commit, and announce unlocks"""
+    if not columns_by_user:
+        return []
+    for attempt in range(2):
+        profiles = Profile.query.filter(Profile.user_id.in_(list(columns_by_user))).all()
+        unlocked = evaluate_profiles(profiles, columns_by_user)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            # Another worker created the same progress rows; reload and retry once
+            db.session.rollback()
+            if attempt:
+                raise
+
+    for user_id, achievement_id, name in unlocked:
+        emit(ACHIEVEMENT_UNLOCKED, user_id=user_id, achievement_id=achievement_id, name=name)
+    return unlocked
+
+
+def enqueue(user_id, columns):
+    _queue.append((int(user_id), tuple(columns)))
+    background.submit_latest(current_app._get_current_object(), 'achievements-flush', flush)
+
+
+def flush():
+    columns_by_user = defaultdict(set)
+    while _queue:
+        user_id, columns = _queue.popleft()
+        columns_by_user[user_id].update(columns)
+    return evaluate(columns_by_user)
+
+
+def backfill(batch_size=500):
+    """Evaluate every profile against every achievement, in primary-key chunks"""
+    _index.invalidate()
+    processed = unlocked = 0
+    last_id = 0
+    while True:
+        profiles = Profile.query.filter(Profile.id > last_id).order_by(Profile.id).limit(batch_size).all()
+        if not profiles:
+            break
+        unlocked += len(evaluate_profiles(profiles, {profile.user_id: ALL_COLUMNS for profile in profiles}))
+        db.session.commit()
+        processed += len(profiles)
+        last_id = profiles[-1].id
+    return processed, unlocked
+
+
+def ensure_default_achievements():
+    """Create the default achievements that do not exist yet (matched by name)"""
+    existing = {name for (name,) in db.session.query(Achievement.name)}
+    created = [Achievement(**spec) for spec in DEFAULT_ACHIEVEMENTS if spec['name'] not in existing]
+    db.session.add_all(created)
+    db.session.commit()
+    _index.invalidate()
+    return len(created)
+
+
+def list_for_profile(profile):
+    """All achievements with this profile's progress and unlock time"""
+    rows = db.session.query(Achievement, UserAchievement)\
+        .outerjoin(UserAchievement, db.and_(
+            UserAchievement.achievement_id == Achievement.id,
+            UserAchievement.profile_id == profile.id
+        ))\
+        .order_by(Achievement.requirement_type, Achievement.requirement_value, Achievement.id)\
+        .all()
+    return [
+        {
+            'id': achievement.id,
+            'name': achievement.name,
+            'description': achievement.description,
+            'icon_url': achievement.icon_url,
+            'requirement_type': achievement.requirement_type,
+            'requirement_value': achievement.requirement_value,
+            'progress': (progress.progress or 0) if progress else 0,
+            'unlocked': bool(progress and progress.unlocked_at),
+            'unlocked_at': progress.unlocked_at.isoformat() if progress and progress.unlocked_at else None
+        }
+        for achievement, progress in rows
+    ]
+
+
+# ------------------- Event subscribers -------------------
+
+@on(REPORT_CREATED)
+def handle_report_created(user_id, **_):
+    enqueue(user_id, ('issues_reported',))
+
+
+@on(ACTION_JOINED)
+@on(ACTION_LEFT)
+def handle_participation_changed(user_id, **_):
+    enqueue(user_id, JOIN_COLUMNS)
+
+
+@on(IMPACT_POINTS_CHANGED)
+def handle_points_changed(user_id, **_):
+    enqueue(user_id, ('impact_points',))
+
+
+@on(PROFILE_UPDATED)
+def handle_profile_updated(user_id, fields=(), **_):
+    columns = ALL_COLUMNS.intersection(fields)
+    if columns:
+        enqueue(user_id, columns)
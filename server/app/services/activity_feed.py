@@ -0,0 +1,245 @@
+"""Activity feed: capped personal timelines plus county-wide broadcasts.
+
+Events with a small audience (the reporter, a participant and the action's
+organizer) are fanned out on write into ``recent_activities``. County-wide
+events (new reports, emergency alerts) are written once to
+``county_activities`` and merged into each reader's feed. Event handlers only
+enqueue; a background flush resolves titles and names with one query per
+table and inserts the whole batch in one commit. Timelines are trimmed to
+``ACTIVITY_TIMELINE_CAP`` entries, and broadcasts expire after
+``COUNTY_ACTIVITY_RETENTION_DAYS``.
+"""
+import heapq
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy import and_, insert, or_
+
+from app.extensions import db
+from app.models.community import CommunityAction
+from app.models.dashboard import RecentActivity, CountyActivity
+from app.models.emergency import EmergencyAlert
+from app.models.profile import Profile
+from app.models.reports import Report
+from app.services import background
+from app.services.dashboard_stats import county_name
+from app.services.events import on, REPORT_CREATED, ACTION_JOINED, ALERT_ISSUED, ACHIEVEMENT_UNLOCKED
+
+DEFAULT_TIMELINE_CAP = 50
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_FEED_LIMIT = 5
+
+_queue = deque()  # (kind, payload, timestamp)
+
+
+def display_name(full_name):
+    """'Sarah Mwangi' -> 'Sarah M.'"""
+    parts = (full_name or '').split()
+    if not parts:
+        return 'A community member'
+    return f"{parts[0]} {parts[-1][0]}." if len(parts) > 1 else parts[0]
+
+
+# ------------------- Reads -------------------
+
+def get_feed(user_id, county, limit=DEFAULT_FEED_LIMIT):
+    """Newest entries from the user's timeline merged with their county's broadcasts"""
+    personal = RecentActivity.query.filter_by(user_id=user_id)\
+        .order_by(RecentActivity.timestamp.desc())\
+        .limit(limit)\
+        .all()
+
+    name = county_name(county)
+    broadcasts = CountyActivity.query.filter(
+        CountyActivity.county == name,
+        or_(CountyActivity.actor_user_id.is_(None), CountyActivity.actor_user_id != user_id)
+    ).order_by(CountyActivity.timestamp.desc()).limit(limit).all() if name else []
+
+    merged = heapq.merge(personal, broadcasts, key=lambda activity: activity.timestamp, reverse=True)
+    return list(islice(merged, limit))
+
+
+def count_since(user_id, county, since):
+    """Number of feed entries newer than `since` (timeline plus county broadcasts)"""
+    personal = db.session.query(db.func.count(RecentActivity.id)).filter(
+        RecentActivity.user_id == user_id,
+        RecentActivity.timestamp > since
+    ).scalar()
+
+    name = county_name(county)
+    broadcasts = db.session.query(db.func.count(CountyActivity.id)).filter(
+        CountyActivity.county == name,
+        CountyActivity.timestamp > since,
+        or_(CountyActivity.actor_user_id.is_(None), CountyActivity.actor_user_id != user_id)
+    ).scalar() if name else 0
+
+    return personal + broadcasts
+
+
+# ------------------- Writes -------------------
+
+def enqueue(kind, **payload):
+    _queue.append((kind, payload, datetime.utcnow()))
+    background.submit_latest(current_app._get_current_object(), 'activity-feed-flush', flush)
+
+
+def flush():
+    """Write every queued event; returns (personal, broadcast) rows inserted"""
+    events = []
+    while _queue:
+        events.append(_queue.popleft())
+    if not events:
+        return 0, 0
+
+    def ids(kind, key):
+        return {payload[key] for event_kind, payload, _ in events if event_kind == kind}
+
+    reports = {r.id: r for r in Report.query.filter(Report.id.in_(ids('report', 'report_id')))}
+    actions = {a.id: a for a in CommunityAction.query.filter(CommunityAction.id.in_(ids('join', 'action_id')))}
+    alerts = {a.id: a for a in EmergencyAlert.query.filter(EmergencyAlert.id.in_(ids('alert', 'alert_id')))}
+    actor_ids = ids('report', 'user_id') | ids('join', 'user_id')
+    names = dict(
+        db.session.query(Profile.user_id, Profile.full_name).filter(Profile.user_id.in_(actor_ids))
+    ) if actor_ids else {}
+
+    personal, broadcasts = [], []
+    for kind, payload, timestamp in events:
+        if kind == 'report' and payload['report_id'] in reports:
+            report = reports[payload['report_id']]
+            issue = report.issue_type.lower()
+            personal.append(dict(
+                user_id=report.user_id, activity_type='report', timestamp=timestamp,
+                title=f"You reported a {issue} issue", description=f"{report.location} - {report.title}"
+            ))
+            broadcasts.append(dict(
+                county=county_name(report.county), actor_user_id=report.user_id, activity_type='report', timestamp=timestamp,
+                title=f"{display_name(names.get(report.user_id))} reported a {issue} issue",
+                description=f"{report.location} - {report.title}"
+            ))
+        elif kind == 'join' and payload['action_id'] in actions:
+            action = actions[payload['action_id']]
+            user_id = payload['user_id']
+            description = f"{action.location} - {action.date:%a %d %b}" if action.date else action.location
+            personal.append(dict(
+                user_id=user_id, activity_type='community', timestamp=timestamp,
+                title=f"You joined {action.title}", description=description
+            ))
+            if action.created_by and action.created_by != user_id:
+                personal.append(dict(
+                    user_id=action.created_by, activity_type='community', timestamp=timestamp,
+                    title=f"{display_name(names.get(user_id))} joined {action.title}", description=description
+                ))
+        elif kind == 'alert' and payload['alert_id'] in alerts:
+            alert = alerts[payload['alert_id']]
+            broadcasts.append(dict(
+                county=county_name(alert.county), actor_user_id=None, activity_type='alert', timestamp=timestamp,
+                title=f"{alert.type} issued", description=f"{alert.location} - {alert.severity} severity"
+            ))
+        elif kind == 'achievement':
+            personal.append(dict(
+                user_id=payload['user_id'], activity_type='achievement', timestamp=timestamp,
+                title=f"You unlocked {payload['name']}", description='Achievement unlocked'
+            ))
+
+    if personal:
+        db.session.execute(insert(RecentActivity), personal)
+    if broadcasts:
+        db.session.execute(insert(CountyActivity), broadcasts)
+    db.session.commit()
+
+    # Keep the timelines we just wrote to within their cap
+    trim_users({row['user_id'] for row in personal})
+    return len(personal), len(broadcasts)
+
+
+# ------------------- Trimming -------------------
+
+def timeline_cap():
+    return current_app.config.get('ACTIVITY_TIMELINE_CAP', DEFAULT_TIMELINE_CAP)
+
+
+def trim_users(user_ids, cap=None):
+    """Delete entries beyond the newest `cap` for any of these users over the cap"""
+    cap = cap or timeline_cap()
+    if not user_ids:
+        return 0
+    over_cap = [uid for (uid,) in db.session.query(RecentActivity.user_id)
+                .filter(RecentActivity.user_id.in_(user_ids))
+                .group_by(RecentActivity.user_id)
+                .having(db.func.count() > cap)]
+
+    deleted = 0
+    for user_id in over_cap:
+        cutoff = db.session.query(RecentActivity.timestamp, RecentActivity.id)\
+            .filter(RecentActivity.user_id == user_id)\
+            .order_by(RecentActivity.timestamp.desc(), RecentActivity.id.desc())\
+            .offset(cap - 1).limit(1).one()
+        deleted += RecentActivity.query.filter(
+            RecentActivity.user_id == user_id,
+            or_(
+                RecentActivity.timestamp < cutoff.timestamp,
+                and_(RecentActivity.timestamp == cutoff.timestamp, RecentActivity.id < cutoff.id)
+            )
+        ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def trim_timelines(cap=None, batch_size=500):
+    """Trim every over-cap timeline, walking user ids in keyset batches"""
+    cap = cap or timeline_cap()
+    deleted = 0
+    last_user_id = 0
+    while True:
+        user_ids = [uid for (uid,) in db.session.query(RecentActivity.user_id)
+                    .filter(RecentActivity.user_id > last_user_id)
+                    .group_by(RecentActivity.user_id)
+                    .having(db.func.count() > cap)
+                    .order_by(RecentActivity.user_id)
+                    .limit(batch_size)]
+        if not user_ids:
+            break
+        deleted += trim_users(user_ids, cap)
+        last_user_id = user_ids[-1]
+    return deleted
+
+
+def trim_county_activities(retention_days=None, batch_size=1000):
+    """Delete expired county broadcasts in primary-key batches"""
+    retention_days = retention_days or current_app.config.get('COUNTY_ACTIVITY_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    deleted = 0
+    while True:
+        batch = [row_id for (row_id,) in db.session.query(CountyActivity.id)
+                 .filter(CountyActivity.timestamp < cutoff)
+                 .order_by(CountyActivity.id)
+                 .limit(batch_size)]
+        if not batch:
+            break
+        deleted += CountyActivity.query.filter(CountyActivity.id.in_(batch)).delete(synchronize_session=False)
+        db.session.commit()
+    return deleted
+
+
+# ------------------- Event subscribers -------------------
+
+@on(REPORT_CREATED)
+def handle_report_created(user_id, report_id, **_):
+    enqueue('report', user_id=int(user_id), report_id=report_id)
+
+
+@on(ACTION_JOINED)
+def handle_action_joined(user_id, action_id, **_):
+    enqueue('join', user_id=int(user_id), action_id=action_id)
+
+
+@on(ALERT_ISSUED)
+def handle_alert_issued(alert_id, **_):
+    enqueue('alert', alert_id=alert_id)
+
+
+@on(ACHIEVEMENT_UNLOCKED)
+def handle_achievement_unlocked(user_id, name, **_):
+    enqueue('achievement', user_id=int(user_id), name=name)
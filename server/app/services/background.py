@@ -0,0 +1,59 @@
+"""Small thread pool for work that should not run on the request path.
+
+Jobs run inside their own app context (and therefore their own database
+session). Submitting a job whose key is already queued or running is a
+no-op, so a burst of requests triggers at most one recomputation.
+``submit_latest`` additionally reruns the job once if it was requested again
+while running, for results that must reflect writes made in the meantime.
+``submit_long`` is for jobs that take minutes (CSV imports): they run one at
+a time on their own thread so they never hold up the short jobs.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ecoaction-bg')
+_long_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ecoaction-bg-long')
+_pending = set()
+_rerun = set()
+_lock = threading.Lock()
+
+
+def submit(app, key, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) in the background unless `key` is already pending"""
+    return _submit(app, key, fn, args, kwargs, rerun=False)
+
+
+def submit_latest(app, key, fn, *args, **kwargs):
+    """Like submit, but if `key` is pending run it once more after it finishes"""
+    return _submit(app, key, fn, args, kwargs, rerun=True)
+
+
+def submit_long(app, key, fn, *args, **kwargs):
+    """Like submit, but queued behind other long jobs instead of beside the short ones"""
+    return _submit(app, key, fn, args, kwargs, rerun=False, executor=_long_executor)
+
+
+def _submit(app, key, fn, args, kwargs, rerun, executor=None):
+    with _lock:
+        if key in _pending:
+            if rerun:
+                _rerun.add(key)
+            return False
+        _pending.add(key)
+
+    def run():
+        try:
+            with app.app_context():
+                fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Background job {key} failed: {e}")
+        finally:
+            with _lock:
+                _pending.discard(key)
+                again = key in _rerun
+                _rerun.discard(key)
+            if again:
+                _submit(app, key, fn, args, kwargs, rerun=True)
+
+    (executor or _executor).submit(run)
+    return True
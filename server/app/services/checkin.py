@@ -0,0 +1,123 @@
+"""Batch check-in of participants by organizers.
+
+A batch of N users costs a fixed number of statements regardless of N: one
+lookup of existing users, one of existing participants, one multi-row
+INSERT, one participants_count UPDATE, one grouped profile UPDATE and a
+grouped upsert of the users' monthly buckets.
+"""
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from app.extensions import db
+from app.models.auth import User
+from app.models.community import ActionParticipant, CommunityAction
+from app.models.profile import Profile
+from app.services import monthly_stats
+from app.services.community_stats import apply_stats_delta
+
+MAX_BATCH_SIZE = 1000
+QR_SALT = 'action-check-in'
+
+# Same per-participant increments as the single join endpoint
+JOIN_PROFILE_INCREMENTS = {
+    'alerts_responded': 1,
+    'alerts_this_month': 1,
+    'community_impact': 1,
+    'impact_this_month': 1,
+    'impact_points': 10,
+}
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=QR_SALT)
+
+
+def make_checkin_code(action_id, user_id):
+    """Signed payload a participant shows (as a QR code) to be checked in"""
+    return _serializer().dumps({'a': action_id, 'u': int(user_id)})
+
+
+def read_checkin_code(payload, action_id):
+    """Return the user id in a check-in code for this action, or None if invalid"""
+    try:
+        data = _serializer().loads(payload)
+    except BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get('a') != action_id:
+        return None
+    return data.get('u')
+
+
+def check_in(action, user_ids, participation_image=None, notes=None):
+    """Join many users to an action at once.
+
+    Returns (outcomes, joined_ids) where outcomes maps user_id to one of
+    'checked_in', 'already_joined' or 'not_found'. Does not commit.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    outcomes = {}
+    if not user_ids:
+        return outcomes, []
+
+    known = {
+        row.id for row in db.session.query(User.id).filter(User.id.in_(user_ids))
+    }
+    already = {
+        row.user_id for row in db.session.query(ActionParticipant.user_id).filter(
+            ActionParticipant.action_id == action.id,
+            ActionParticipant.user_id.in_(user_ids)
+        )
+    }
+
+    new_ids = []
+    for user_id in user_ids:
+        if user_id not in known:
+            outcomes[user_id] = 'not_found'
+        elif user_id in already:
+            outcomes[user_id] = 'already_joined'
+        else:
+            outcomes[user_id] = 'checked_in'
+            new_ids.append(user_id)
+
+    if not new_ids:
+        return outcomes, new_ids
+
+    db.session.execute(db.insert(ActionParticipant), [
+        {
+            'action_id': action.id,
+            'user_id': user_id,
+            'participation_image': participation_image,
+            'notes': notes
+        }
+        for user_id in new_ids
+    ])
+
+    db.session.execute(
+        db.update(CommunityAction)
+        .where(CommunityAction.id == action.id)
+        .values(participants_count=db.func.coalesce(CommunityAction.participants_count, 0) + len(new_ids))
+    )
+
+    profile_result = db.session.execute(
+        db.update(Profile)
+        .where(Profile.user_id.in_(new_ids))
+        .values({
+            getattr(Profile, column): db.func.coalesce(getattr(Profile, column), 0) + increment
+            for column, increment in JOIN_PROFILE_INCREMENTS.items()
+        })
+        .execution_options(synchronize_session=False)
+    )
+    profiles_updated = profile_result.rowcount or 0
+    monthly_stats.increment_many(
+        new_ids,
+        alerts=JOIN_PROFILE_INCREMENTS['alerts_this_month'],
+        impact=JOIN_PROFILE_INCREMENTS['impact_this_month']
+    )
+
+    apply_stats_delta(
+        total_participants=len(new_ids),
+        total_community_impact=profiles_updated * JOIN_PROFILE_INCREMENTS['community_impact'],
+        total_impact_points=profiles_updated * JOIN_PROFILE_INCREMENTS['impact_points']
+    )
+
+    return outcomes, new_ids
@@ -0,0 +1,114 @@
+"""Time-window and proximity lookups for upcoming community actions.
+
+Queries go through the ``(status, date)`` and ``(geo_cell, date)`` indexes on
+``community_actions``; exact distances are only computed for the handful of
+rows that survive the cell and bounding-box filters.
+"""
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.community import CommunityAction
+from app.services import geo
+
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_RADIUS_KM = 25
+MAX_RADIUS_KM = 500
+
+
+def assign_geo(action, latitude=None, longitude=None):
+    """Set coordinates and grid cell on an action, geocoding its location if needed"""
+    if latitude is None or longitude is None:
+        coords = geo.geocode(action.location)
+        latitude, longitude = coords if coords else (None, None)
+
+    action.latitude = latitude
+    action.longitude = longitude
+    action.geo_cell = geo.cell_for(latitude, longitude) if latitude is not None else None
+
+
+def upcoming_actions_query(start=None, end=None, lat=None, lng=None, radius_km=None):
+    """Indexed query for active actions in [start, end], optionally near a point"""
+    start = start or datetime.utcnow()
+    end = end or start + timedelta(days=DEFAULT_WINDOW_DAYS)
+
+    query = CommunityAction.query.filter(
+        CommunityAction.status == 'active',
+        CommunityAction.date >= start,
+        CommunityAction.date <= end
+    )
+
+    if lat is not None and lng is not None:
+        radius_km = min(radius_km or DEFAULT_RADIUS_KM, MAX_RADIUS_KM)
+        cells = geo.covering_cells(lat, lng, radius_km)
+        if cells is not None:
+            query = query.filter(CommunityAction.geo_cell.in_(cells))
+        min_lat, max_lat, min_lng, max_lng = geo.bounding_box(lat, lng, radius_km)
+        query = query.filter(
+            CommunityAction.latitude.between(min_lat, max_lat),
+            CommunityAction.longitude.between(min_lng, max_lng)
+        )
+
+    return query
+
+
+def find_upcoming(start=None, end=None, lat=None, lng=None, radius_km=None, limit=50):
+    """Return [(action, distance_km or None)] ordered by date"""
+    query = upcoming_actions_query(start, end, lat, lng, radius_km).order_by(
+        CommunityAction.date.asc(), CommunityAction.id.asc())
+
+    if lat is None or lng is None:
+        return [(action, None) for action in query.limit(limit).all()]
+
+    # The bounding box keeps its corners, which are outside the radius: over-fetch,
+    # and page on (date, id) until enough rows pass the exact distance check
+    radius_km = min(radius_km or DEFAULT_RADIUS_KM, MAX_RADIUS_KM)
+    batch_size = max(2 * limit, 20)
+    results = []
+    page = query
+    while True:
+        actions = page.limit(batch_size).all()
+        for action in actions:
+            distance = geo.distance_km(lat, lng, action.latitude, action.longitude)
+            if distance <= radius_km:
+                results.append((action, round(distance, 1)))
+                if len(results) == limit:
+                    return results
+        if len(actions) < batch_size:
+            return results
+        last = actions[-1]
+        page = query.filter(
+            (CommunityAction.date > last.date)
+            | ((CommunityAction.date == last.date) & (CommunityAction.id > last.id))
+        )
+
+
+def count_upcoming_near(location, days=DEFAULT_WINDOW_DAYS, radius_km=50):
+    """Count upcoming active actions near a county/area name (bounding-box approximation)"""
+    start = datetime.utcnow()
+    end = start + timedelta(days=days)
+    coords = geo.geocode(location)
+    if coords is None:
+        query = upcoming_actions_query(start, end)
+    else:
+        query = upcoming_actions_query(start, end, coords[0], coords[1], radius_km)
+    return query.with_entities(db.func.count(CommunityAction.id)).scalar() or 0
+
+
+def backfill_geo(batch_size=500):
+    """Geocode actions that have no grid cell yet, in primary-key batches"""
+    updated = 0
+    last_id = 0
+    while True:
+        batch = CommunityAction.query.filter(
+            CommunityAction.id > last_id,
+            CommunityAction.geo_cell.is_(None)
+        ).order_by(CommunityAction.id).limit(batch_size).all()
+        if not batch:
+            break
+        for action in batch:
+            assign_geo(action, action.latitude, action.longitude)
+            if action.geo_cell:
+                updated += 1
+        last_id = batch[-1].id
+        db.session.commit()
+    return updated
@@ -0,0 +1,84 @@
+"""Materialized community-wide statistics.
+
+Write paths call ``apply_stats_delta`` inside their own transaction so the
+counters commit (or roll back) together with the change that caused them.
+``reconcile_stats`` recomputes everything from the source tables and is run
+periodically to correct any drift. The row itself is seeded by the migration
+that creates the table (or by ``flask reconcile-stats``); reads never write.
+"""
+from datetime import datetime
+
+from app.extensions import db
+from app.models.community import CommunityAction, CommunityStats
+from app.models.profile import Profile
+
+
+def get_stats():
+    """Return the stats row (single primary-key lookup)
+
+    If the row has not been seeded, returns an unsaved CommunityStats computed
+    from the source tables; run ``flask reconcile-stats`` to store it.
+    """
+    stats = db.session.get(CommunityStats, CommunityStats.GLOBAL_ID)
+    if stats is None:
+        stats = CommunityStats(id=CommunityStats.GLOBAL_ID, **compute_stats())
+    return stats
+
+
+def apply_stats_delta(**deltas):
+    """Atomically add deltas to the stats row in the current transaction.
+
+    Uses ``UPDATE ... SET col = col + :delta`` so concurrent writers never
+    overwrite each other. If the row has not been seeded yet this is a no-op;
+    the counters are computed on read until ``flask reconcile-stats`` stores
+    them. Does not commit.
+    """
+    values = {
+        getattr(CommunityStats, name): getattr(CommunityStats, name) + delta
+        for name, delta in deltas.items() if delta
+    }
+    if not values:
+        return
+
+    db.session.execute(
+        db.update(CommunityStats)
+        .where(CommunityStats.id == CommunityStats.GLOBAL_ID)
+        .values(values)
+    )
+
+
+def compute_stats():
+    """All counters from the source tables, as a dict of CommunityStats column values"""
+    total_actions, active_actions, total_participants = db.session.query(
+        db.func.count(CommunityAction.id),
+        db.func.coalesce(db.func.sum(db.case((CommunityAction.status == 'active', 1), else_=0)), 0),
+        db.func.coalesce(db.func.sum(CommunityAction.participants_count), 0)
+    ).one()
+    total_community_impact, total_impact_points = db.session.query(
+        db.func.coalesce(db.func.sum(Profile.community_impact), 0),
+        db.func.coalesce(db.func.sum(Profile.impact_points), 0)
+    ).one()
+    return {
+        'total_actions': total_actions,
+        'active_actions': active_actions,
+        'total_participants': total_participants,
+        'total_community_impact': total_community_impact,
+        'total_impact_points': total_impact_points
+    }
+
+
+def reconcile_stats(commit=True):
+    """Recompute all counters from the source tables and overwrite the stats row"""
+    counters = compute_stats()
+    stats = db.session.get(CommunityStats, CommunityStats.GLOBAL_ID)
+    if stats is None:
+        stats = CommunityStats(id=CommunityStats.GLOBAL_ID)
+        db.session.add(stats)
+
+    for name, value in counters.items():
+        setattr(stats, name, value)
+    stats.reconciled_at = datetime.utcnow()
+
+    if commit:
+        db.session.commit()
+    return stats
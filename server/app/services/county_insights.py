@@ -0,0 +1,168 @@
+"""Per-county dashboard insights, computed off the request path.
+
+A background job writes generated ``AIIntelligence`` rows for a county at
+most once per ``INSIGHTS_REFRESH_SECONDS``. Requests only read: the county's
+active rows are cached in-process for ``INSIGHTS_CACHE_SECONDS`` and shared
+by every user in that county, so a cold cache costs one indexed SELECT and
+a stale county schedules (not runs) a refresh.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.dashboard import AIIntelligence
+from app.services import background, geo
+from app.services.community_events import find_upcoming
+from app.services.dashboard_stats import county_figures
+
+DEFAULT_REFRESH_SECONDS = 900
+DEFAULT_CACHE_SECONDS = 60
+EVENT_RADIUS_KM = 50
+
+_cache = {}  # county -> (expires_at monotonic, [insight dicts])
+_lock = threading.Lock()
+
+
+def insight_to_dict(insight):
+    return {
+        'id': insight.id,
+        'insight_type': insight.insight_type,
+        'title': insight.title,
+        'description': insight.description,
+        'severity': insight.severity
+    }
+
+
+def active_insights_query(county, now=None):
+    """Unexpired generated insights; rows from the old per-request code never expire, so they are left out"""
+    now = now or datetime.utcnow()
+    return AIIntelligence.query.filter(
+        AIIntelligence.user_county == county,
+        AIIntelligence.is_active == True,
+        AIIntelligence.is_generated == True,
+        (AIIntelligence.expires_at.is_(None) | (AIIntelligence.expires_at > now))
+    )
+
+
+def needs_refresh(insights, now=None):
+    """True if the county has no generated rows or the newest is older than the refresh interval"""
+    generated = [insight.created_at for insight in insights if insight.created_at]
+    if not generated:
+        return True
+    refresh_seconds = current_app.config.get('INSIGHTS_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+    return (now or datetime.utcnow()) - max(generated) > timedelta(seconds=refresh_seconds)
+
+
+def get_county_insights(county):
+    """Read-only: cached insight dicts for a county, scheduling a refresh when stale"""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(county)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    rows = active_insights_query(county).order_by(AIIntelligence.id).all()
+    if county and needs_refresh(rows):
+        background.submit(current_app._get_current_object(), f"county-insights:{county}", refresh_county_insights, county)
+
+    insights = [insight_to_dict(row) for row in rows]
+    ttl = current_app.config.get('INSIGHTS_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+    with _lock:
+        _cache[county] = (now + ttl, insights)
+    return insights
+
+
+def invalidate(county=None):
+    with _lock:
+        if county is None:
+            _cache.clear()
+        else:
+            _cache.pop(county, None)
+
+
+def build_insights(county):
+    """Compute insight rows for a county from reports, alerts and upcoming actions"""
+    figures = county_figures(county)
+    insights = []
+
+    floods = figures['flood_reports_this_month']
+    if floods:
+        insights.append(AIIntelligence(
+            insight_type="flood",
+            title="Flood Risk Increasing" if floods >= 3 else "Flood Reports Nearby",
+            description=f"{floods} flood report{'s' if floods != 1 else ''} in your area this month. Avoid flooded roads and report blocked drains.",
+            severity="warning" if floods >= 3 else "info"
+        ))
+
+    heat_alert = figures['heat_alert']
+    if heat_alert is not None:
+        insights.append(AIIntelligence(
+            insight_type="heat",
+            title=heat_alert.type,
+            description=heat_alert.recommendation or heat_alert.description or "Stay hydrated and check on neighbors.",
+            severity="critical" if heat_alert.severity == 'Critical' else "warning"
+        ))
+
+    coords = geo.geocode(county)
+    upcoming = find_upcoming(lat=coords[0], lng=coords[1], radius_km=EVENT_RADIUS_KM, limit=1) if coords else []
+    if upcoming:
+        action, _ = upcoming[0]
+        insights.append(AIIntelligence(
+            insight_type="event",
+            title=action.title,
+            description=f"Join {action.participants_count or 0} community members on {action.date.strftime('%A, %d %b')} at {action.location}.",
+            severity="info"
+        ))
+    else:
+        insights.append(AIIntelligence(
+            insight_type="event",
+            title="Organize a Community Action",
+            description="No community actions are scheduled near you this week. Start one and invite your neighbours.",
+            severity="info"
+        ))
+
+    improvement = figures['air_quality_improvement']
+    if improvement > 0:
+        insights.append(AIIntelligence(
+            insight_type="air_quality",
+            title="Air Quality Improving",
+            description=f"Air pollution reports in your area are down {improvement:g}% on last month.",
+            severity="positive"
+        ))
+    elif figures['air_reports_this_month'] > figures['air_reports_last_month']:
+        insights.append(AIIntelligence(
+            insight_type="air_quality",
+            title="Air Pollution Reports Rising",
+            description=f"{figures['air_reports_this_month']} air pollution reports in your area this month, up from {figures['air_reports_last_month']}.",
+            severity="warning"
+        ))
+
+    return insights
+
+
+def refresh_county_insights(county, force=False):
+    """Replace a county's generated insights (skipped if another worker just did)"""
+    if not force and not needs_refresh(active_insights_query(county).all()):
+        return 0
+
+    now = datetime.utcnow()
+    refresh_seconds = current_app.config.get('INSIGHTS_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS)
+    insights = build_insights(county)
+    for insight in insights:
+        insight.user_county = county
+        insight.is_generated = True
+        insight.created_at = now
+        # Outlive one missed refresh so the dashboard never goes blank
+        insight.expires_at = now + timedelta(seconds=2 * refresh_seconds)
+
+    AIIntelligence.query.filter(
+        AIIntelligence.user_county == county,
+        AIIntelligence.is_generated == True
+    ).delete(synchronize_session=False)
+    db.session.add_all(insights)
+    db.session.commit()
+    invalidate(county)
+    return len(insights)
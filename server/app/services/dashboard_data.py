@@ -0,0 +1,123 @@
+"""The dashboard payload, shared by GET /api/dashboard/ and GET /api/bootstrap.
+
+Every part is a cached or indexed read: persisted per-user stats, the
+county's generated insights, the merged activity feed and the community
+stats row.
+"""
+from app.services.activity_feed import get_feed as get_activity_feed
+from app.services.community_stats import get_stats as get_community_stats
+from app.services.county_insights import get_county_insights
+from app.services.dashboard_stats import get_cached_stats
+
+
+def build_dashboard_data(user_id, profile):
+    """Assemble the dashboard payload from an already-loaded profile (or snapshot)"""
+    
+    # Persisted stats (one indexed read; stale rows refresh in the background)
+    dashboard_stats = calculate_dashboard_stats(user_id, profile)
+    
+    # Get AI insights based on user's location
+    ai_insights = get_ai_insights(profile.county)
+    
+    # Get recent activities
+    recent_activities = get_recent_activities(user_id, profile.county)
+    
+    # Platform-wide totals (single primary-key read)
+    community_stats = get_community_stats().to_dict()
+    
+    return {
+        "user": {
+            "name": profile.full_name or "User",
+            "stats": dashboard_stats
+        },
+        "aiInsights": ai_insights,
+        "recentActivities": recent_activities,
+        "communityStats": community_stats
+    }
+
+
+def calculate_dashboard_stats(user_id, profile):
+    """Serve persisted dashboard statistics, refreshed in the background"""
+    
+    stats = get_cached_stats(user_id)
+    if stats is None:
+        # First visit: profile counters until the background refresh lands
+        return {
+            "issuesReported": profile.issues_reported or 0,
+            "actionsJoined": profile.alerts_responded or 0,
+            "communityImpact": profile.community_impact or 0,
+            "treesPlanted": profile.trees_planted or 0,
+            "monthlyIssuesIncrease": profile.issues_this_month or 0,
+            "monthlyActionsIncrease": profile.alerts_this_month or 0
+        }
+    
+    return {
+        "issuesReported": stats.total_issues_reported or 0,
+        "actionsJoined": stats.total_actions_joined or 0,
+        "communityImpact": stats.total_community_impact or 0,
+        "treesPlanted": stats.total_trees_planted or 0,
+        "monthlyIssuesIncrease": stats.monthly_issues_increase or 0,
+        "monthlyActionsIncrease": stats.monthly_actions_increase or 0
+    }
+
+
+def get_ai_insights(county):
+    """Get AI-powered insights for user's county (read-only, shared per county)"""
+    
+    insights = get_county_insights(county)
+    
+    # Format for frontend
+    formatted_insights = []
+    for insight in insights:
+        formatted_insights.append({
+            "id": insight['id'],
+            "title": insight['title'],
+            "description": insight['description'],
+            "icon": get_icon_for_insight(insight['insight_type']),
+            "type": insight['insight_type'],
+            "color": get_color_for_severity(insight['severity']),
+            "buttonText": get_button_text(insight['insight_type'])
+        })
+    
+    return formatted_insights
+
+
+def get_recent_activities(user_id, county):
+    """Get recent activities: the user's timeline merged with county broadcasts"""
+    
+    activities = get_activity_feed(user_id, county)
+    
+    return [activity.to_dict() for activity in activities]
+
+
+def get_icon_for_insight(insight_type):
+    """Map insight type to icon name"""
+    icon_map = {
+        "flood": "Droplets",
+        "heat": "Flame", 
+        "event": "Users",
+        "air_quality": "Wind"
+    }
+    return icon_map.get(insight_type, "AlertTriangle")
+
+
+def get_color_for_severity(severity):
+    """Map severity to color"""
+    color_map = {
+        "critical": "red",
+        "warning": "orange", 
+        "info": "blue",
+        "positive": "green"
+    }
+    return color_map.get(severity, "blue")
+
+
+def get_button_text(insight_type):
+    """Get appropriate button text for insight type"""
+    button_map = {
+        "flood": "View Details",
+        "heat": "View Safety Tips",
+        "event": "Join Event", 
+        "air_quality": "Learn More"
+    }
+    return button_map.get(insight_type, "View Details")
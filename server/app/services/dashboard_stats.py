@@ -0,0 +1,163 @@
+"""Per-user dashboard statistics persisted in ``dashboard_stats``.
+
+Reads are a single indexed lookup by ``user_id``. Rows are recomputed in the
+background (never on the request path) when they are missing, older than
+``DASHBOARD_STATS_MAX_AGE`` seconds, or when a write event for the user
+arrives. Recomputation uses a handful of grouped aggregate queries.
+"""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.community import ActionParticipant
+from app.models.dashboard import DashboardStats
+from app.models.emergency import EmergencyAlert
+from app.models.profile import Profile
+from app.models.reports import Report
+from app.services import background, monthly_stats
+from app.services.community_events import count_upcoming_near
+from app.services.events import on, REPORT_CREATED, ACTION_JOINED, ACTION_LEFT, PROFILE_UPDATED
+
+DEFAULT_MAX_AGE_SECONDS = 300
+
+
+def start_of_month(now=None):
+    now = now or datetime.utcnow()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def county_name(county):
+    """Strip the ' County' suffix so 'Nairobi' and 'Nairobi County' compare equal"""
+    return (county or '').replace(' County', '').strip()
+
+
+def is_stale(stats, now=None):
+    if stats.last_updated is None:
+        return True
+    max_age = current_app.config.get('DASHBOARD_STATS_MAX_AGE', DEFAULT_MAX_AGE_SECONDS)
+    return (now or datetime.utcnow()) - stats.last_updated > timedelta(seconds=max_age)
+
+
+def get_cached_stats(user_id):
+    """Return the persisted row (or None), scheduling a refresh if missing or stale"""
+    stats = DashboardStats.query.filter_by(user_id=user_id).first()
+    if stats is None or is_stale(stats):
+        schedule_recalculation(user_id)
+    return stats
+
+
+def schedule_recalculation(user_id, after_write=False):
+    """Queue a background refresh; after a write, also rerun if one is already in flight"""
+    app = current_app._get_current_object()
+    submit = background.submit_latest if after_write else background.submit
+    submit(app, f"dashboard-stats:{user_id}", recalculate_dashboard_stats, user_id)
+
+
+def count_for_user(column_user_id, user_id):
+    return db.session.query(db.func.count()).filter(column_user_id == user_id).scalar()
+
+
+def county_figures(county):
+    """County-wide report, alert and event figures shared by every user in the county"""
+    month_start = start_of_month()
+    name = county_name(county)
+    if not name:
+        return {
+            'flood_reports_this_month': 0,
+            'air_reports_this_month': 0,
+            'air_reports_last_month': 0,
+            'air_quality_improvement': 0.0,
+            'heat_alert': None,
+            'upcoming_events_count': 0
+        }
+
+    # Report mix for this month and last, in one grouped query
+    previous_month_start = start_of_month(month_start - timedelta(days=1))
+    this_month = (Report.created_at >= month_start).label('this_month')
+    report_counts = {
+        (issue_type, bool(current)): count
+        for issue_type, current, count in db.session.query(
+            Report.issue_type, this_month, db.func.count()
+        ).filter(
+            Report.county == name,  # Stored normalised, so ix_reports_county_created_at applies
+            Report.created_at >= previous_month_start
+        ).group_by(Report.issue_type, this_month)
+    }
+
+    air_now = report_counts.get(('Air Pollution', True), 0)
+    air_before = report_counts.get(('Air Pollution', False), 0)
+
+    heat_alert = EmergencyAlert.query.filter(
+        EmergencyAlert.is_active == True,
+        EmergencyAlert.type.ilike('%heat%'),
+        EmergencyAlert.county.ilike(f"%{name}%")
+    ).order_by(EmergencyAlert.created_at.desc()).first()
+
+    return {
+        'flood_reports_this_month': report_counts.get(('Flooding', True), 0),
+        'air_reports_this_month': air_now,
+        'air_reports_last_month': air_before,
+        'air_quality_improvement': round((air_before - air_now) / air_before * 100, 1) if air_before else 0.0,
+        'heat_alert': heat_alert,
+        'upcoming_events_count': count_upcoming_near(county)
+    }
+
+
+def calculate(user_id, profile):
+    """Compute all dashboard figures for a user from source tables and monthly buckets"""
+    actions_joined = count_for_user(ActionParticipant.user_id, user_id)
+    issues_reported = count_for_user(Report.user_id, user_id)
+    this_month = monthly_stats.get_months(user_id, 1)[0]
+    county = county_figures(profile.county)
+
+    return {
+        'total_issues_reported': issues_reported,
+        'total_actions_joined': actions_joined,
+        'total_community_impact': profile.community_impact or 0,
+        'total_trees_planted': profile.trees_planted or 0,
+        'monthly_issues_increase': this_month.issues,
+        'monthly_actions_increase': this_month.alerts,
+        'flood_reports_this_month': county['flood_reports_this_month'],
+        'heat_alerts_active': county['heat_alert'] is not None,
+        'upcoming_events_count': county['upcoming_events_count'],
+        'air_quality_improvement': county['air_quality_improvement']
+    }
+
+
+def recalculate_dashboard_stats(user_id):
+    """Recompute and persist one user's dashboard stats"""
+    profile = Profile.query.filter_by(user_id=user_id).first()
+    if not profile:
+        return None
+
+    values = calculate(user_id, profile)
+    stats = DashboardStats.query.filter_by(user_id=user_id).first()
+    if stats is None:
+        stats = DashboardStats(user_id=user_id)
+        db.session.add(stats)
+
+    for field, value in values.items():
+        setattr(stats, field, value)
+    stats.last_updated = datetime.utcnow()
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker inserted the row first; update theirs instead
+        db.session.rollback()
+        stats = DashboardStats.query.filter_by(user_id=user_id).first()
+        for field, value in values.items():
+            setattr(stats, field, value)
+        stats.last_updated = datetime.utcnow()
+        db.session.commit()
+    return stats
+
+
+@on(REPORT_CREATED)
+@on(ACTION_JOINED)
+@on(ACTION_LEFT)
+@on(PROFILE_UPDATED)
+def handle_user_activity(user_id, **_):
+    schedule_recalculation(int(user_id), after_write=True)
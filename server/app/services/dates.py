@@ -0,0 +1,10 @@
+"""Date parsing shared by the routes that take ISO 8601 query parameters."""
+from datetime import datetime, timezone
+
+
+def parse_iso_datetime(value):
+    """Parse an ISO 8601 query parameter into a naive UTC datetime; raises ValueError"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,35 @@
+"""Minimal in-process domain event bus.
+
+Routes ``emit`` after their transaction commits; services subscribe with
+``@on(EVENT)`` when they are initialised in ``create_app``. Handler errors
+are logged and swallowed so a failing subscriber never fails the request.
+"""
+from collections import defaultdict
+
+IMPACT_POINTS_CHANGED = 'impact_points_changed'  # user_id, county, impact_points
+REPORT_CREATED = 'report_created'  # user_id, report_id, county
+ACTION_JOINED = 'action_joined'  # user_id, action_id
+ACTION_LEFT = 'action_left'  # user_id, action_id
+PROFILE_UPDATED = 'profile_updated'  # user_id, fields (names of the columns that changed)
+ALERT_ISSUED = 'alert_issued'  # alert_id, county
+ACHIEVEMENT_UNLOCKED = 'achievement_unlocked'  # user_id, achievement_id, name
+USERS_IMPORTED = 'users_imported'  # members: [(user_id, county)], all with 0 points
+
+_handlers = defaultdict(list)
+
+
+def on(event):
+    """Decorator registering a handler for an event (idempotent)"""
+    def decorator(handler):
+        if handler not in _handlers[event]:
+            _handlers[event].append(handler)
+        return handler
+    return decorator
+
+
+def emit(event, **payload):
+    for handler in list(_handlers[event]):
+        try:
+            handler(**payload)
+        except Exception as e:
+            print(f"Event handler error ({event}, {handler.__name__}): {e}")
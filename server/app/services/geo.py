@@ -0,0 +1,137 @@
+"""Lightweight geocoding and grid cells for proximity queries.
+
+There is no external geocoder; free-text locations are matched against a
+small gazetteer of Kenyan counties, towns and well-known Nairobi areas.
+Coordinates are bucketed into fixed-size grid cells so "near me" queries can
+use an indexed ``geo_cell IN (...)`` filter before the exact distance check.
+"""
+import math
+import re
+
+# Grid cell size in degrees (~11km at the equator)
+GRID_STEP_DEG = 0.1
+# Above this many covering cells the cell filter stops being selective
+MAX_COVERING_CELLS = 400
+EARTH_RADIUS_KM = 6371.0
+
+# Approximate centre points (lat, lng), most specific first
+GAZETTEER = {
+    # Nairobi areas
+    'westlands': (-1.2676, 36.8108),
+    'karura': (-1.2443, 36.8330),
+    'kibera': (-1.3133, 36.7870),
+    'karen': (-1.3190, 36.7073),
+    'kasarani': (-1.2210, 36.8970),
+    'embakasi': (-1.3200, 36.9000),
+    'ngong': (-1.3527, 36.6699),
+    'ruiru': (-1.1466, 36.9609),
+    'juja': (-1.1020, 37.0140),
+    # Coast
+    'diani': (-4.2795, 39.5947),
+    'watamu': (-3.3540, 40.0240),
+    'malindi': (-3.2192, 40.1169),
+    'voi': (-3.3961, 38.5561),
+    # County seats and major towns
+    'nairobi': (-1.2864, 36.8172),
+    'mombasa': (-4.0435, 39.6682),
+    'kisumu': (-0.0917, 34.7680),
+    'nakuru': (-0.3031, 36.0800),
+    'eldoret': (0.5143, 35.2698),
+    'uasin gishu': (0.5143, 35.2698),
+    'thika': (-1.0333, 37.0693),
+    'kitale': (1.0157, 35.0062),
+    'trans nzoia': (1.0157, 35.0062),
+    'garissa': (-0.4532, 39.6461),
+    'kakamega': (0.2827, 34.7519),
+    'machakos': (-1.5177, 37.2634),
+    'nyeri': (-0.4201, 36.9476),
+    'meru': (0.0470, 37.6498),
+    'embu': (-0.5388, 37.4596),
+    'kilifi': (-3.6305, 39.8499),
+    'nanyuki': (0.0167, 37.0667),
+    'laikipia': (0.0167, 37.0667),
+    'naivasha': (-0.7167, 36.4333),
+    'kericho': (-0.3689, 35.2863),
+    'kisii': (-0.6817, 34.7667),
+    'bungoma': (0.5635, 34.5606),
+    'kiambu': (-1.1714, 36.8356),
+    'kajiado': (-1.8524, 36.7768),
+    'narok': (-1.0783, 35.8601),
+    'lamu': (-2.2717, 40.9020),
+    'kwale': (-4.1816, 39.4606),
+    'taita taveta': (-3.3961, 38.5561),
+    'tana river': (-1.5000, 40.0300),
+    'lodwar': (3.1191, 35.5973),
+    'turkana': (3.1191, 35.5973),
+    'marsabit': (2.3284, 37.9899),
+    'isiolo': (0.3546, 37.5822),
+    'wajir': (1.7471, 40.0573),
+    'mandera': (3.9366, 41.8670),
+    'homa bay': (-0.5273, 34.4571),
+    'migori': (-1.0634, 34.4731),
+    'siaya': (0.0612, 34.2881),
+    'busia': (0.4608, 34.1115),
+    'vihiga': (0.0760, 34.7229),
+    'west pokot': (1.2389, 35.1119),
+    'baringo': (0.4919, 35.7430),
+    'elgeyo marakwet': (0.6703, 35.5081),
+    'nandi': (0.2039, 35.1050),
+    'bomet': (-0.7813, 35.3416),
+    'nyamira': (-0.5633, 34.9358),
+    'samburu': (1.0968, 36.6981),
+    "murang'a": (-0.7210, 37.1526),
+    'muranga': (-0.7210, 37.1526),
+    'kirinyaga': (-0.4989, 37.2803),
+    'nyandarua': (-0.2711, 36.3778),
+    'tharaka nithi': (-0.3333, 37.6500),
+    'kitui': (-1.3670, 38.0106),
+    'makueni': (-1.7817, 37.6289),
+}
+
+# Checked in insertion order so specific areas win over their town or county
+_GAZETTEER_PATTERNS = [
+    (re.compile(r'\b' + re.escape(name) + r'\b'), coords)
+    for name, coords in GAZETTEER.items()
+]
+
+
+def geocode(location):
+    """Resolve a free-text location to (lat, lng) or None"""
+    if not location:
+        return None
+    text = location.lower().replace('-', ' ')
+    for pattern, coords in _GAZETTEER_PATTERNS:
+        if pattern.search(text):
+            return coords
+    return None
+
+
+def cell_for(lat, lng):
+    """Grid cell id for a coordinate"""
+    return f"{math.floor(lat / GRID_STEP_DEG)}:{math.floor(lng / GRID_STEP_DEG)}"
+
+
+def bounding_box(lat, lng, radius_km):
+    """Return (min_lat, max_lat, min_lng, max_lng) enclosing the radius"""
+    dlat = radius_km / 111.0
+    dlng = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def covering_cells(lat, lng, radius_km):
+    """Grid cells intersecting the radius' bounding box, or None if too many"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    rows = range(math.floor(min_lat / GRID_STEP_DEG), math.floor(max_lat / GRID_STEP_DEG) + 1)
+    cols = range(math.floor(min_lng / GRID_STEP_DEG), math.floor(max_lng / GRID_STEP_DEG) + 1)
+    if len(rows) * len(cols) > MAX_COVERING_CELLS:
+        return None
+    return [f"{row}:{col}" for row in rows for col in cols]
+
+
+def distance_km(lat1, lng1, lat2, lng2):
+    """Great-circle (haversine) distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
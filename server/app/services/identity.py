@@ -0,0 +1,110 @@
+"""Identity context: the JWT user and their profile, resolved once.
+
+``current_identity()`` memoizes the (user, profile) pair on ``flask.g`` for
+the rest of the request. Behind it sits a small process-wide LRU of
+read-only snapshots keyed by user id and a per-user version stamp; any
+event that changes a profile bumps the stamp, so the next lookup misses and
+reloads with one joined query. Entries also expire after
+``IDENTITY_CACHE_SECONDS`` to bound staleness across worker processes.
+
+Snapshots are for reads only; endpoints that modify a profile still load it
+through the session.
+"""
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity
+
+from app.extensions import db
+from app.models.auth import User
+from app.models.profile import Profile
+from app.services.events import (
+    on, PROFILE_UPDATED, IMPACT_POINTS_CHANGED, REPORT_CREATED, ACTION_JOINED, ACTION_LEFT
+)
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_SECONDS = 60
+
+_cache = OrderedDict()  # user_id -> (version, expires_at monotonic, user, profile)
+_versions = {}  # user_id -> profile version stamp
+_lock = threading.Lock()
+
+
+class CachedUser(SimpleNamespace):
+    """Read-only snapshot of a users row (id, email, created_at)"""
+
+
+class CachedProfile(SimpleNamespace):
+    """Read-only snapshot of a profiles row, with the attributes of Profile.to_dict()"""
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def load_user_and_profile(user_id):
+    """Return (user, profile or None) with a single outer join, or None if no user"""
+    return db.session.query(User, Profile)\
+        .outerjoin(Profile, Profile.user_id == User.id)\
+        .filter(User.id == user_id)\
+        .first()
+
+
+def snapshot(user, profile):
+    return (
+        CachedUser(id=user.id, email=user.email, created_at=user.created_at),
+        CachedProfile(**profile.to_dict()) if profile else None
+    )
+
+
+def load_identity(user_id):
+    """(user, profile) snapshots for a user id via the LRU, or (None, None)"""
+    now = time.monotonic()
+    with _lock:
+        version = _versions.get(user_id, 0)
+        entry = _cache.get(user_id)
+        if entry and entry[0] == version and entry[1] > now:
+            _cache.move_to_end(user_id)
+            return entry[2], entry[3]
+
+    row = load_user_and_profile(user_id)
+    if not row:
+        return None, None
+    user, profile = snapshot(*row)
+
+    config = current_app.config
+    ttl = config.get('IDENTITY_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+    max_size = config.get('IDENTITY_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+    with _lock:
+        # Only store if no update landed while we were loading
+        if _versions.get(user_id, 0) == version:
+            _cache[user_id] = (version, now + ttl, user, profile)
+            _cache.move_to_end(user_id)
+            while len(_cache) > max_size:
+                _cache.popitem(last=False)
+    return user, profile
+
+
+def current_identity():
+    """(user, profile) for the JWT identity, memoized for the request; (None, None) if anonymous"""
+    if 'identity' not in g:
+        identity = get_jwt_identity()
+        g.identity = load_identity(int(identity)) if identity else (None, None)
+    return g.identity
+
+
+def invalidate(user_id):
+    with _lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+        _cache.pop(user_id, None)
+
+
+@on(PROFILE_UPDATED)
+@on(IMPACT_POINTS_CHANGED)
+@on(REPORT_CREATED)
+@on(ACTION_JOINED)
+@on(ACTION_LEFT)
+def handle_profile_changed(user_id, **_):
+    invalidate(int(user_id))
@@ -0,0 +1,413 @@
+"""Image variants, rendered off the request path, stored by content.
+
+An upload is named by the SHA-256 of its bytes, so the same photo uploaded
+again (it is often shared across reports and actions) is stored once. The
+digest is checked before any decoding, and a repeat upload returns the
+existing URLs without re-encoding anything. ``image_references`` records
+which users own each blob, with a count on ``image_blobs``. Releasing a
+reference never deletes files, since a report, action or profile may still
+link them (one user can attach a photo to several reports); ``flask
+gc-uploads`` deletes them once nothing does.
+
+Files live in the configured storage (see ``app.services.storage``) under
+a two-level shard of the digest, e.g. ``images/3f/a2/3fa2...c1.thumb.webp``.
+That keeps each directory or listing small. Uploads from before content
+addressing (``<uuid>_<user>.jpg``) stay where they are, directly under
+``images/``.
+
+An upload either comes through the app, or goes straight to storage: with
+``prepare_direct_upload`` the client gets a presigned PUT, and with
+``complete_direct_upload`` it reports the upload done. Either way the
+original is stored under ``originals/`` and the request returns. A process
+pool then decodes it once and writes each variant as JPEG and WebP:
+
+=========  ===========  ===================================
+variant    bounding box file (for ``<digest>.jpg``)
+=========  ===========  ===================================
+thumb      160 x 160    ``<digest>.thumb.jpg`` / ``.webp``
+card       480 x 360    ``<digest>.card.jpg`` / ``.webp``
+full       1600 x 1200  ``<digest>.jpg`` / ``<digest>.webp``
+=========  ===========  ===================================
+
+The full JPEG is written last, so its presence means the image is done.
+Until then, requests for any variant are served the original.
+``process-pending-images`` re-queues any original whose variants are
+missing, e.g. after a restart mid-job.
+"""
+import hashlib
+import io
+import math
+import posixpath
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from itsdangerous import BadData, URLSafeTimedSerializer
+from PIL import ExifTags, Image, ImageOps
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.uploads import ImageBlob, ImageReference
+from app.services import storage
+from app.services.storage import get_storage
+from app.services.upload_limits import sniff
+
+VARIANTS = {
+    'thumb': (160, 160),
+    'card': (480, 360),
+    'full': (1600, 1200),
+}
+FORMATS = {'jpg': 'JPEG', 'webp': 'WEBP'}
+ORIGINAL_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'webp')
+CONTENT_TYPES = {'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif', 'webp': 'image/webp'}
+QUALITY = {'JPEG': 85, 'WEBP': 80}
+DEFAULT_WORKERS = 2
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# A content-addressed name never changes content; legacy names may be deleted but are never rewritten
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+LEGACY_CACHE_CONTROL = 'public, max-age=86400'
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ------------------- Keys -------------------
+
+def shard(stem):
+    """'3fa2...' -> '3f/a2'; legacy '<uuid>_<user>' names are not sharded"""
+    return f"{stem[:2]}/{stem[2:4]}" if is_content_addressed(stem) else ''
+
+
+def stem_of(name):
+    return name.split('.', 1)[0]
+
+
+def is_content_addressed(name):
+    return bool(DIGEST_PATTERN.match(stem_of(name)))
+
+
+def image_key(name):
+    """Storage key of the variant file called ``name``"""
+    return posixpath.join('images', shard(stem_of(name)), name)
+
+
+def original_key(filename, extension):
+    stem = stem_of(filename)
+    return posixpath.join('originals', shard(stem), f"{stem}.{extension}")
+
+
+def variant_name(filename, variant='full', fmt='jpg'):
+    """'<digest>.jpg' -> '<digest>.thumb.webp' etc."""
+    stem = stem_of(filename)
+    return f"{stem}.{fmt}" if variant == 'full' else f"{stem}.{variant}.{fmt}"
+
+
+def variant_names(filename):
+    return [variant_name(filename, variant, fmt) for variant in VARIANTS for fmt in FORMATS]
+
+
+def parse_name(name):
+    """'<digest>.card.webp' -> ('<digest>.jpg', 'card', 'webp'), or None"""
+    parts = name.split('.')
+    if len(parts) == 2 and parts[1] in FORMATS:
+        return f"{parts[0]}.jpg", 'full', parts[1]
+    if len(parts) == 3 and parts[1] in VARIANTS and parts[2] in FORMATS:
+        return f"{parts[0]}.jpg", parts[1], parts[2]
+    return None
+
+
+def variant_urls(filename, url_prefix='/api/upload/images'):
+    return {
+        variant: {fmt: f"{url_prefix}/{variant_name(filename, variant, fmt)}" for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def find_original(filename):
+    """Storage key of the stored original for '<digest>.jpg', or None"""
+    target = get_storage()
+    for extension in ORIGINAL_EXTENSIONS:
+        key = original_key(filename, extension)
+        if target.exists(key):
+            return key
+    return None
+
+
+def is_processed(filename):
+    return get_storage().exists(image_key(filename))
+
+
+# ------------------- Writing -------------------
+
+def check_image(data, max_pixels=None):
+    """Raise ValueError unless the bytes parse as an image no larger than max_pixels
+
+    Only the header and structure are read; nothing is decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            check_pixels(img, max_pixels)
+            img.verify()
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Not a valid image: {e}")
+
+
+def check_pixels(img, max_pixels):
+    if max_pixels and img.width * img.height > max_pixels:
+        raise ValueError(
+            f"Image is too large ({img.width}x{img.height}); the limit is {max_pixels / 1_000_000:g} megapixels"
+        )
+
+
+def fitted_size(size, box):
+    """Size of an image of ``size`` after ``thumbnail(box)``"""
+    scale = min(box[0] / size[0], box[1] / size[1], 1)
+    return max(1, math.ceil(size[0] * scale)), max(1, math.ceil(size[1] * scale))
+
+
+def store_original(data, filename, extension):
+    """Persist the uploaded bytes; returns the original's key"""
+    key = original_key(filename, extension)
+    get_storage().put(key, data, CONTENT_TYPES[extension])
+    return key
+
+
+def delete_files(filename):
+    """Remove every variant and the original of an image"""
+    keys = [image_key(name) for name in variant_names(filename)]
+    keys.extend(original_key(filename, extension) for extension in ORIGINAL_EXTENSIONS)
+    get_storage().delete(keys)
+
+
+def open_verified(target, original_key, filename):
+    """Open an original, checking its bytes still hash to its name
+
+    Direct uploads are pinned by a signed checksum, but not every
+    S3-compatible store enforces it.
+    """
+    source = target.open(original_key)
+    if is_content_addressed(filename) and hashlib.file_digest(source, 'sha256').hexdigest() != stem_of(filename):
+        source.close()
+        target.delete([original_key])
+        raise ValueError(f"{original_key} does not match its checksum; deleted")
+    source.seek(0)
+    return source
+
+
+def render_variants(storage_options, original_key, filename, max_pixels=None):
+    """Decode once, write every variant (runs in a pool process); returns files written"""
+    target = storage.create(storage_options)
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_content_addressed(filename) else LEGACY_CACHE_CONTROL
+    with open_verified(target, original_key, filename) as source, Image.open(source) as img:
+        check_pixels(img, max_pixels)
+        if img.format == 'JPEG':
+            # libjpeg can decode at 1/2, 1/4 or 1/8 scale; ask for just enough for the largest variant
+            box = max(VARIANTS.values())
+            if img.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8):
+                box = box[::-1]  # Stored sideways, shown upright
+            img.draft('RGB', fitted_size(img.size, box))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != 'RGB':
+            # Flatten transparency onto white, as JPEG has no alpha
+            rgba = img.convert('RGBA')
+            img = Image.new('RGB', rgba.size, (255, 255, 255))
+            img.paste(rgba, mask=rgba.split()[-1])
+
+        written = []
+        # Largest first so each smaller variant is resized from the previous one
+        for variant, box in sorted(VARIANTS.items(), key=lambda item: -item[1][0]):
+            img = img.copy()
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+            # Full JPEG last: its presence marks the image as processed
+            for fmt in sorted(FORMATS, key=lambda f: variant == 'full' and f == 'jpg'):
+                output = io.BytesIO()
+                img.save(output, format=FORMATS[fmt], quality=QUALITY[FORMATS[fmt]], optimize=True)
+                name = variant_name(filename, variant, fmt)
+                target.put(image_key(name), output.getvalue(), CONTENT_TYPES[fmt], cache_control)
+                written.append(name)
+    return written
+
+
+# ------------------- Pool -------------------
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=current_app.config.get('IMAGE_WORKERS', DEFAULT_WORKERS)
+                )
+    return _pool
+
+
+def schedule(original_key, filename):
+    """Render variants in the background; returns the Future"""
+    future = get_pool().submit(render_variants, storage.settings(), original_key, filename,
+                               current_app.config.get('IMAGE_MAX_PIXELS'))
+
+    def report(done):
+        if done.exception():
+            print(f"Image processing failed for {filename}: {done.exception()}")
+
+    future.add_done_callback(report)
+    return future
+
+
+def process_pending(wait=True):
+    """Queue every original that has no full JPEG yet; returns how many"""
+    futures = []
+    for key in get_storage().iter_keys('originals/'):
+        filename = f"{stem_of(posixpath.basename(key))}.jpg"
+        if not is_processed(filename):
+            futures.append(schedule(key, filename))
+    if wait:
+        for future in futures:
+            future.exception()
+    return len(futures)
+
+
+# ------------------- Blobs -------------------
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_or_create_blob(digest, extension, byte_size):
+    """Returns (blob, created); commits a new blob"""
+    blob = ImageBlob.query.filter_by(digest=digest).first()
+    if blob:
+        return blob, False
+    try:
+        blob = ImageBlob(digest=digest, extension=extension, byte_size=byte_size, ref_count=0)
+        db.session.add(blob)
+        db.session.commit()
+        return blob, True
+    except IntegrityError:
+        # The same image was uploaded concurrently
+        db.session.rollback()
+        return ImageBlob.query.filter_by(digest=digest).one(), False
+
+
+def add_reference(user_id, digest, extension, byte_size):
+    """Record that user_id owns the image; commits. Returns (blob, created)."""
+    for _ in range(3):
+        blob, created = get_or_create_blob(digest, extension, byte_size)
+        if ImageReference.query.filter_by(user_id=user_id, blob_id=blob.id).first():
+            return blob, created
+        try:
+            db.session.add(ImageReference(user_id=user_id, blob_id=blob.id))
+            db.session.execute(
+                db.update(ImageBlob)
+                .where(ImageBlob.id == blob.id)
+                .values(ref_count=ImageBlob.ref_count + 1)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return blob, created
+        except IntegrityError:
+            # A double submit beat us to it, or the blob was released meanwhile: look again
+            db.session.rollback()
+    raise RuntimeError(f"Could not reference image {digest}")
+
+
+def store(data, extension, user_id):
+    """Content-address an upload for user_id; returns (filename, status)
+
+    Raises ValueError if a new upload is not an image. A known digest is
+    served from what is already stored, with nothing decoded or encoded.
+    """
+    digest = content_digest(data)
+    filename = f"{digest}.jpg"
+    if not ImageBlob.query.filter_by(digest=digest).first():
+        check_image(data, current_app.config.get('IMAGE_MAX_PIXELS'))
+    add_reference(int(user_id), digest, extension, len(data))
+
+    if is_processed(filename):
+        return filename, 'ready'
+    if not get_storage().exists(original_key(filename, extension)):
+        # New, or its files were lost: (re)store and render
+        schedule(store_original(data, filename, extension), filename)
+    return filename, 'processing'
+
+
+def release(user_id, filename):
+    """Drop user_id's reference, leaving the files to gc-uploads; False if not an owner"""
+    blob = ImageBlob.query.filter_by(digest=stem_of(filename)).first()
+    if not blob:
+        return False
+    removed = ImageReference.query.filter_by(user_id=int(user_id), blob_id=blob.id).delete(synchronize_session=False)
+    if not removed:
+        db.session.rollback()
+        return False
+    db.session.execute(
+        db.update(ImageBlob)
+        .where(ImageBlob.id == blob.id)
+        .values(ref_count=ImageBlob.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return True
+
+
+# ------------------- Direct uploads -------------------
+
+def ticket_signer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='image-upload-ticket')
+
+
+def prepare_direct_upload(user_id, digest, extension, size):
+    """Start an upload that goes straight to storage
+
+    Returns {'filename', 'status', 'upload', 'ticket'}. If the image is
+    already stored, the user just gets a reference to it and 'upload' is
+    None. Otherwise the client PUTs the bytes to upload['url'] with
+    upload['headers'], then passes the ticket to complete_direct_upload.
+    """
+    filename = f"{digest}.jpg"
+    key = original_key(filename, extension)
+    if ImageBlob.query.filter_by(digest=digest).first() and (is_processed(filename) or get_storage().exists(key)):
+        add_reference(int(user_id), digest, extension, size)
+        return {'filename': filename, 'status': 'ready' if is_processed(filename) else 'processing',
+                'upload': None, 'ticket': None}
+
+    expires = storage.url_seconds()
+    return {
+        'filename': filename,
+        'status': 'awaiting_upload',
+        'upload': get_storage().presigned_put(key, CONTENT_TYPES[extension], size, digest, expires),
+        'ticket': ticket_signer().dumps({'u': int(user_id), 'd': digest, 'e': extension, 's': size})
+    }
+
+
+def complete_direct_upload(user_id, ticket):
+    """Check a finished direct upload and queue its variants; returns (filename, status)
+
+    Raises ValueError if the ticket is bad or the stored object is not the promised image.
+    """
+    try:
+        terms = ticket_signer().loads(ticket, max_age=2 * storage.url_seconds())
+    except BadData:
+        raise ValueError("Upload ticket is invalid or expired")
+    if terms['u'] != int(user_id):
+        raise ValueError("Upload ticket belongs to another user")
+
+    filename = f"{terms['d']}.jpg"
+    key = original_key(filename, terms['e'])
+    target = get_storage()
+    size = target.size(key)
+    if size is None:
+        raise ValueError("Upload not found; PUT the file to the upload URL first")
+    # The presigned PUT already pins length and checksum; this catches anything that slipped past
+    if size != terms['s'] or sniff(target.read_head(key, 16)) is None:
+        target.delete([key])
+        raise ValueError("Uploaded file is not the image that was announced")
+
+    add_reference(terms['u'], terms['d'], terms['e'], size)
+    if is_processed(filename):
+        return filename, 'ready'
+    schedule(key, filename)
+    return filename, 'processing'
@@ -0,0 +1,187 @@
+"""Impact-points leaderboards, national and per county.
+
+Each board is a sorted ``array('q')`` of packed keys ``(-points << 32) + user_id``
+so ordering is points descending, then user id ascending. Rank and top-N
+lookups are binary searches / slices (O(log n)); a point change is one
+search plus an in-place memmove. Boards are rebuilt from ``profiles`` on
+first use and again in the background once older than
+``LEADERBOARD_REBUILD_SECONDS``, and are kept current in between by
+``IMPACT_POINTS_CHANGED`` events. Updates that arrive while a rebuild is
+reading profiles are replayed onto the new boards before they go live.
+County boards are keyed by ``county_name``, so 'Nairobi' and 'Nairobi
+County' share one.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+from flask import current_app
+
+from app.extensions import db
+from app.models.profile import Profile
+from app.services import background
+from app.services.dashboard_stats import county_name
+from app.services.events import on, IMPACT_POINTS_CHANGED, USERS_IMPORTED
+
+NATIONAL = None  # board key for the national leaderboard
+DEFAULT_REBUILD_SECONDS = 600
+_USER_ID_BITS = 32
+
+
+def pack(points, user_id):
+    return (-(points or 0) << _USER_ID_BITS) + user_id
+
+
+def unpack(key):
+    points = -(key >> _USER_ID_BITS)
+    return points, key - (-points << _USER_ID_BITS)
+
+
+class Leaderboard:
+    """Sorted board of (points, user_id) entries"""
+
+    def __init__(self, keys=None):
+        self._keys = array('q', sorted(keys) if keys else [])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, points, user_id):
+        insort(self._keys, pack(points, user_id))
+
+    def remove(self, points, user_id):
+        key = pack(points, user_id)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+    def rank(self, points):
+        """1-based competition rank: 1 + number of entries with more points"""
+        return bisect_left(self._keys, pack(points, 0)) + 1
+
+    def top(self, limit):
+        return [unpack(key) for key in self._keys[:limit]]
+
+
+class LeaderboardRegistry:
+    """National board, one board per county, and each member's current entry"""
+
+    def __init__(self):
+        self.national = Leaderboard()
+        self.counties = {}
+        self.members = {}  # user_id -> (county, points)
+        self.built_at = None
+        self._lock = threading.Lock()
+        self._replays = []  # one list per load in progress, of updates made since it started
+
+    def load(self, rows):
+        """Replace all boards from an iterable of (user_id, county, points)"""
+        replay = []
+        with self._lock:
+            self._replays.append(replay)
+        try:
+            members = {}
+            by_county = {}
+            for user_id, county, points in rows:
+                county, points = county_name(county) or None, points or 0
+                members[user_id] = (county, points)
+                by_county.setdefault(county, []).append(pack(points, user_id))
+
+            national = Leaderboard(key for keys in by_county.values() for key in keys)
+            counties = {county: Leaderboard(keys) for county, keys in by_county.items() if county}
+
+            with self._lock:
+                self.national, self.counties, self.members = national, counties, members
+                # The rows may predate these; applying them again is a no-op if they don't
+                for args in replay:
+                    self._apply(*args)
+                self.built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._replays.remove(replay)
+
+    def update(self, user_id, county, points):
+        """Move a member to their new county/points"""
+        county, points = county_name(county) or None, points or 0
+        with self._lock:
+            for replay in self._replays:
+                replay.append((user_id, county, points))
+            self._apply(user_id, county, points)
+
+    def _apply(self, user_id, county, points):
+        """update() with the lock held and the county already normalised"""
+        previous = self.members.get(user_id)
+        if previous == (county, points):
+            return
+        if previous:
+            old_county, old_points = previous
+            self.national.remove(old_points, user_id)
+            if old_county in self.counties:
+                self.counties[old_county].remove(old_points, user_id)
+
+        self.national.add(points, user_id)
+        if county:
+            self.counties.setdefault(county, Leaderboard()).add(points, user_id)
+        self.members[user_id] = (county, points)
+
+    def board(self, county=NATIONAL):
+        if county is NATIONAL:
+            return self.national
+        return self.counties.get(county) or Leaderboard()
+
+    def top(self, county=NATIONAL, limit=10):
+        with self._lock:
+            return self.board(county).top(limit)
+
+    def rank(self, user_id):
+        """Return {'points', 'county', 'national_rank', 'county_rank', ...} or None"""
+        with self._lock:
+            member = self.members.get(user_id)
+            if member is None:
+                return None
+            county, points = member
+            county_board = self.board(county) if county else None
+            return {
+                'points': points,
+                'county': county,
+                'national_rank': self.national.rank(points),
+                'national_total': len(self.national),
+                'county_rank': county_board.rank(points) if county_board is not None else None,
+                'county_total': len(county_board) if county_board is not None else None
+            }
+
+
+_registry = LeaderboardRegistry()
+
+
+def load_from_db(registry=None, batch_size=10000):
+    """Rebuild boards from profiles, streaming rows in batches"""
+    rows = db.session.query(Profile.user_id, Profile.county, Profile.impact_points)\
+        .execution_options(yield_per=batch_size)
+    (registry or _registry).load(rows)
+
+
+def get_registry():
+    """Return the registry, building it on first use and refreshing it in the background when stale"""
+    if _registry.built_at is None:
+        load_from_db()
+    else:
+        max_age = current_app.config.get('LEADERBOARD_REBUILD_SECONDS', DEFAULT_REBUILD_SECONDS)
+        if time.monotonic() - _registry.built_at > max_age:
+            background.submit(current_app._get_current_object(), 'leaderboard-rebuild', load_from_db)
+    return _registry
+
+
+@on(IMPACT_POINTS_CHANGED)
+def handle_points_changed(user_id, county, impact_points, **_):
+    # Nothing to maintain until the first read builds the boards
+    if _registry.built_at is not None:
+        _registry.update(int(user_id), county, impact_points)
+
+
+@on(USERS_IMPORTED)
+def handle_users_imported(members, **_):
+    if _registry.built_at is not None:
+        for user_id, county in members:
+            _registry.update(user_id, county, 0)
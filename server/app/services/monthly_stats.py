@@ -0,0 +1,193 @@
+"""Per-user monthly activity buckets in ``monthly_user_stats``.
+
+Writes add to the current ``(user_id, month)`` bucket with a single
+``UPDATE ... SET col = col + n`` (inserting the bucket first if it does not
+exist yet), inside the caller's transaction. "This month" and "vs last
+month" are read from buckets. The ``*_this_month`` columns on ``profiles``
+are a denormalised copy of the current bucket; ``rollover`` re-syncs them in
+primary-key chunks at the start of each month so they never go stale.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.profile import MonthlyStats, Profile
+
+FIELDS = ('issues', 'alerts', 'impact', 'trees')
+
+# Bucket field -> denormalised profile column
+PROFILE_COLUMNS = {
+    'issues': 'issues_this_month',
+    'alerts': 'alerts_this_month',
+    'impact': 'impact_this_month',
+    'trees': 'trees_this_month',
+}
+
+
+def month_start(day=None):
+    return (day or datetime.utcnow().date()).replace(day=1)
+
+
+def previous_month(month):
+    return month_start(month - timedelta(days=1))
+
+
+def increment_many(user_ids, month=None, **deltas):
+    """Add deltas (e.g. issues=1) to each user's bucket for `month`. Does not commit."""
+    user_ids = list(dict.fromkeys(user_ids))
+    deltas = {field: value for field, value in deltas.items() if value}
+    unknown = set(deltas) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown monthly stats fields: {', '.join(sorted(unknown))}")
+    if not user_ids or not deltas:
+        return
+    month = month or month_start()
+
+    existing = {
+        user_id for (user_id,) in db.session.query(MonthlyStats.user_id).filter(
+            MonthlyStats.month == month,
+            MonthlyStats.user_id.in_(user_ids)
+        )
+    }
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        rows = [
+            dict({field: max(deltas.get(field, 0), 0) for field in FIELDS}, user_id=user_id, month=month)
+            for user_id in missing
+        ]
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(MonthlyStats), rows)
+        except IntegrityError:
+            # A concurrent writer created some of these buckets: insert one
+            # at a time and add to the ones that now exist
+            for row in rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(MonthlyStats), [row])
+                except IntegrityError:
+                    existing.add(row['user_id'])
+
+    if existing:
+        db.session.execute(
+            db.update(MonthlyStats)
+            .where(MonthlyStats.month == month, MonthlyStats.user_id.in_(existing))
+            .values({
+                getattr(MonthlyStats, field): db.case(
+                    (getattr(MonthlyStats, field) + value < 0, 0),
+                    else_=getattr(MonthlyStats, field) + value
+                )
+                for field, value in deltas.items()
+            })
+            .execution_options(synchronize_session=False)
+        )
+
+
+def increment(user_id, **deltas):
+    """Add deltas to one user's current bucket. Does not commit."""
+    increment_many([int(user_id)], **deltas)
+
+
+def set_current(user_id, **values):
+    """Overwrite fields of a user's current bucket (manual corrections). Does not commit."""
+    month = month_start()
+    bucket = MonthlyStats.query.filter_by(user_id=user_id, month=month).first()
+    if bucket is None:
+        bucket = MonthlyStats(user_id=user_id, month=month, **{field: 0 for field in FIELDS})
+        db.session.add(bucket)
+    for field, value in values.items():
+        if field not in FIELDS:
+            raise ValueError(f"Unknown monthly stats field: {field}")
+        setattr(bucket, field, value or 0)
+    return bucket
+
+
+def get_months(user_id, months=2):
+    """Buckets for the last `months` months, newest first, zero-filled"""
+    current = month_start()
+    wanted = [current]
+    while len(wanted) < months:
+        wanted.append(previous_month(wanted[-1]))
+
+    found = {
+        bucket.month: bucket for bucket in MonthlyStats.query.filter(
+            MonthlyStats.user_id == user_id,
+            MonthlyStats.month.in_(wanted)
+        )
+    }
+    return [found.get(month) or MonthlyStats(user_id=user_id, month=month, **{f: 0 for f in FIELDS})
+            for month in wanted]
+
+
+def summary(user_id, buckets=None):
+    """{'this_month': {...}, 'last_month': {...}, 'change': {...}} from two buckets in one query"""
+    this_month, last_month = (buckets or get_months(user_id, 2))[:2]
+    return {
+        'this_month': this_month.to_dict(),
+        'last_month': last_month.to_dict(),
+        'change': {field: getattr(this_month, field) - getattr(last_month, field) for field in FIELDS}
+    }
+
+
+def rollover(batch_size=1000):
+    """Sync profiles' *_this_month columns from the current buckets, in chunks"""
+    month = month_start()
+    updated = 0
+    last_id = 0
+    while True:
+        batch = db.session.query(Profile.id, Profile.user_id)\
+            .filter(Profile.id > last_id)\
+            .order_by(Profile.id)\
+            .limit(batch_size)\
+            .all()
+        if not batch:
+            break
+
+        buckets = {
+            bucket.user_id: bucket for bucket in MonthlyStats.query.filter(
+                MonthlyStats.month == month,
+                MonthlyStats.user_id.in_([row.user_id for row in batch])
+            )
+        }
+        db.session.execute(db.update(Profile), [
+            dict(
+                {column: getattr(buckets[row.user_id], field) if row.user_id in buckets else 0
+                 for field, column in PROFILE_COLUMNS.items()},
+                id=row.id
+            )
+            for row in batch
+        ])
+        db.session.commit()
+        updated += len(batch)
+        last_id = batch[-1].id
+    return updated
+
+
+def seed_from_profiles(batch_size=1000):
+    """One-off: create current-month buckets from existing profile counters"""
+    month = month_start()
+    seeded = 0
+    last_id = 0
+    while True:
+        batch = Profile.query.filter(Profile.id > last_id).order_by(Profile.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        existing = {
+            user_id for (user_id,) in db.session.query(MonthlyStats.user_id).filter(
+                MonthlyStats.month == month,
+                MonthlyStats.user_id.in_([profile.user_id for profile in batch])
+            )
+        }
+        rows = [
+            dict({field: getattr(profile, column) or 0 for field, column in PROFILE_COLUMNS.items()},
+                 user_id=profile.user_id, month=month)
+            for profile in batch if profile.user_id not in existing
+        ]
+        if rows:
+            db.session.execute(db.insert(MonthlyStats), rows)
+        db.session.commit()
+        seeded += len(rows)
+        last_id = batch[-1].id
+    return seeded
@@ -0,0 +1,110 @@
+"""Password hashing on a small bounded pool.
+
+bcrypt is slow on purpose: ``BCRYPT_LOG_ROUNDS`` sets the work factor, and
+each +1 doubles the time per hash. bcrypt releases the GIL while hashing, so
+the other threads of a gthread worker (see the Procfile) keep serving
+requests while a sign-in hashes. A sync worker would block on the hash
+instead. The pool caps hashing at ``PASSWORD_HASH_WORKERS`` concurrent
+hashes with at most ``PASSWORD_HASH_QUEUE`` more waiting. During a login storm,
+callers that cannot get a slot within ``PASSWORD_HASH_WAIT_SECONDS`` get
+``PasswordHasherBusy`` instead of queueing without limit. Keep workers +
+queue below the worker's ``--threads``, and the wait short, so that
+sign-ins alone cannot take every thread.
+
+Hashes record their own cost, so changing the work factor does not lock
+anyone out. ``needs_rehash`` detects hashes made at a different cost, and
+login re-hashes them with the current one.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.extensions import bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+DEFAULT_WAIT_SECONDS = 5
+
+
+class PasswordHasherBusy(Exception):
+    """No hashing slot became free within the wait limit"""
+
+
+class HashPool:
+    """Thread pool with admission control: at most workers + queue jobs in flight"""
+
+    def __init__(self, workers, queue=0, wait_seconds=DEFAULT_WAIT_SECONDS):
+        self.workers = workers
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ecoaction-hash')
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise PasswordHasherBusy("Too many sign-ins in progress, please try again shortly")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                _pool = HashPool(
+                    workers=config.get('PASSWORD_HASH_WORKERS') or min(4, os.cpu_count() or 1),
+                    queue=config.get('PASSWORD_HASH_QUEUE', 0),
+                    wait_seconds=config.get('PASSWORD_HASH_WAIT_SECONDS', DEFAULT_WAIT_SECONDS)
+                )
+    return _pool
+
+
+def log_rounds():
+    return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+
+
+def hash_rounds(pw_hash):
+    """Cost recorded in a bcrypt hash ('$2b$12$...' -> 12), or None if unparseable"""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(pw_hash):
+    return hash_rounds(pw_hash) != log_rounds()
+
+
+def hash_password(password):
+    return get_pool().run(bcrypt.generate_password_hash, password, log_rounds()).decode('utf-8')
+
+
+def check_password(pw_hash, password):
+    return get_pool().run(bcrypt.check_password_hash, pw_hash, password)
+
+
+def hash_passwords(passwords):
+    """Hash a list for a background job, one at a time so sign-ins keep the rest of the pool
+
+    Waits for a slot instead of raising PasswordHasherBusy.
+    """
+    hashes = []
+    for password in passwords:
+        while True:
+            try:
+                hashes.append(hash_password(password))
+                break
+            except PasswordHasherBusy:
+                continue
+    return hashes
@@ -0,0 +1,75 @@
+"""Compact public profile cards (name, avatar, county, points) for list views.
+
+``get_cards`` serves each id from a short-TTL process cache and loads all
+misses with a single ``IN`` query. Unknown ids are cached too, so repeated
+lookups of deleted users do not hit the database. Profile changes drop the
+affected card.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+from app.models.profile import Profile
+from app.services.events import on, PROFILE_UPDATED, IMPACT_POINTS_CHANGED
+
+DEFAULT_CACHE_SECONDS = 30
+DEFAULT_CACHE_SIZE = 10000
+MAX_BATCH_IDS = 300
+
+_cache = OrderedDict()  # user_id -> (expires_at monotonic, card or None)
+_lock = threading.Lock()
+
+
+def profile_to_card(profile):
+    return {
+        'user_id': profile.user_id,
+        'full_name': profile.full_name,
+        'avatar_url': profile.avatar_url,
+        'county': profile.county,
+        'impact_points': profile.impact_points or 0
+    }
+
+
+def get_cards(user_ids):
+    """Return {user_id: card or None} for the given ids"""
+    user_ids = list(dict.fromkeys(user_ids))
+    now = time.monotonic()
+    cards, missing = {}, []
+    with _lock:
+        for user_id in user_ids:
+            entry = _cache.get(user_id)
+            if entry and entry[0] > now:
+                cards[user_id] = entry[1]
+            else:
+                missing.append(user_id)
+
+    if missing:
+        loaded = {
+            profile.user_id: profile_to_card(profile)
+            for profile in Profile.query.filter(Profile.user_id.in_(missing))
+        }
+        ttl = current_app.config.get('PROFILE_CARD_CACHE_SECONDS', DEFAULT_CACHE_SECONDS)
+        max_size = current_app.config.get('PROFILE_CARD_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        with _lock:
+            for user_id in missing:
+                card = loaded.get(user_id)
+                cards[user_id] = card
+                _cache[user_id] = (now + ttl, card)
+                _cache.move_to_end(user_id)
+            while len(_cache) > max_size:
+                _cache.popitem(last=False)
+
+    return cards
+
+
+def invalidate(user_id):
+    with _lock:
+        _cache.pop(user_id, None)
+
+
+@on(PROFILE_UPDATED)
+@on(IMPACT_POINTS_CHANGED)
+def handle_profile_changed(user_id, **_):
+    invalidate(int(user_id))
@@ -0,0 +1,256 @@
+"""Token-bucket rate limiting for expensive or abusable endpoints.
+
+Routes declare limits with ``@rate_limit("10/minute", key="ip")``. Each
+(route scope, key) pair gets a bucket of ``burst`` tokens (default: the
+limit) that refills continuously at limit/period. A request takes one token,
+and a request that finds the bucket empty gets a 429 with ``Retry-After``.
+
+The backend comes from ``RATELIMIT_STORAGE_URL``:
+
+- ``memory://`` (default) keeps buckets in this process. Each worker
+  enforces the limit on its own, and least recently hit keys are evicted.
+- ``sqlite:////path/to/file.db`` shares buckets between workers on one host.
+  Rows for keys that stop sending requests stay behind, so run
+  ``flask purge-rate-limits`` from cron (e.g. daily) to delete buckets idle
+  longer than the longest limit period.
+- ``redis://host:6379/0`` shares them across hosts; it needs the ``redis``
+  package. Keys expire once their bucket would be full again.
+
+With a shared backend, a rejected key is also remembered in process until
+its retry time. Repeat offenders are therefore turned away in microseconds,
+without another round trip. If the backend is unavailable, requests are let
+through and the error is logged; a limiter outage should not take the API
+down with it.
+"""
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+DEFAULT_MAX_KEYS = 100000
+
+
+def parse_limit(limit):
+    """'10/minute' -> (10, 60.0); also accepts '10/5minutes' style multipliers"""
+    count, _, period = limit.partition('/')
+    period = period.strip().lower()
+    multiplier = ''.join(ch for ch in period if ch.isdigit())
+    unit = period[len(multiplier):].rstrip('s') or 'second'
+    if unit not in PERIODS:
+        raise ValueError(f"Unknown rate limit period: {limit!r}")
+    return int(count), float(PERIODS[unit] * int(multiplier or 1))
+
+
+def refill(tokens, updated_at, now, capacity, rate):
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class MemoryBackend:
+    """Buckets in a bounded LRU dict; one lock, no I/O"""
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def hit(self, key, capacity, rate, now):
+        """Take one token; returns seconds until one is available (0 if allowed)"""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = refill(tokens, updated_at, now, capacity, rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                # Least recently hit buckets have refilled the longest
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class SQLiteBackend:
+    """Buckets in a local SQLite file shared by the workers on one host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key, capacity, rate, now):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = refill(*row, now, capacity, rate) if row else capacity
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def purge(self, older_than):
+        """Delete buckets untouched since `older_than` (they would be full again)"""
+        conn = self._connect()
+        return conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?", (older_than,)).rowcount
+
+
+class RedisBackend:
+    """Buckets in Redis (or any server speaking its protocol), updated atomically by a Lua script"""
+
+    SCRIPT = """
+    local capacity, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or capacity
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url):
+        import redis  # optional dependency, only needed for this backend
+        self.client = redis.Redis.from_url(url)
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def hit(self, key, capacity, rate, now):
+        return float(self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, now]))
+
+
+def create_backend(url):
+    if not url or url.startswith('memory://'):
+        return MemoryBackend()
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported RATELIMIT_STORAGE_URL: {url}")
+
+
+class RateLimiter:
+    """A backend plus an in-process cache of keys that are currently rejected"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._denied = {}  # key -> monotonic time it may retry
+        self._lock = threading.Lock()
+
+    def hit(self, key, capacity, rate):
+        """Seconds the caller must wait, or 0 if the request may proceed"""
+        now = time.monotonic()
+        retry_at = self._denied.get(key)
+        if retry_at is not None:
+            if retry_at > now:
+                return retry_at - now
+            with self._lock:
+                self._denied.pop(key, None)
+
+        wait = self.backend.hit(key, capacity, rate, time.time())
+        if wait and not isinstance(self.backend, MemoryBackend):
+            with self._lock:
+                if len(self._denied) > DEFAULT_MAX_KEYS:
+                    self._denied.clear()
+                self._denied[key] = now + wait
+        return wait
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(create_backend(current_app.config.get('RATELIMIT_STORAGE_URL')))
+    return _limiter
+
+
+# ------------------- Keys -------------------
+
+def ip_key():
+    return request.remote_addr or 'unknown'
+
+
+def user_key():
+    """JWT user id when a valid token is sent, otherwise the client IP"""
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    return f"user:{identity}" if identity else f"ip:{ip_key()}"
+
+
+KEY_FUNCS = {
+    'ip': ip_key,
+    'user': user_key,
+    'route': lambda: 'all',
+}
+
+
+def rate_limit(limit, key='ip', burst=None, scope=None):
+    """Limit a view to `limit` (e.g. '5/minute') per key: 'ip', 'user', 'route' or a callable"""
+    count, period = parse_limit(limit)
+    capacity = burst or count
+    rate = count / period
+    key_func = KEY_FUNCS[key] if isinstance(key, str) else key
+
+    def decorator(view):
+        bucket_scope = scope or f"{view.__module__}.{view.__name__}"
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method == 'OPTIONS' or not current_app.config.get('RATELIMIT_ENABLED', True):
+                return view(*args, **kwargs)
+            try:
+                wait = get_limiter().hit(f"{bucket_scope}:{key_func()}", capacity, rate)
+            except Exception as e:
+                print(f"Rate limiter unavailable, allowing request: {e}")
+                wait = 0
+            if wait:
+                response = jsonify({
+                    'success': False,
+                    'error': 'Too many requests. Please slow down and try again shortly.',
+                    'retry_after': math.ceil(wait)
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(wait))
+                return response
+            return view(*args, **kwargs)
+
+        return wrapper
+    return decorator
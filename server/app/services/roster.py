@@ -0,0 +1,100 @@
+"""Keyset iteration over an action's participants.
+
+Rows are read in ``(joined_at, id)`` order through the
+``(action_id, joined_at)`` index as plain column tuples, so neither the
+``participants`` relationship nor full ``User`` objects are ever loaded.
+"""
+import base64
+import csv
+import io
+from datetime import datetime
+
+from app.extensions import db
+from app.models.community import ActionParticipant
+from app.models.profile import Profile
+
+CSV_COLUMNS = ('participant_id', 'user_id', 'full_name', 'county', 'joined_at')
+
+
+def encode_cursor(joined_at, participant_id):
+    raw = f"{joined_at.isoformat() if joined_at else ''}|{participant_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (joined_at, participant_id); raises ValueError on malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        joined_at, participant_id = raw.split('|', 1)
+        return (datetime.fromisoformat(joined_at) if joined_at else None), int(participant_id)
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def roster_page(action_id, after=None, limit=100):
+    """Fetch one page of participants after the (joined_at, id) position"""
+    query = db.session.query(
+        ActionParticipant.id,
+        ActionParticipant.user_id,
+        Profile.full_name,
+        Profile.county,
+        Profile.avatar_url,
+        ActionParticipant.joined_at
+    ).outerjoin(Profile, Profile.user_id == ActionParticipant.user_id)\
+        .filter(ActionParticipant.action_id == action_id)
+
+    if after is not None:
+        last_joined_at, last_id = after
+        query = query.filter(db.or_(
+            ActionParticipant.joined_at > last_joined_at,
+            db.and_(ActionParticipant.joined_at == last_joined_at, ActionParticipant.id > last_id)
+        ))
+
+    return query.order_by(ActionParticipant.joined_at, ActionParticipant.id).limit(limit).all()
+
+
+def iter_roster_batches(action_id, batch_size=1000):
+    """Yield lists of participant rows for an action, one keyset batch at a time"""
+    after = None
+    while True:
+        rows = roster_page(action_id, after, batch_size)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].joined_at, rows[-1].id)
+
+
+def iter_roster_csv(action_id, batch_size=1000):
+    """Yield CSV text chunks (header first, then one chunk per batch)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(CSV_COLUMNS)
+    for rows in iter_roster_batches(action_id, batch_size):
+        for row in rows:
+            writer.writerow([
+                row.id,
+                row.user_id,
+                row.full_name or '',
+                row.county or '',
+                row.joined_at.isoformat() if row.joined_at else ''
+            ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def row_to_dict(row):
+    return {
+        'participant_id': row.id,
+        'user_id': row.user_id,
+        'full_name': row.full_name,
+        'county': row.county,
+        'avatar_url': row.avatar_url,
+        'joined_at': row.joined_at.isoformat() if row.joined_at else None
+    }
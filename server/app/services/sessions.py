@@ -0,0 +1,171 @@
+"""Sign-in sessions: short-lived access tokens plus rotating refresh tokens.
+
+Logging in (one bcrypt check) starts a session, which is a row in
+``refresh_token_families``. The client gets an access token that lasts
+``JWT_ACCESS_TOKEN_EXPIRES`` and a refresh token that lasts
+``JWT_REFRESH_TOKEN_EXPIRES``. Both carry the session id in a ``fam`` claim.
+``/api/auth/refresh`` swaps the refresh token for a new pair. That costs no
+password hashing, only a lookup of the session by its unique index. Each
+swap rotates the refresh token, and only the newest one is accepted.
+
+If an older refresh token is presented again, it was probably stolen, so
+the whole session is revoked. The one exception is a concurrent refresh
+within ``REFRESH_REUSE_GRACE_SECONDS``, e.g. from two browser tabs.
+
+Each request checks its token against an in-memory set of revoked sessions
+that could still hold unexpired tokens. A set lookup costs no database
+round trip. Every process reloads the set every ``REVOCATION_RELOAD_SECONDS``,
+and a revocation made in this process applies to it immediately.
+"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token
+
+from app.extensions import db
+from app.models.auth import RefreshTokenFamily
+from app.services import background
+
+DEFAULT_RELOAD_SECONDS = 30
+DEFAULT_GRACE_SECONDS = 10
+
+_revoked = frozenset()
+_loaded_at = None
+_lock = threading.Lock()
+
+
+class RefreshRejected(Exception):
+    """The refresh token is unknown, expired, revoked or was already used"""
+
+
+def refresh_lifetime():
+    return current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+
+
+def token_pair(user_id, family_id, jti):
+    identity = str(user_id)
+    claims = {'fam': family_id}
+    return {
+        'token': create_access_token(identity=identity, additional_claims=claims),
+        # Explicit claims take precedence over generated ones, so the refresh jti is ours
+        'refresh_token': create_refresh_token(identity=identity, additional_claims={**claims, 'jti': jti}),
+        'expires_in': int(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    }
+
+
+def start_session(user_id):
+    """Create a session and return its first token pair. Does not commit."""
+    family = RefreshTokenFamily(
+        family_id=uuid.uuid4().hex,
+        user_id=user_id,
+        current_jti=str(uuid.uuid4()),
+        expires_at=datetime.utcnow() + refresh_lifetime()
+    )
+    db.session.add(family)
+    return token_pair(user_id, family.family_id, family.current_jti)
+
+
+def rotate(claims):
+    """Exchange a verified refresh token's claims for a new pair; commits"""
+    family = RefreshTokenFamily.query.filter_by(family_id=claims.get('fam')).first()
+    now = datetime.utcnow()
+    if not family or family.revoked_at or family.expires_at <= now or str(family.user_id) != claims['sub']:
+        raise RefreshRejected("Session expired, please sign in again")
+
+    jti = claims['jti']
+    if jti == family.current_jti:
+        new_jti = str(uuid.uuid4())
+        # Compare-and-swap so two simultaneous uses of one token cannot both rotate it
+        swapped = db.session.execute(
+            db.update(RefreshTokenFamily)
+            .where(RefreshTokenFamily.id == family.id, RefreshTokenFamily.current_jti == jti)
+            .values(current_jti=new_jti, previous_jti=jti, rotated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if swapped:
+            return token_pair(family.user_id, family.family_id, new_jti)
+        db.session.refresh(family)
+
+    grace = current_app.config.get('REFRESH_REUSE_GRACE_SECONDS', DEFAULT_GRACE_SECONDS)
+    if jti == family.previous_jti and family.rotated_at and now - family.rotated_at <= timedelta(seconds=grace):
+        # Lost a race with another tab: hand out the current token again
+        return token_pair(family.user_id, family.family_id, family.current_jti)
+
+    revoke_families([family.family_id])
+    raise RefreshRejected("Session expired, please sign in again")
+
+
+def revoke_families(family_ids):
+    """Revoke sessions now (this process) and persist it (others within a reload); commits"""
+    global _revoked
+    family_ids = [family_id for family_id in family_ids if family_id]
+    if not family_ids:
+        return 0
+    count = RefreshTokenFamily.query.filter(
+        RefreshTokenFamily.family_id.in_(family_ids),
+        RefreshTokenFamily.revoked_at.is_(None)
+    ).update({RefreshTokenFamily.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    with _lock:
+        _revoked = _revoked | frozenset(family_ids)
+    return count
+
+
+def revoke_user_sessions(user_id):
+    """Sign a user out everywhere (e.g. after a password reset); commits"""
+    family_ids = [family_id for (family_id,) in db.session.query(RefreshTokenFamily.family_id).filter(
+        RefreshTokenFamily.user_id == user_id,
+        RefreshTokenFamily.revoked_at.is_(None),
+        RefreshTokenFamily.expires_at > datetime.utcnow()
+    )]
+    return revoke_families(family_ids)
+
+
+# ------------------- Revocation set -------------------
+
+def load_revocations():
+    """Reload the revoked sessions whose tokens have not expired yet"""
+    global _revoked, _loaded_at
+    revoked = frozenset(family_id for (family_id,) in db.session.query(RefreshTokenFamily.family_id).filter(
+        RefreshTokenFamily.expires_at > datetime.utcnow(),
+        RefreshTokenFamily.revoked_at.isnot(None)
+    ))
+    with _lock:
+        _revoked = revoked
+        _loaded_at = time.monotonic()
+
+
+def is_revoked(family_id):
+    if _loaded_at is None:
+        load_revocations()
+    elif time.monotonic() - _loaded_at > current_app.config.get('REVOCATION_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS):
+        background.submit(current_app._get_current_object(), 'revocations-reload', load_revocations)
+    return family_id in _revoked
+
+
+def register_jwt_callbacks(jwt):
+    @jwt.token_in_blocklist_loader
+    def token_revoked(jwt_header, jwt_payload):
+        family_id = jwt_payload.get('fam')
+        # Tokens issued before sessions existed have no family and simply expire
+        return bool(family_id) and is_revoked(family_id)
+
+
+def sweep_expired_sessions(batch_size=1000):
+    """Delete expired sessions in primary-key batches"""
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        batch = [row_id for (row_id,) in db.session.query(RefreshTokenFamily.id)
+                 .filter(RefreshTokenFamily.expires_at < now)
+                 .order_by(RefreshTokenFamily.id)
+                 .limit(batch_size)]
+        if not batch:
+            break
+        deleted += RefreshTokenFamily.query.filter(RefreshTokenFamily.id.in_(batch)).delete(synchronize_session=False)
+        db.session.commit()
+    return deleted
@@ -0,0 +1,262 @@
+"""Where uploaded files live: the local disk or an S3-compatible bucket.
+
+Keys are paths relative to the upload root, e.g.
+``images/3f/a2/<digest>.thumb.webp`` or ``originals/3f/a2/<digest>.png``.
+``STORAGE_BACKEND`` picks the backend:
+
+- ``local`` (default) keeps them under ``instance/uploads``, as before. It
+  suits a single host; the disk is not shared between instances and is
+  lost on redeploy.
+- ``s3`` keeps them in ``S3_BUCKET`` on AWS, or on MinIO, R2 or any other
+  S3-compatible service via ``S3_ENDPOINT_URL``. It needs the ``boto3``
+  package.
+
+Both backends hand out presigned URLs. A browser PUTs the upload straight to
+the bucket, then calls back so variants are rendered. Downloads are
+redirected to the bucket (``STORAGE_PUBLIC_URL``, or a presigned GET), so
+image bytes do not pass through a web worker. The local backend signs URLs
+to this app's own ``/api/upload/direct`` endpoint, so clients use one
+protocol either way.
+"""
+import base64
+import os
+import tempfile
+import threading
+from collections import namedtuple
+
+from flask import current_app, url_for
+from itsdangerous import URLSafeTimedSerializer
+
+DEFAULT_URL_SECONDS = 900
+SPOOL_BYTES = 8 * 1024 * 1024  # Originals up to this size are downloaded into memory, larger ones to a temp file
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+StoredObject = namedtuple('StoredObject', 'key size modified')  # modified: POSIX timestamp
+
+
+def upload_signer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='direct-upload')
+
+
+class LocalStorage:
+    """Files under a directory on this host"""
+    serves_directly = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key, data, content_type=None, cache_control=None):
+        """Write so that a crash leaves either nothing or the whole file"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def open(self, key):
+        return open(self.path(key), 'rb')
+
+    def read_head(self, key, length):
+        with self.open(key) as f:
+            return f.read(length)
+
+    def size(self, key):
+        """Size in bytes, or None if there is no such file"""
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def delete(self, keys):
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def iter_objects(self, prefix):
+        """Yield a StoredObject for every file under prefix, one directory at a time"""
+        stack = [self.path(prefix.rstrip('/'))]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif not entry.name.endswith('.tmp'):
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except FileNotFoundError:
+                            continue  # Deleted while we were listing
+                        key = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                        yield StoredObject(key, stat.st_size, stat.st_mtime)
+
+    def iter_keys(self, prefix):
+        return (obj.key for obj in self.iter_objects(prefix))
+
+    def presigned_put(self, key, content_type, size, sha256, expires=DEFAULT_URL_SECONDS):
+        token = upload_signer().dumps({'k': key, 's': size, 'h': sha256, 't': content_type})
+        return {
+            'url': url_for('upload.direct_upload', token=token, _external=True),
+            'method': 'PUT',
+            'headers': {'Content-Type': content_type}
+        }
+
+    def load_put_token(self, token, expires=DEFAULT_URL_SECONDS):
+        """The signed upload terms for a direct PUT; raises itsdangerous.BadData"""
+        return upload_signer().loads(token, max_age=expires)
+
+    def url(self, key, expires=DEFAULT_URL_SECONDS):
+        return None  # Served by the app itself
+
+
+class S3Storage:
+    """Objects in an S3-compatible bucket"""
+    serves_directly = True
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key=None, secret_key=None, public_url=None):
+        import boto3  # optional dependency, only needed for this backend
+        from botocore.config import Config as BotoConfig
+        self.bucket = bucket
+        self.public_url = (public_url or '').rstrip('/') or None
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            # Path-style addressing works with MinIO and other self-hosted endpoints
+            config=BotoConfig(signature_version='s3v4', s3={'addressing_style': 'path' if endpoint_url else 'auto'})
+        )
+
+    def put(self, key, data, content_type=None, cache_control=None):
+        extra = {}
+        if content_type:
+            extra['ContentType'] = content_type
+        if cache_control:
+            extra['CacheControl'] = cache_control
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, **extra)
+
+    def open(self, key):
+        body = self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        for chunk in body.iter_chunks(1024 * 1024):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+
+    def read_head(self, key, length):
+        return self.client.get_object(Bucket=self.bucket, Key=key, Range=f'bytes=0-{length - 1}')['Body'].read()
+
+    def size(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def exists(self, key):
+        return self.size(key) is not None
+
+    def delete(self, keys):
+        keys = list(keys)
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(Bucket=self.bucket, Delete={
+                'Objects': [{'Key': key} for key in keys[start:start + 1000]],
+                'Quiet': True
+            })
+
+    def iter_objects(self, prefix):
+        """Yield a StoredObject for every key under prefix, one listing page at a time"""
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents', ()):
+                yield StoredObject(obj['Key'], obj['Size'], obj['LastModified'].timestamp())
+
+    def iter_keys(self, prefix):
+        return (obj.key for obj in self.iter_objects(prefix))
+
+    def presigned_put(self, key, content_type, size, sha256, expires=DEFAULT_URL_SECONDS):
+        # Type, length and checksum are signed: the store refuses any other body for this key
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode('ascii')
+        url = self.client.generate_presigned_url('put_object', Params={
+            'Bucket': self.bucket,
+            'Key': key,
+            'ContentType': content_type,
+            'ContentLength': size,
+            'ChecksumSHA256': checksum
+        }, ExpiresIn=expires)
+        return {
+            'url': url,
+            'method': 'PUT',
+            'headers': {'Content-Type': content_type, 'x-amz-checksum-sha256': checksum}
+        }
+
+    def url(self, key, expires=DEFAULT_URL_SECONDS):
+        if self.public_url:
+            return f"{self.public_url}/{key}"
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=expires
+        )
+
+
+# ------------------- Configuration -------------------
+
+def settings(app=None):
+    """Plain dict describing the backend, so pool processes can open the same storage"""
+    app = app or current_app
+    config = app.config
+    if config.get('STORAGE_BACKEND', 'local') == 's3':
+        return {
+            'backend': 's3',
+            'bucket': config['S3_BUCKET'],
+            'endpoint_url': config.get('S3_ENDPOINT_URL'),
+            'region': config.get('S3_REGION'),
+            'access_key': config.get('S3_ACCESS_KEY_ID'),
+            'secret_key': config.get('S3_SECRET_ACCESS_KEY'),
+            'public_url': config.get('STORAGE_PUBLIC_URL'),
+        }
+    return {'backend': 'local', 'root': os.path.join(app.instance_path, 'uploads')}
+
+
+def create(options):
+    """Backend for a settings() dict, shared per process"""
+    cache_key = tuple(sorted(options.items()))
+    backend = _backends.get(cache_key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(cache_key)
+            if backend is None:
+                options = dict(options)
+                kind = options.pop('backend')
+                if kind == 's3':
+                    backend = S3Storage(**options)
+                elif kind == 'local':
+                    backend = LocalStorage(**options)
+                else:
+                    raise ValueError(f"Unsupported STORAGE_BACKEND: {kind}")
+                _backends[cache_key] = backend
+    return backend
+
+
+def get_storage():
+    return create(settings())
+
+
+def url_seconds():
+    return current_app.config.get('PRESIGNED_URL_SECONDS', DEFAULT_URL_SECONDS)
@@ -0,0 +1,128 @@
+"""Mark-and-sweep collection of uploads that were never attached to anything.
+
+An image is uploaded first and attached afterwards, to a report
+(``Report.image_urls``), an action (``CommunityAction.image``), a
+participation photo (``ActionParticipant.participation_image``) or an
+avatar (``Profile.avatar_url``). Uploads that are abandoned halfway through
+a form stay in storage forever, and so do images whose owners deleted them:
+``images.release`` only drops the owner's reference, and this is the one
+place files are deleted.
+
+Mark: every column above is read in primary-key batches (keyset, never
+OFFSET). Each image name found goes into one in-memory set of stems, e.g.
+``3fa2...c1`` or ``<uuid>_<user>``. A million attached images cost on the
+order of 100MB.
+
+Sweep: storage is walked lazily (``os.scandir`` per directory, or listing
+pages from S3), so millions of files never sit in a list. A file is
+deleted if its stem is not marked and it is older than the grace period.
+The grace period protects uploads whose form has not been submitted yet,
+and files written while the mark phase ran. Blob and reference rows for
+the deleted images go with them. An image uploaded again within the grace
+period is kept even though its files are old. ``dry_run`` reports without
+deleting.
+"""
+import posixpath
+import time
+from datetime import datetime, timezone
+
+from app.extensions import db
+from app.models.community import ActionParticipant, CommunityAction
+from app.models.profile import Profile
+from app.models.reports import Report
+from app.models.uploads import ImageBlob, ImageReference
+from app.services import images
+from app.services.storage import get_storage
+
+DEFAULT_GRACE_SECONDS = 24 * 60 * 60
+DEFAULT_BATCH_SIZE = 1000
+
+# (model, column holding one URL or a list of URLs)
+REFERENCE_COLUMNS = (
+    (Report, Report.image_urls),
+    (CommunityAction, CommunityAction.image),
+    (ActionParticipant, ActionParticipant.participation_image),
+    (Profile, Profile.avatar_url),
+)
+
+
+def stems_in(value):
+    """Image stems named by a URL or list of URLs ('/api/upload/images/<stem>.card.webp?x' -> '<stem>')"""
+    urls = value if isinstance(value, list) else [value]
+    for url in urls:
+        if isinstance(url, str) and url:
+            name = url.split('?', 1)[0].split('#', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+            if name:
+                yield images.stem_of(name)
+
+
+def mark(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Set of every image stem attached somewhere, or uploaded again since cutoff"""
+    # A repeat upload reuses the old files without rewriting them, so its age is the reference's
+    recent = db.session.query(ImageBlob.digest)\
+        .join(ImageReference, ImageReference.blob_id == ImageBlob.id)\
+        .filter(ImageReference.created_at > datetime.fromtimestamp(cutoff, timezone.utc).replace(tzinfo=None))
+    marked = {digest for (digest,) in recent}
+    for model, column in REFERENCE_COLUMNS:
+        last_id = 0
+        while True:
+            rows = db.session.query(model.id, column)\
+                .filter(model.id > last_id, column.isnot(None))\
+                .order_by(model.id)\
+                .limit(batch_size)\
+                .all()
+            if not rows:
+                break
+            for _, value in rows:
+                marked.update(stems_in(value))
+            last_id = rows[-1][0]
+        db.session.rollback()  # End the read transaction between tables
+    return marked
+
+
+def forget_blobs(digests):
+    """Drop the blob and reference rows of deleted images; commits"""
+    blob_ids = [blob_id for (blob_id,) in db.session.query(ImageBlob.id).filter(ImageBlob.digest.in_(digests))]
+    if blob_ids:
+        ImageReference.query.filter(ImageReference.blob_id.in_(blob_ids)).delete(synchronize_session=False)
+        ImageBlob.query.filter(ImageBlob.id.in_(blob_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def collect(grace_seconds=DEFAULT_GRACE_SECONDS, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """Delete unattached uploads older than grace_seconds; returns a summary dict"""
+    # Anything written after this point is younger than the grace period by definition
+    cutoff = time.time() - grace_seconds
+    marked = mark(cutoff, batch_size)
+
+    target = get_storage()
+    summary = {'marked': len(marked), 'scanned': 0, 'attached': 0, 'recent': 0,
+               'orphaned': 0, 'orphaned_bytes': 0, 'dry_run': dry_run}
+    doomed_keys, doomed_digests = [], set()
+
+    def flush():
+        if not dry_run:
+            target.delete(doomed_keys)
+            if doomed_digests:
+                forget_blobs(list(doomed_digests))
+        doomed_keys.clear()
+        doomed_digests.clear()
+
+    for prefix in ('images/', 'originals/'):
+        for obj in target.iter_objects(prefix):
+            summary['scanned'] += 1
+            stem = images.stem_of(posixpath.basename(obj.key))
+            if stem in marked:
+                summary['attached'] += 1
+            elif obj.modified > cutoff:
+                summary['recent'] += 1
+            else:
+                summary['orphaned'] += 1
+                summary['orphaned_bytes'] += obj.size
+                doomed_keys.append(obj.key)
+                if images.is_content_addressed(stem):
+                    doomed_digests.add(stem)
+                if len(doomed_keys) >= batch_size:
+                    flush()
+    flush()
+    return summary
@@ -0,0 +1,104 @@
+"""Per-route request size limits and early rejection of non-image uploads.
+
+``MAX_CONTENT_LENGTH`` sets the default size limit for a request body.
+A view can set its own limit with ``@limit_upload(max_bytes)``. A declared
+``Content-Length`` over the limit is refused with 413 before the view runs
+or any of the body is read. A chunked body is cut off by Werkzeug once it
+passes the limit. Either way an oversized upload is never spooled to disk.
+
+``@limit_upload(..., images_only=True)`` also checks the magic number of
+each file part as it is parsed. A body whose first bytes are not a JPEG,
+PNG, GIF or WebP signature is refused with 415. The rest of the body is
+never read.
+"""
+from flask import Request, current_app, jsonify, request
+from werkzeug.exceptions import UnsupportedMediaType
+
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+SNIFF_BYTES = 12
+
+
+def sniff(head):
+    """Image type from the first bytes of a file ('jpg', 'png', 'gif', 'webp'), or None"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, kind in SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+def limit_upload(max_bytes, images_only=False):
+    """Give a view its own body size limit, and optionally only accept image files"""
+    def decorator(fn):
+        fn.max_content_length = max_bytes
+        fn.images_only = images_only
+        return fn
+    return decorator
+
+
+class SniffingStream:
+    """Spool for one file part that refuses it as soon as its first bytes are not an image"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._head = b''
+        self.kind = None
+
+    def _check(self):
+        self.kind = sniff(self._head)
+        if self.kind is None:
+            raise UnsupportedMediaType("Not a valid image: unrecognised file format")
+
+    def write(self, data):
+        if self.kind is None:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check()
+        return self._stream.write(data)
+
+    def seek(self, *args):
+        # Parsing finished; a file shorter than a signature is not an image either
+        if self.kind is None:
+            self._check()
+        return self._stream.seek(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class UploadRequest(Request):
+    """Request that honours the per-view settings from ``limit_upload``"""
+
+    def _view_option(self, name):
+        if self.url_rule is None or not current_app:
+            return None
+        return getattr(current_app.view_functions.get(self.endpoint), name, None)
+
+    @property
+    def max_content_length(self):
+        limit = self._view_option('max_content_length')
+        return limit if limit is not None else super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        return SniffingStream(stream) if self._view_option('images_only') else stream
+
+
+def register_upload_limits(app):
+    app.request_class = UploadRequest
+
+    @app.before_request
+    def reject_oversized_body():
+        # Views catch broad exceptions, so refuse here rather than letting the parser raise in them
+        limit = request.max_content_length
+        if limit is not None and (request.content_length or 0) > limit:
+            return jsonify({
+                'success': False,
+                'error': f'Request body too large. Maximum size is {limit / (1024 * 1024):.4g}MB'
+            }), 413
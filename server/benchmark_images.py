@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark rendering image variants from a camera-sized JPEG, with and without reduced-scale decoding
+
+Each run happens in a fresh process. Peak memory is the resident high-water mark (Linux /proc),
+reset just before the render so imports are not counted.
+
+Usage: python benchmark_images.py [--width 4000] [--height 3000] [--runs 3]
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image, JpegImagePlugin
+
+from app.services.images import render_variants
+
+
+def make_photo(path, width, height):
+    """Gradients plus grain: compresses roughly like a photo (pure noise would be all entropy decoding)"""
+    size = (width, height)
+    photo = Image.merge('RGB', (
+        Image.radial_gradient('L').resize(size),
+        Image.effect_noise(size, 20),
+        Image.linear_gradient('L').resize(size),
+    ))
+    photo.save(path, 'JPEG', quality=90)
+
+
+def memory_kib(field):
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+
+
+def render_once(original_path, use_draft, results):
+    if not use_draft:
+        JpegImagePlugin.JpegImageFile.draft = lambda self, mode, size: None
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')  # Reset the peak to the current size
+    baseline = memory_kib('VmRSS')
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as out_dir:
+        render_variants(original_path, out_dir, 'bench.jpg')
+    elapsed = time.perf_counter() - start
+    results.put((elapsed, (memory_kib('VmHWM') - baseline) / 1024))
+
+
+def measure(original_path, use_draft, runs):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    samples = []
+    for _ in range(runs):
+        process = context.Process(target=render_once, args=(original_path, use_draft, results))
+        process.start()
+        samples.append(results.get())
+        process.join()
+    return min(s[0] for s in samples), min(s[1] for s in samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        original_path = os.path.join(workdir, 'photo.jpg')
+        make_photo(original_path, args.width, args.height)
+        size_mb = os.path.getsize(original_path) / (1024 * 1024)
+        print(f"{args.width}x{args.height} JPEG ({args.width * args.height / 1e6:.1f} MP, {size_mb:.1f} MB), best of {args.runs}\n")
+
+        full_time, full_memory = measure(original_path, use_draft=False, runs=args.runs)
+        draft_time, draft_memory = measure(original_path, use_draft=True, runs=args.runs)
+
+        print(f"{'decode':<16}{'time':>10}{'peak memory':>16}")
+        print(f"{'full size':<16}{full_time * 1000:>8.0f}ms{full_memory:>13.0f} MB")
+        print(f"{'draft (scaled)':<16}{draft_time * 1000:>8.0f}ms{draft_memory:>13.0f} MB")
+        print(f"\n{full_time / draft_time:.1f}x faster, {full_memory / max(draft_memory, 1):.1f}x less memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory impact-points leaderboard with synthetic profiles
+
+Usage: python benchmark_leaderboard.py [--profiles 1000000] [--queries 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.leaderboard import LeaderboardRegistry
+
+COUNTIES = [f"County {i}" for i in range(1, 48)]
+
+
+def timed(label, fn, count=1):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    per_op = f" ({elapsed / count * 1e6:.2f} µs/op)" if count > 1 else ""
+    print(f"{label:<40} {elapsed * 1000:>10.1f} ms{per_op}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=100_000)
+    parser.add_argument('--updates', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = [
+        (user_id, rng.choice(COUNTIES), int(rng.paretovariate(1.2) * 10))
+        for user_id in range(1, args.profiles + 1)
+    ]
+    print(f"=== Leaderboard benchmark: {args.profiles:,} profiles, {len(COUNTIES)} counties ===")
+
+    registry = LeaderboardRegistry()
+    timed("build (national + per county)", lambda: registry.load(rows))
+
+    tracemalloc.start()
+    LeaderboardRegistry().load(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'peak memory during build':<40} {peak / 2**20:>10.1f} MB")
+
+    user_ids = [rng.randint(1, args.profiles) for _ in range(args.queries)]
+    timed(f"my rank x{args.queries:,}", lambda: [registry.rank(u) for u in user_ids], args.queries)
+    timed(f"national top 10 x{args.queries:,}", lambda: [registry.top(None, 10) for _ in user_ids], args.queries)
+    timed(f"county top 10 x{args.queries:,}",
+          lambda: [registry.top(COUNTIES[u % len(COUNTIES)], 10) for u in user_ids], args.queries)
+
+    changes = [
+        (rng.randint(1, args.profiles), rng.choice(COUNTIES), rng.randint(0, 5000))
+        for _ in range(args.updates)
+    ]
+    timed(f"point changes x{args.updates:,}",
+          lambda: [registry.update(u, c, p) for u, c, p in changes], args.updates)
+
+    # Sanity check against a full sort
+    probe = user_ids[0]
+    county, points = registry.members[probe]
+    expected = 1 + sum(1 for c, p in registry.members.values() if p > points)
+    assert registry.rank(probe)['national_rank'] == expected, "rank mismatch"
+    print("✓ Rank verified against full scan")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark password verification cost and login throughput under a storm
+
+Usage: python benchmark_login.py [--rounds 10 11 12 13] [--clients 32] [--logins 200]
+       python benchmark_login.py --url http://127.0.0.1:8000 --email a@b.c --password ... [--clients 32] [--logins 200]
+
+With --url, the storm goes over HTTP to a running server (e.g. gunicorn as in the Procfile, with
+RATELIMIT_ENABLED=false) while GET / is probed alongside: this shows whether other requests are
+still served by a worker that is busy with logins.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bcrypt
+
+from app.services.passwords import HashPool, PasswordHasherBusy
+
+PASSWORD = b"correct horse battery staple"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def storm(label, verify, clients, logins, probe=True):
+    """`logins` verifications from `clients` threads, with a cheap request probed alongside"""
+    latencies, rejected = [], 0
+    lock = threading.Lock()
+    probes = []
+    stop = threading.Event()
+
+    def login():
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            verify()
+        except PasswordHasherBusy:
+            with lock:
+                rejected += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    def cheap_requests():
+        # Stands in for a non-login request sharing the worker
+        while not stop.is_set():
+            start = time.perf_counter()
+            sum(range(2000))
+            probes.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=cheap_requests) if probe else None
+    if prober:
+        prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for _ in range(logins):
+            executor.submit(login)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if prober:
+        prober.join()
+
+    served = len(latencies)
+    print(f"{label:<28} {served / elapsed:>8.1f} logins/s  p50 {percentile(latencies, 50) * 1000:>7.1f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:>7.1f} ms  rejected {rejected:>4}  "
+          f"probe p95 {percentile(probes, 95) * 1e6 if probes else 0:>7.0f} µs")
+
+
+def http_storm(url, email, password, clients, logins):
+    """Logins over HTTP with GET / probed alongside; probe latency includes waiting for a free worker"""
+    body = json.dumps({'email': email, 'password': password}).encode()
+    latencies, probes, statuses = [], [], {}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def login():
+        request = urllib.request.Request(f"{url}/api/auth/login", data=body,
+                                         headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            status = urllib.request.urlopen(request, timeout=120).status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            urllib.request.urlopen(f"{url}/", timeout=120).read()
+            probes.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for _ in range(logins):
+            executor.submit(login)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    print(f"=== {logins} logins over HTTP from {clients} clients: {url} ===")
+    print(f"{len(latencies) / elapsed:.1f} logins/s  p50 {percentile(latencies, 50) * 1000:.0f} ms  "
+          f"p95 {percentile(latencies, 95) * 1000:.0f} ms  statuses {statuses}")
+    print(f"GET / while storming: {len(probes)} probes  p50 {percentile(probes, 50) * 1000:.1f} ms  "
+          f"p95 {percentile(probes, 95) * 1000:.1f} ms  max {max(probes) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent login attempts')
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--queue', type=int, default=16)
+    parser.add_argument('--wait', type=float, default=5)
+    parser.add_argument('--url', help='Storm a running server over HTTP instead of in process')
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+
+    if args.url:
+        http_storm(args.url.rstrip('/'), args.email, args.password, args.clients, args.logins)
+        return
+
+    print(f"=== Password hashing cost ({os.cpu_count()} CPUs) ===")
+    for rounds in args.rounds:
+        pw_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=rounds))
+        samples = []
+        for _ in range(5):
+            start = time.perf_counter()
+            bcrypt.checkpw(PASSWORD, pw_hash)
+            samples.append(time.perf_counter() - start)
+        per_check = statistics.median(samples)
+        print(f"rounds={rounds:<3} {per_check * 1000:>8.1f} ms/verify  ~{1 / per_check:>7.1f} verifies/s per core")
+
+    rounds = 12 if 12 in args.rounds else args.rounds[0]
+    pw_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=rounds))
+    logins = args.logins
+
+    print(f"\n=== Login storm: {logins} logins from {args.clients} clients, rounds={rounds} ===")
+    storm("inline (request thread)", lambda: bcrypt.checkpw(PASSWORD, pw_hash), args.clients, logins)
+
+    pool = HashPool(args.workers, queue=args.queue, wait_seconds=args.wait)
+    storm(f"pool workers={args.workers} queue={args.queue}",
+          lambda: pool.run(bcrypt.checkpw, PASSWORD, pw_hash), args.clients, logins)
+
+    tight = HashPool(args.workers, queue=0, wait_seconds=0.05)
+    storm(f"pool workers={args.workers} wait=50ms",
+          lambda: tight.run(bcrypt.checkpw, PASSWORD, pw_hash), args.clients, logins)
+
+
+if __name__ == '__main__':
+    main()
@@ -69,6 +69,11 @@ def deploy():
                 seed_community_actions()
                 print("✓ Community actions seeded")
                 
+                # Seeded rows bypass the incremental counters
+                from app.services.community_stats import reconcile_stats
+                reconcile_stats()
+                print("✓ Community stats reconciled")
+                
             except Exception as e:
                 print(f"⚠ Community seeding failed (this is optional): {e}")
         
@@ -0,0 +1,47 @@
+"""add materialized community stats
+
+Revision ID: 50afc287e495
+Revises: db5e406b0f23
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '50afc287e495'
+down_revision = 'db5e406b0f23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('community_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_actions', sa.Integer(), nullable=False),
+    sa.Column('active_actions', sa.Integer(), nullable=False),
+    sa.Column('total_participants', sa.Integer(), nullable=False),
+    sa.Column('total_community_impact', sa.Integer(), nullable=False),
+    sa.Column('total_impact_points', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Seed the single row from the source tables; requests only read it and apply deltas
+    op.execute(sa.text("""
+        INSERT INTO community_stats (id, total_actions, active_actions, total_participants,
+                                     total_community_impact, total_impact_points, updated_at, reconciled_at)
+        SELECT 1,
+               (SELECT COUNT(*) FROM community_actions),
+               (SELECT COUNT(*) FROM community_actions WHERE status = 'active'),
+               (SELECT COALESCE(SUM(participants_count), 0) FROM community_actions),
+               (SELECT COALESCE(SUM(community_impact), 0) FROM profiles),
+               (SELECT COALESCE(SUM(impact_points), 0) FROM profiles),
+               CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+    """))
+
+
+def downgrade():
+    op.drop_table('community_stats')
@@ -0,0 +1,34 @@
+"""add time window and proximity index to community actions
+
+Revision ID: 7c1e9b2d4f60
+Revises: 50afc287e495
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e9b2d4f60'
+down_revision = '50afc287e495'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('community_actions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('geo_cell', sa.String(length=32), nullable=True))
+        batch_op.create_index('ix_community_actions_status_date', ['status', 'date'], unique=False)
+        batch_op.create_index('ix_community_actions_geo_cell_date', ['geo_cell', 'date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('community_actions', schema=None) as batch_op:
+        batch_op.drop_index('ix_community_actions_geo_cell_date')
+        batch_op.drop_index('ix_community_actions_status_date')
+        batch_op.drop_column('geo_cell')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
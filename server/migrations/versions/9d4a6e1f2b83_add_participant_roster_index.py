@@ -0,0 +1,26 @@
+"""add action participant roster index
+
+Revision ID: 9d4a6e1f2b83
+Revises: 7c1e9b2d4f60
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4a6e1f2b83'
+down_revision = '7c1e9b2d4f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('action_participants', schema=None) as batch_op:
+        batch_op.create_index('ix_action_participants_action_id_joined_at', ['action_id', 'joined_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('action_participants', schema=None) as batch_op:
+        batch_op.drop_index('ix_action_participants_action_id_joined_at')
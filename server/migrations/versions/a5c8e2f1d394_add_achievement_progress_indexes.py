@@ -0,0 +1,39 @@
+"""add achievement progress indexes
+
+Revision ID: a5c8e2f1d394
+Revises: f2b9d4e7a163
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c8e2f1d394'
+down_revision = 'f2b9d4e7a163'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.create_index('ix_achievements_requirement_type', ['requirement_type'], unique=False)
+
+    # Nothing stopped the same achievement being awarded twice before; keep the first award of each pair
+    op.execute("DELETE FROM user_achievements WHERE id NOT IN "
+               "(SELECT MIN(id) FROM user_achievements GROUP BY profile_id, achievement_id)")
+
+    # Progress rows exist before unlocking, so unlocked_at no longer defaults to now
+    with op.batch_alter_table('user_achievements', schema=None) as batch_op:
+        batch_op.alter_column('unlocked_at', existing_type=sa.DateTime(), server_default=None, existing_nullable=True)
+        batch_op.create_index('ix_user_achievements_profile_id_achievement_id', ['profile_id', 'achievement_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_achievements', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_achievements_profile_id_achievement_id')
+        batch_op.alter_column('unlocked_at', existing_type=sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), existing_nullable=True)
+
+    with op.batch_alter_table('achievements', schema=None) as batch_op:
+        batch_op.drop_index('ix_achievements_requirement_type')
@@ -0,0 +1,38 @@
+"""ensure participation image and notes columns exist
+
+Revision ID: b3f8c5a7d210
+Revises: 9d4a6e1f2b83
+Create Date: 2026-10-19 12:00:00.000000
+
+The columns were previously added by add_participation_fields (a separate
+root revision) or by AUTO_MIGRATE's add_missing_columns, so only add what is
+missing here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8c5a7d210'
+down_revision = '9d4a6e1f2b83'
+branch_labels = None
+depends_on = None
+
+
+def _existing_columns():
+    inspector = sa.inspect(op.get_bind())
+    return {col['name'] for col in inspector.get_columns('action_participants')}
+
+
+def upgrade():
+    existing = _existing_columns()
+    with op.batch_alter_table('action_participants', schema=None) as batch_op:
+        if 'participation_image' not in existing:
+            batch_op.add_column(sa.Column('participation_image', sa.String(length=500), nullable=True))
+        if 'notes' not in existing:
+            batch_op.add_column(sa.Column('notes', sa.Text(), nullable=True))
+
+
+def downgrade():
+    # Columns may predate this revision; leave them in place
+    pass
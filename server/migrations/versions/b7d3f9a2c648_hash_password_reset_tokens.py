@@ -0,0 +1,36 @@
+"""store password reset tokens as indexed sha-256 hashes
+
+Revision ID: b7d3f9a2c648
+Revises: a5c8e2f1d394
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3f9a2c648'
+down_revision = 'a5c8e2f1d394'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Outstanding raw tokens (valid for at most an hour) are dropped; users
+    # mid-reset just request a new link
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reset_token_hash', sa.String(length=64), nullable=True))
+        batch_op.drop_column('reset_token')
+        batch_op.create_index('ix_users_reset_token_hash', ['reset_token_hash'], unique=True)
+        batch_op.create_index('ix_users_reset_token_expires', ['reset_token_expires'], unique=False)
+
+    op.execute("UPDATE users SET reset_token_expires = NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_reset_token_expires')
+        batch_op.drop_index('ix_users_reset_token_hash')
+        batch_op.add_column(sa.Column('reset_token', sa.String(length=100), nullable=True))
+        batch_op.drop_column('reset_token_hash')
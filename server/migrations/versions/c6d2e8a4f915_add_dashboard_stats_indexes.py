@@ -0,0 +1,43 @@
+"""add dashboard stats indexes
+
+Revision ID: c6d2e8a4f915
+Revises: b3f8c5a7d210
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d2e8a4f915'
+down_revision = 'b3f8c5a7d210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('dashboard_stats', schema=None) as batch_op:
+        batch_op.create_index('ix_dashboard_stats_user_id', ['user_id'], unique=True)
+
+    # Reports store the county as county_name() gives it ('Nairobi County' -> 'Nairobi'), so lookups are equality
+    op.execute("UPDATE reports SET county = TRIM(REPLACE(county, ' County', '')) WHERE county LIKE '% County%'")
+
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.create_index('ix_reports_user_id_created_at', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_reports_county_created_at', ['county', 'created_at'], unique=False)
+
+    with op.batch_alter_table('action_participants', schema=None) as batch_op:
+        batch_op.create_index('ix_action_participants_user_id_joined_at', ['user_id', 'joined_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('action_participants', schema=None) as batch_op:
+        batch_op.drop_index('ix_action_participants_user_id_joined_at')
+
+    with op.batch_alter_table('reports', schema=None) as batch_op:
+        batch_op.drop_index('ix_reports_county_created_at')
+        batch_op.drop_index('ix_reports_user_id_created_at')
+
+    with op.batch_alter_table('dashboard_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_dashboard_stats_user_id')
@@ -0,0 +1,45 @@
+"""add refresh token families for rotating sessions
+
+Revision ID: c9e5a1b7d402
+Revises: b7d3f9a2c648
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e5a1b7d402'
+down_revision = 'b7d3f9a2c648'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('refresh_token_families',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('family_id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('current_jti', sa.String(length=36), nullable=False),
+    sa.Column('previous_jti', sa.String(length=36), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('rotated_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_refresh_token_families_user_id_users')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('refresh_token_families', schema=None) as batch_op:
+        batch_op.create_index('ix_refresh_token_families_family_id', ['family_id'], unique=True)
+        batch_op.create_index('ix_refresh_token_families_user_id', ['user_id'], unique=False)
+        batch_op.create_index('ix_refresh_token_families_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('refresh_token_families', schema=None) as batch_op:
+        batch_op.drop_index('ix_refresh_token_families_expires_at')
+        batch_op.drop_index('ix_refresh_token_families_user_id')
+        batch_op.drop_index('ix_refresh_token_families_family_id')
+
+    op.drop_table('refresh_token_families')
@@ -0,0 +1,56 @@
+"""add content-addressed image blobs and references
+
+Revision ID: d4f8b2c6e913
+Revises: c9e5a1b7d402
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8b2c6e913'
+down_revision = 'c9e5a1b7d402'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('extension', sa.String(length=10), nullable=False),
+    sa.Column('byte_size', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_blobs', schema=None) as batch_op:
+        batch_op.create_index('ix_image_blobs_digest', ['digest'], unique=True)
+
+    op.create_table('image_references',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('blob_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['blob_id'], ['image_blobs.id'], name=op.f('fk_image_references_blob_id_image_blobs')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_image_references_user_id_users')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_references', schema=None) as batch_op:
+        batch_op.create_index('ix_image_references_blob_id', ['blob_id'], unique=False)
+        batch_op.create_index('ix_image_references_user_id_blob_id', ['user_id', 'blob_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('image_references', schema=None) as batch_op:
+        batch_op.drop_index('ix_image_references_user_id_blob_id')
+        batch_op.drop_index('ix_image_references_blob_id')
+
+    op.drop_table('image_references')
+
+    with op.batch_alter_table('image_blobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_image_blobs_digest')
+
+    op.drop_table('image_blobs')
@@ -0,0 +1,32 @@
+"""add generated county insights
+
+Revision ID: d81f3b6c9a27
+Revises: c6d2e8a4f915
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3b6c9a27'
+down_revision = 'c6d2e8a4f915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ai_intelligence', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_generated', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.create_index('ix_ai_intelligence_user_county_is_active', ['user_county', 'is_active'], unique=False)
+
+    # Rows written per request by the old dashboard code mostly have no expiry; retire them
+    op.execute(sa.text("UPDATE ai_intelligence SET is_active = :inactive WHERE is_generated = :legacy")
+               .bindparams(inactive=False, legacy=False))
+
+
+def downgrade():
+    with op.batch_alter_table('ai_intelligence', schema=None) as batch_op:
+        batch_op.drop_index('ix_ai_intelligence_user_county_is_active')
+        batch_op.drop_column('is_generated')
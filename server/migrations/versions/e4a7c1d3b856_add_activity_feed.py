@@ -0,0 +1,55 @@
+"""add county activity feed and timeline index
+
+Revision ID: e4a7c1d3b856
+Revises: d81f3b6c9a27
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c1d3b856'
+down_revision = 'd81f3b6c9a27'
+branch_labels = None
+depends_on = None
+
+# The placeholder rows the old dashboard wrote for every user with an empty feed
+SAMPLE_ACTIVITIES = [
+    ('report', 'Sarah M. reported a flooding issue', 'Downtown area near 5th Street - Storm drain overflow'),
+    ('community', '22 people joined Beach Cleanup', 'Marina Beach - Saturday 9 AM'),
+    ('alert', 'Heat Advisory issued', 'Your area - Expected 95°F+ this weekend'),
+]
+
+
+def upgrade():
+    op.create_table('county_activities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('county', sa.String(length=100), nullable=False),
+    sa.Column('actor_user_id', sa.Integer(), nullable=True),
+    sa.Column('activity_type', sa.String(length=50), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['actor_user_id'], ['users.id'], name=op.f('fk_county_activities_actor_user_id_users')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('county_activities', schema=None) as batch_op:
+        batch_op.create_index('ix_county_activities_county_timestamp', ['county', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('recent_activities', schema=None) as batch_op:
+        batch_op.create_index('ix_recent_activities_user_id_timestamp', ['user_id', 'timestamp'], unique=False)
+
+    # Feeds now merge recent_activities with real county events; drop the fake ones (not restored on downgrade)
+    delete = sa.text("DELETE FROM recent_activities WHERE activity_type = :activity_type "
+                     "AND title = :title AND description = :description")
+    for activity_type, title, description in SAMPLE_ACTIVITIES:
+        op.execute(delete.bindparams(activity_type=activity_type, title=title, description=description))
+
+
+def downgrade():
+    with op.batch_alter_table('recent_activities', schema=None) as batch_op:
+        batch_op.drop_index('ix_recent_activities_user_id_timestamp')
+
+    op.drop_table('county_activities')
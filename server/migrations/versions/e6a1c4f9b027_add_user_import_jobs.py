@@ -0,0 +1,39 @@
+"""add user import jobs
+
+Revision ID: e6a1c4f9b027
+Revises: d4f8b2c6e913
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a1c4f9b027'
+down_revision = 'd4f8b2c6e913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_import_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows', sa.Integer(), nullable=False),
+    sa.Column('summary', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_import_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_user_import_jobs_job_id', ['job_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_import_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_import_jobs_job_id')
+
+    op.drop_table('user_import_jobs')
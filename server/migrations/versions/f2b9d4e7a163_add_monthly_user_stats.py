@@ -0,0 +1,35 @@
+"""add monthly user stats buckets
+
+Revision ID: f2b9d4e7a163
+Revises: e4a7c1d3b856
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b9d4e7a163'
+down_revision = 'e4a7c1d3b856'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('monthly_user_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('issues', sa.Integer(), nullable=False),
+    sa.Column('alerts', sa.Integer(), nullable=False),
+    sa.Column('impact', sa.Integer(), nullable=False),
+    sa.Column('trees', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_monthly_user_stats_user_id_users')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month', name='uq_monthly_user_stats_user_id_month')
+    )
+
+
+def downgrade():
+    op.drop_table('monthly_user_stats')
@@ -0,0 +1,98 @@
+"""Shared fixtures: a fresh app on TestingConfig and an empty SQLite file per test"""
+import io
+import os
+import sys
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.extensions import db  # noqa: E402
+
+
+class InlineExecutor:
+    """Runs background jobs at once, so tests see their effects without sleeping"""
+
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from app.services import (background, county_insights, identity, leaderboard, profile_cards, rate_limit,
+                              sessions, storage)
+
+    # Module-level state outlives an app; start every test from scratch
+    monkeypatch.setattr(background, '_executor', InlineExecutor())
+    monkeypatch.setattr(background, '_long_executor', InlineExecutor())
+    monkeypatch.setattr(sessions, '_revoked', frozenset())
+    monkeypatch.setattr(sessions, '_loaded_at', None)
+    monkeypatch.setattr(rate_limit, '_limiter', None)
+    monkeypatch.setattr(storage, '_backends', {})
+    monkeypatch.setattr(leaderboard, '_registry', leaderboard.LeaderboardRegistry())
+    identity._cache.clear()
+    identity._versions.clear()
+    profile_cards._cache.clear()
+    county_insights._cache.clear()
+
+    config = type('Config', (TestingConfig,), {
+        # A file rather than :memory:, so background jobs get their own connection
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+    })
+    app = create_app(config)
+    app.instance_path = str(tmp_path / 'instance')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """make_user(email, password='secret123') -> User, with a profile"""
+    from app.models.auth import User
+    from app.models.profile import Profile
+
+    def make(email, password='secret123', county='Nairobi County'):
+        user = User(email=email)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Profile(user_id=user.id, full_name=email.split('@')[0], county=county))
+        db.session.commit()
+        return user
+
+    return make
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def auth_headers(user):
+    from flask_jwt_extended import create_access_token
+    return bearer(create_access_token(identity=str(user.id)))
+
+
+@pytest.fixture
+def render_inline(monkeypatch):
+    """Render image variants in the test process instead of the pool"""
+    from app.services import images, storage
+
+    def schedule(original_key, filename):
+        images.render_variants(storage.settings(), original_key, filename)
+    monkeypatch.setattr(images, 'schedule', schedule)
+
+
+def png(color, size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
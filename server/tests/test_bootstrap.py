@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from conftest import auth_headers
+
+from app.services.dates import parse_iso_datetime
+
+
+def test_parse_iso_datetime_converts_offsets_to_utc():
+    assert parse_iso_datetime('2026-10-19T12:00:00+03:00') == datetime(2026, 10, 19, 9, 0)
+    assert parse_iso_datetime('2026-10-19T12:00:00Z') == datetime(2026, 10, 19, 12, 0)
+    assert parse_iso_datetime('2026-10-19T12:00:00') == datetime(2026, 10, 19, 12, 0)
+
+
+def test_bootstrap_returns_the_me_shape_plus_the_dashboard(client, make_user):
+    ann = make_user('ann@example.com')
+    headers = auth_headers(ann)
+
+    body = client.get('/api/bootstrap', headers=headers).get_json()
+    me = client.get('/api/auth/me', headers=headers).get_json()
+    assert body['user'] == me['user']
+    assert body['profile'] == me['profile']
+    assert body['dashboard']['user']['name'] == 'ann'
+    assert body['unread']['activities'] == 0
+
+    assert set(client.get('/api/bootstrap?fields=user', headers=headers).get_json()) == {'success', 'user'}
+    assert client.get('/api/bootstrap?fields=nope', headers=headers).status_code == 400
+    assert client.get('/api/bootstrap?since=yesterday', headers=headers).status_code == 400
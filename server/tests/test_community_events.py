@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.community import CommunityAction
+from app.services import geo
+from app.services.community_events import assign_geo, find_upcoming
+
+NAIROBI = (-1.2864, 36.8172)
+
+
+def add_action(title, latitude, longitude, days):
+    action = CommunityAction(title=title, description='d', category='Environment', location='l',
+                             date=datetime.utcnow() + timedelta(days=days))
+    assign_geo(action, latitude, longitude)
+    db.session.add(action)
+    return action
+
+
+def test_radius_limit_counts_only_actions_inside_the_radius(app):
+    # Actions in the corners of the bounding box pass the SQL filters but not the exact distance
+    min_lat, max_lat, min_lng, max_lng = geo.bounding_box(*NAIROBI, 10)
+    for i in range(30):
+        add_action(f'Corner {i}', max_lat - 0.001, max_lng - 0.001, days=1 + i * 0.01)
+    add_action('Near', NAIROBI[0] + 0.01, NAIROBI[1], days=2)
+    add_action('Also near', NAIROBI[0], NAIROBI[1] + 0.01, days=3)
+    db.session.commit()
+
+    results = find_upcoming(lat=NAIROBI[0], lng=NAIROBI[1], radius_km=10, limit=1)
+    assert [action.title for action, _ in results] == ['Near']
+
+    results = find_upcoming(lat=NAIROBI[0], lng=NAIROBI[1], radius_km=10, limit=5)
+    assert [action.title for action, _ in results] == ['Near', 'Also near']
+    assert all(distance <= 10 for _, distance in results)
+
+
+def test_without_a_point_the_limit_applies_directly(app):
+    for i in range(3):
+        add_action(f'Action {i}', None, None, days=1 + i)
+    db.session.commit()
+    assert [action.title for action, _ in find_upcoming(limit=2)] == ['Action 0', 'Action 1']
+
+
+def test_upcoming_route_clamps_the_limit(client):
+    for i in range(3):
+        add_action(f'Near {i}', NAIROBI[0], NAIROBI[1] + 0.001 * i, days=1 + i)
+    db.session.commit()
+
+    for limit in (0, -5):
+        response = client.get(f'/api/community/actions/upcoming?lat={NAIROBI[0]}&lng={NAIROBI[1]}&limit={limit}')
+        assert response.status_code == 200
+        assert [action['title'] for action in response.get_json()['actions']] == ['Near 0']
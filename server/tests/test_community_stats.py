@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.community import CommunityAction, CommunityStats
+from app.services.community_stats import apply_stats_delta, reconcile_stats
+
+
+def add_action(status='active', participants=0):
+    db.session.add(CommunityAction(title='Cleanup', description='d', category='Environment', location='l',
+                                   date=datetime.utcnow() + timedelta(days=1), status=status,
+                                   participants_count=participants))
+
+
+def test_unseeded_stats_are_computed_without_writing(client):
+    add_action(participants=3)
+    add_action(status='completed', participants=2)
+    db.session.commit()
+
+    response = client.get('/api/community/stats')
+    assert response.status_code == 200
+    stats = response.get_json()['stats']
+    assert (stats['total_actions'], stats['active_actions'], stats['total_participants']) == (2, 1, 5)
+    assert db.session.query(CommunityStats).count() == 0
+
+
+def test_seeded_row_is_served_and_updated_by_deltas(client):
+    add_action(participants=3)
+    reconcile_stats()
+    apply_stats_delta(total_participants=1)
+    db.session.commit()
+
+    stats = client.get('/api/community/stats').get_json()['stats']
+    assert stats['total_participants'] == 4
@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models.dashboard import AIIntelligence
+from app.services import county_insights
+
+
+def test_legacy_insights_are_not_served(app):
+    db.session.add(AIIntelligence(user_county='Nairobi County', insight_type='tip', title='Old tip',
+                                  description='Written per request by the old dashboard', is_active=True))
+    db.session.commit()
+
+    titles = [insight['title'] for insight in county_insights.get_county_insights('Nairobi County')]
+    assert 'Old tip' not in titles
+    # The read scheduled a refresh, which wrote generated rows
+    assert AIIntelligence.query.filter_by(is_generated=True).count() > 0
+
+
+def test_expired_generated_insights_are_not_served(app):
+    db.session.add(AIIntelligence(user_county='Nairobi County', insight_type='tip', title='Stale', description='d',
+                                  is_active=True, is_generated=True, created_at=datetime.utcnow() - timedelta(days=2),
+                                  expires_at=datetime.utcnow() - timedelta(days=1)))
+    db.session.commit()
+    assert county_insights.active_insights_query('Nairobi County').count() == 0
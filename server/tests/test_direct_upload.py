@@ -0,0 +1,80 @@
+import hashlib
+
+import pytest
+from conftest import auth_headers, png
+
+from app.models.uploads import ImageBlob
+from app.services import images, storage
+
+
+pytestmark = pytest.mark.usefixtures('render_inline')
+
+
+def presign(client, user, data, content_type='image/png'):
+    return client.post('/api/upload/presign', headers=auth_headers(user), json={
+        'content_type': content_type, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()})
+
+
+def put(client, upload, data, content_type='image/png'):
+    return client.put(upload['url'], data=data, headers={**upload['headers'], 'Content-Type': content_type})
+
+
+def complete(client, user, ticket):
+    return client.post('/api/upload/complete', headers=auth_headers(user), json={'ticket': ticket})
+
+
+def test_presign_put_and_complete(client, make_user):
+    ann = make_user('ann@example.com')
+    data = png('red')
+    started = presign(client, ann, data)
+    assert started.status_code == 200
+    body = started.get_json()
+    assert body['status'] == 'awaiting_upload'
+    assert body['upload']['method'] == 'PUT'
+
+    assert put(client, body['upload'], data).status_code == 200
+    finished = complete(client, ann, body['ticket'])
+    assert finished.status_code == 201
+    assert finished.get_json()['filename'] == body['filename']
+    assert ImageBlob.query.filter_by(digest=images.stem_of(body['filename'])).one().ref_count == 1
+    assert client.get(finished.get_json()['variants']['card']['webp']).status_code == 200
+
+
+def test_presign_of_a_stored_image_skips_the_upload(client, make_user):
+    ann, bob = make_user('ann@example.com'), make_user('bob@example.com')
+    data = png('red')
+    body = presign(client, ann, data).get_json()
+    put(client, body['upload'], data)
+    complete(client, ann, body['ticket'])
+
+    again = presign(client, bob, data).get_json()
+    assert again['status'] == 'ready'
+    assert again['upload'] is None and again['ticket'] is None
+    assert ImageBlob.query.one().ref_count == 2
+
+
+def test_put_must_match_the_presigned_terms(client, make_user):
+    ann = make_user('ann@example.com')
+    data = png('red')
+    upload = presign(client, ann, data).get_json()['upload']
+
+    assert put(client, upload, png('blue')).status_code == 400
+    assert put(client, upload, data, content_type='image/jpeg').status_code == 400
+    assert client.put(upload['url'] + 'x', data=data, headers=upload['headers']).status_code == 403
+    assert list(storage.get_storage().iter_keys('originals/')) == []
+
+
+def test_complete_rejects_bad_and_foreign_tickets(client, make_user):
+    ann, eve = make_user('ann@example.com'), make_user('eve@example.com')
+    data = png('red')
+    body = presign(client, ann, data).get_json()
+
+    assert complete(client, ann, 'not-a-ticket').status_code == 400
+    # Nothing was uploaded yet
+    assert complete(client, ann, body['ticket']).status_code == 400
+
+    put(client, body['upload'], data)
+    response = complete(client, eve, body['ticket'])
+    assert response.status_code == 400
+    assert 'another user' in response.get_json()['error']
+    assert ImageBlob.query.count() == 0
@@ -0,0 +1,99 @@
+import io
+
+import pytest
+from conftest import auth_headers, png
+
+from app.extensions import db
+from app.models.reports import Report
+from app.models.uploads import ImageBlob, ImageReference
+from app.services import images, storage, upload_gc
+
+
+pytestmark = pytest.mark.usefixtures('render_inline')
+
+
+def upload(client, user, data, name='photo.png'):
+    return client.post('/api/upload/image', headers=auth_headers(user), content_type='multipart/form-data',
+                       data={'image': (io.BytesIO(data), name)})
+
+
+def delete(client, user, filename):
+    return client.delete(f'/api/upload/images/{filename}', headers=auth_headers(user))
+
+
+def blob_for(filename):
+    return ImageBlob.query.filter_by(digest=images.stem_of(filename)).first()
+
+
+def test_upload_renders_variants_under_the_content_hash(client, make_user):
+    ann = make_user('ann@example.com')
+    response = upload(client, ann, png('red'))
+    assert response.status_code == 201
+    body = response.get_json()
+
+    filename = body['filename']
+    assert images.is_content_addressed(filename)
+    assert images.is_processed(filename)
+    assert set(body['variants']) == {'thumb', 'card', 'full'}
+    assert client.get(body['variants']['thumb']['webp']).status_code == 200
+    assert body['image_url'] == body['variants']['full']['jpg']
+    assert client.get(body['image_url']).status_code == 200
+
+
+def test_same_image_is_stored_once_and_counted_per_owner(client, make_user):
+    ann, bob = make_user('ann@example.com'), make_user('bob@example.com')
+    first = upload(client, ann, png('red')).get_json()
+    # A repeat upload by the same user does not add a reference
+    assert upload(client, ann, png('red')).get_json()['filename'] == first['filename']
+    second = upload(client, bob, png('red'), name='other-name.png').get_json()
+
+    assert second['filename'] == first['filename']
+    assert second['status'] == 'ready'
+    assert ImageBlob.query.count() == 1
+    assert blob_for(first['filename']).ref_count == 2
+    assert ImageReference.query.count() == 2
+
+
+def test_only_owners_can_release_and_gc_deletes_the_files(client, make_user):
+    ann, bob, eve = make_user('ann@example.com'), make_user('bob@example.com'), make_user('eve@example.com')
+    filename = upload(client, ann, png('red')).get_json()['filename']
+    upload(client, bob, png('red'))
+    target = storage.get_storage()
+
+    assert delete(client, eve, filename).status_code == 403
+    assert delete(client, ann, filename).status_code == 200
+    assert blob_for(filename).ref_count == 1
+    # Releasing twice is not allowed either
+    assert delete(client, ann, filename).status_code == 403
+
+    # The last release only drops the reference; the files wait for gc-uploads
+    assert delete(client, bob, filename).status_code == 200
+    assert blob_for(filename).ref_count == 0
+    assert target.exists(images.image_key(filename))
+
+    upload_gc.collect(grace_seconds=0)
+    assert blob_for(filename) is None
+    assert not target.exists(images.image_key(filename))
+    assert list(target.iter_keys('originals/')) == []
+
+    # Uploading it again starts over
+    assert upload(client, ann, png('red')).status_code == 201
+    assert blob_for(filename).ref_count == 1
+
+
+def test_gc_keeps_released_files_that_are_still_linked(client, make_user):
+    ann = make_user('ann@example.com')
+    body = upload(client, ann, png('red')).get_json()
+    filename = body['filename']
+    # The same photo attached to two reports, then removed from one of them
+    for title in ('Blocked drain', 'Flooded road'):
+        db.session.add(Report(user_id=ann.id, title=title, description='d', issue_type='Flooding',
+                              location='l', county='Nairobi', image_urls=[body['variants']['card']['webp']]))
+    db.session.commit()
+    Report.query.filter_by(title='Blocked drain').update({Report.image_urls: []})
+    db.session.commit()
+
+    assert delete(client, ann, filename).status_code == 200
+    upload_gc.collect(grace_seconds=0)
+    assert storage.get_storage().exists(images.image_key(filename))
+    assert client.get(body['variants']['full']['jpg']).status_code == 200
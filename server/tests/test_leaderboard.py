@@ -0,0 +1,35 @@
+from app.services.leaderboard import LeaderboardRegistry
+
+
+def test_counties_share_a_board_whatever_the_suffix():
+    registry = LeaderboardRegistry()
+    registry.load([(1, 'Nairobi County', 30), (2, 'Nairobi', 20)])
+    registry.update(3, 'Nairobi County', 10)
+
+    assert registry.top('Nairobi') == [(30, 1), (20, 2), (10, 3)]
+    assert registry.rank(3)['county_rank'] == 3
+    assert registry.rank(1)['county'] == 'Nairobi'
+
+
+def test_updates_during_a_rebuild_are_not_lost():
+    registry = LeaderboardRegistry()
+    registry.load([(1, 'Nairobi', 10), (2, 'Nairobi', 5)])
+
+    def rows():
+        # Profiles as read by the rebuild, before user 2 earns points
+        yield 1, 'Nairobi', 10
+        registry.update(2, 'Nairobi', 50)
+        yield 2, 'Nairobi', 5
+
+    registry.load(rows())
+    assert registry.top('Nairobi') == [(50, 2), (10, 1)]
+    assert registry.rank(2)['national_rank'] == 1
+    assert registry._replays == []
+
+
+def test_leaderboard_route_normalises_the_county(client, make_user):
+    make_user('ann@example.com', county='Nairobi County')
+    for county in ('Nairobi', 'Nairobi%20County'):
+        response = client.get(f'/api/leaderboard?county={county}')
+        assert response.status_code == 200
+        assert len(response.get_json()['leaders']) == 1
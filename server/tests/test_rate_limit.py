@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from app.services import rate_limit
+from app.services.rate_limit import MemoryBackend, RateLimiter, SQLiteBackend, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit('10/minute') == (10, 60.0)
+    assert parse_limit('5/hour') == (5, 3600.0)
+    assert parse_limit('3/5minutes') == (3, 300.0)
+    with pytest.raises(ValueError):
+        parse_limit('3/fortnight')
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate():
+    bucket = MemoryBackend()
+    capacity, rate = 3, 1.0  # 3 tokens, one more per second
+
+    assert [bucket.hit('k', capacity, rate, now=100.0) for _ in range(3)] == [0, 0, 0]
+    assert bucket.hit('k', capacity, rate, now=100.0) == pytest.approx(1.0)
+    assert bucket.hit('k', capacity, rate, now=100.5) == pytest.approx(0.5)
+    assert bucket.hit('k', capacity, rate, now=101.0) == 0
+    # Never refills beyond its capacity
+    assert [bucket.hit('k', capacity, rate, now=1000.0) for _ in range(4)][-1] > 0
+
+
+def test_buckets_are_per_key():
+    bucket = MemoryBackend()
+    assert bucket.hit('a', 1, 0.1, now=0.0) == 0
+    assert bucket.hit('a', 1, 0.1, now=0.0) > 0
+    assert bucket.hit('b', 1, 0.1, now=0.0) == 0
+
+
+def test_memory_backend_evicts_least_recently_used_keys():
+    bucket = MemoryBackend(max_keys=2)
+    for key in ('a', 'b', 'a', 'c'):
+        bucket.hit(key, 5, 1.0, now=0.0)
+    assert list(bucket._buckets) == ['a', 'c']
+
+
+def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'buckets.db')
+    worker_1, worker_2 = SQLiteBackend(path), SQLiteBackend(path)
+
+    assert worker_1.hit('k', 2, 1.0, now=0.0) == 0
+    assert worker_2.hit('k', 2, 1.0, now=0.0) == 0
+    assert worker_1.hit('k', 2, 1.0, now=0.0) > 0
+    assert worker_2.purge(older_than=1.0) == 1
+
+
+def test_purge_command_deletes_idle_sqlite_buckets(app, tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / 'buckets.db'))
+    backend.hit('idle', 1, 1.0, now=time.time() - 2 * 86400)
+    backend.hit('active', 1, 1.0, now=time.time())
+    monkeypatch.setattr(rate_limit, '_limiter', RateLimiter(backend))
+
+    result = app.test_cli_runner().invoke(args=['purge-rate-limits'])
+    assert 'Deleted 1 idle' in result.output
+    keys = [key for (key,) in backend._connect().execute("SELECT key FROM rate_limit_buckets")]
+    assert keys == ['active']
+
+
+def test_limiter_remembers_rejections_from_a_shared_backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'buckets.db'))
+    limiter = RateLimiter(backend)
+    assert limiter.hit('k', 1, 0.01) == 0
+    assert limiter.hit('k', 1, 0.01) > 0
+
+    # Until the retry time the backend is not asked again
+    backend.hit = lambda *args: pytest.fail('rejected key went to the backend')
+    assert limiter.hit('k', 1, 0.01) > 0
+
+
+@pytest.fixture
+def limited(app):
+    app.config['RATELIMIT_ENABLED'] = True
+    return app
+
+
+def test_login_is_limited_per_ip(limited, client, make_user):
+    make_user('ann@example.com')
+    attempt = {'email': 'ann@example.com', 'password': 'wrong-password'}
+
+    statuses = [client.post('/api/auth/login', json=attempt).status_code for _ in range(10)]
+    assert statuses == [401] * 10
+
+    response = client.post('/api/auth/login', json=attempt)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['retry_after'] >= 1
+
+    # Another address has its own bucket
+    other = client.post('/api/auth/login', json=attempt, environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 401
+
+
+def test_limiter_outage_lets_requests_through(limited, client, make_user, monkeypatch):
+    class Broken:
+        def hit(self, *args):
+            raise ConnectionError('backend down')
+
+    monkeypatch.setattr(rate_limit, '_limiter', Broken())
+    make_user('ann@example.com')
+    response = client.post('/api/auth/login', json={'email': 'ann@example.com', 'password': 'secret123'})
+    assert response.status_code == 200
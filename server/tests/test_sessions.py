@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+from conftest import bearer
+from flask_jwt_extended import decode_token
+
+from app.extensions import db
+from app.models.auth import RefreshTokenFamily, User
+from app.services import sessions
+
+
+def login(client, email, password='secret123'):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def refresh(client, refresh_token):
+    return client.post('/api/auth/refresh', headers=bearer(refresh_token))
+
+
+def me(client, access_token):
+    return client.get('/api/auth/me', headers=bearer(access_token))
+
+
+def test_refresh_rotates_the_token(client, make_user):
+    make_user('ann@example.com')
+    first = login(client, 'ann@example.com')
+
+    response = refresh(client, first['refresh_token'])
+    assert response.status_code == 200
+    second = response.get_json()
+    assert second['refresh_token'] != first['refresh_token']
+    assert second['expires_in'] == 15 * 60
+    assert me(client, second['token']).status_code == 200
+
+    # Only the newest refresh token rotates further
+    third = refresh(client, second['refresh_token'])
+    assert third.status_code == 200
+    family = RefreshTokenFamily.query.one()
+    assert family.revoked_at is None
+
+
+def test_reuse_within_grace_window_returns_the_current_token(client, make_user):
+    make_user('ann@example.com')
+    first = login(client, 'ann@example.com')
+
+    rotated = refresh(client, first['refresh_token']).get_json()
+    # A second tab refreshing with the same token moments later
+    raced = refresh(client, first['refresh_token'])
+    assert raced.status_code == 200
+
+    # Both tabs end up holding the current token, and the session survives
+    assert decode_token(raced.get_json()['refresh_token'])['jti'] == decode_token(rotated['refresh_token'])['jti']
+    assert refresh(client, raced.get_json()['refresh_token']).status_code == 200
+    assert refresh(client, rotated['refresh_token']).status_code == 200
+    assert RefreshTokenFamily.query.one().revoked_at is None
+
+
+def test_reuse_after_grace_window_revokes_the_session(app, client, make_user):
+    make_user('ann@example.com')
+    first = login(client, 'ann@example.com')
+    rotated = refresh(client, first['refresh_token']).get_json()
+
+    family = RefreshTokenFamily.query.one()
+    family.rotated_at = datetime.utcnow() - timedelta(seconds=app.config.get('REFRESH_REUSE_GRACE_SECONDS', 10) + 1)
+    db.session.commit()
+
+    # Replaying an old token looks like theft: the whole session ends
+    assert refresh(client, first['refresh_token']).status_code == 401
+    assert RefreshTokenFamily.query.one().revoked_at is not None
+    assert refresh(client, rotated['refresh_token']).status_code == 401
+    assert me(client, rotated['token']).status_code == 401
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, make_user):
+    make_user('ann@example.com')
+    tokens = login(client, 'ann@example.com')
+
+    assert client.post('/api/auth/logout', headers=bearer(tokens['token'])).status_code == 200
+    assert me(client, tokens['token']).status_code == 401
+    assert refresh(client, tokens['refresh_token']).status_code == 401
+
+
+def test_logout_leaves_other_sessions_alone(client, make_user):
+    make_user('ann@example.com')
+    laptop = login(client, 'ann@example.com')
+    phone = login(client, 'ann@example.com')
+
+    client.post('/api/auth/logout', headers=bearer(laptop['token']))
+    assert me(client, laptop['token']).status_code == 401
+    assert me(client, phone['token']).status_code == 200
+
+
+def test_password_reset_revokes_every_session(client, make_user):
+    user = make_user('ann@example.com')
+    laptop = login(client, 'ann@example.com')
+    phone = login(client, 'ann@example.com')
+
+    token = user.generate_reset_token()
+    db.session.commit()
+    response = client.post('/api/auth/reset-password', json={'token': token, 'password': 'new-secret'})
+    assert response.status_code == 200
+
+    for session in (laptop, phone):
+        assert me(client, session['token']).status_code == 401
+        assert refresh(client, session['refresh_token']).status_code == 401
+    assert RefreshTokenFamily.query.filter(RefreshTokenFamily.revoked_at.is_(None)).count() == 0
+    assert me(client, login(client, 'ann@example.com', 'new-secret')['token']).status_code == 200
+
+
+def test_revocations_from_other_processes_apply_after_reload(app, client, make_user):
+    make_user('ann@example.com')
+    tokens = login(client, 'ann@example.com')
+    assert me(client, tokens['token']).status_code == 200
+
+    # Another worker revokes the session: only the database knows
+    RefreshTokenFamily.query.update({RefreshTokenFamily.revoked_at: datetime.utcnow()})
+    db.session.commit()
+    assert me(client, tokens['token']).status_code == 200
+
+    # The periodic reload picks it up
+    app.config['REVOCATION_RELOAD_SECONDS'] = 0
+    me(client, tokens['token'])
+    assert me(client, tokens['token']).status_code == 401
+
+
+def test_expired_sessions_are_not_kept_in_the_revocation_set(make_user):
+    user = make_user('ann@example.com')
+    db.session.add_all([
+        RefreshTokenFamily(family_id='expired', user_id=user.id, current_jti='a',
+                           expires_at=datetime.utcnow() - timedelta(days=1), revoked_at=datetime.utcnow()),
+        RefreshTokenFamily(family_id='live', user_id=user.id, current_jti='b',
+                           expires_at=datetime.utcnow() + timedelta(days=1), revoked_at=datetime.utcnow()),
+    ])
+    db.session.commit()
+
+    sessions.load_revocations()
+    assert sessions.is_revoked('live')
+    assert not sessions.is_revoked('expired')
+    assert sessions.sweep_expired_sessions() == 1
+
+
+def test_sweep_clears_only_expired_reset_tokens(make_user):
+    ann, bob = make_user('ann@example.com'), make_user('bob@example.com')
+    ann.generate_reset_token()
+    bob.generate_reset_token()
+    ann.reset_token_expires = datetime.utcnow() - timedelta(minutes=1)
+    db.session.commit()
+
+    assert User.sweep_expired_reset_tokens(batch_size=1) == 1
+    db.session.expire_all()
+    assert ann.reset_token_hash is None and ann.reset_token_expires is None
+    assert bob.reset_token_hash is not None
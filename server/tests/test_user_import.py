@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from app.models.auth import User, UserImportJob
+from app.services import passwords
+from app.services.user_import import import_users
+
+ADMIN = {'X-Admin-Token': 'admin123'}
+
+CSV = """email,password,full_name,county
+ann@example.com,secret123,Ann,Nairobi County
+bob@example.com,,Bob,Kisumu
+ann@example.com,other-secret,Ann again,Nairobi
+not-an-email,secret123,Nobody,
+"""
+
+
+def post_csv(client, text, query=''):
+    return client.post(f'/api/admin/import-users{query}', headers=ADMIN, content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(text.encode('utf-8')), 'volunteers.csv')})
+
+
+def test_import_is_queued_and_hashes_on_the_shared_pool(client, monkeypatch):
+    hashed = []
+    hash_passwords = passwords.hash_passwords
+    monkeypatch.setattr(passwords, 'hash_passwords', lambda values: hashed.extend(values) or hash_passwords(values))
+
+    response = post_csv(client, CSV)
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.get_json()['rows'] == 4
+
+    job = client.get(f'/api/admin/import-users/{job_id}', headers=ADMIN).get_json()
+    assert job['status'] == 'done'
+    assert job['created'] == 2
+    assert [d['line'] for d in job['duplicates']] == [4]
+    assert [e['line'] for e in job['errors']] == [5]
+    assert len(hashed) == 2
+
+    # Imported passwords are hashed at the configured cost, not a cheaper one
+    ann = User.query.filter_by(email='ann@example.com').one()
+    assert passwords.hash_rounds(ann.password_hash) == 4
+    assert ann.check_password('secret123')
+
+
+def test_dry_run_answers_at_once_and_writes_nothing(client):
+    response = post_csv(client, CSV, '?dry_run=true')
+    assert response.status_code == 200
+    assert response.get_json()['created'] == 2
+    assert User.query.count() == 0
+    assert UserImportJob.query.count() == 0
+
+
+def test_import_rejects_files_over_the_row_limit(app, client):
+    app.config['USER_IMPORT_MAX_ROWS'] = 3
+    assert post_csv(client, CSV).status_code == 413
+    assert post_csv(client, 'name\nAnn\n').status_code == 400
+    assert UserImportJob.query.count() == 0
+
+
+def test_import_job_status_needs_the_admin_token(client):
+    assert client.get('/api/admin/import-users/nope').status_code == 401
+    assert client.get('/api/admin/import-users/nope', headers=ADMIN).status_code == 404
+
+
+def test_import_users_needs_no_hasher_for_a_dry_run(app):
+    with pytest.raises(ValueError):
+        import_users(io.StringIO('name\nAnn\n'))
+    assert import_users(io.StringIO(CSV), dry_run=True)['created'] == 2